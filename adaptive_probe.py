@@ -0,0 +1,183 @@
+import threading
+from collections import deque
+
+from status_index import StatusBitmap
+
+class DensityMap:
+    """ID 공간을 고정 크기 구간으로 나눠 구간별 유효 ID 비율을 추정
+
+    관측이 적은 구간은 사전값(prior_valid / (prior_valid + prior_invalid))에 가깝게 추정함.
+    """
+
+    def __init__(self, bucket_size=1000, prior_valid=1.0, prior_invalid=4.0):
+        self.bucket_size = bucket_size
+        self.prior_valid = prior_valid
+        self.prior_invalid = prior_invalid
+        # 구간 번호 -> [확인한 ID 수, 유효 ID 수]
+        self._buckets = {}
+
+    @classmethod
+    def from_statuses(cls, statuses, **kwargs):
+        """처리 장부(ID -> 결과)에서 구간별 밀도 학습"""
+        density_map = cls(**kwargs)
+        if hasattr(statuses, 'bucket_counts'):
+            # 비트맵 인덱스는 구간별 개수를 한 번에 계산
+            density_map._buckets = statuses.bucket_counts(density_map.bucket_size)
+            return density_map
+        for player_id, status in statuses.items():
+            density_map.add(player_id, status.startswith('valid'))
+        return density_map
+
+    def bucket_of(self, player_id):
+        return player_id // self.bucket_size
+
+    def add(self, player_id, valid):
+        counts = self._buckets.setdefault(self.bucket_of(player_id), [0, 0])
+        counts[0] += 1
+        if valid:
+            counts[1] += 1
+
+    def density(self, player_id):
+        """player_id가 속한 구간의 유효 ID 비율 추정값"""
+        probed, valid = self._buckets.get(self.bucket_of(player_id), (0, 0))
+        return (valid + self.prior_valid) / (probed + self.prior_valid + self.prior_invalid)
+
+class AdaptiveProber:
+    """ID 밀도에 따라 건너뛰며 탐색하고 유효 ID 주변은 촘촘하게 다시 확인하는 탐색 순서 생성기
+
+    - 본 탐색: 밀도가 낮은 구간은 stride_factor / 밀도 간격(최대 max_stride)으로 건너뜀
+    - 유효 ID를 찾으면 앞뒤 neighborhood개 ID를 우선 확인하고, 이후 구간도 한동안 1씩 탐색
+    - 보충 탐색(backfill=True): 본 탐색에서 건너뛴 ID를 밀도가 높은 구간부터 마지막에 확인
+    - 이미 처리한 ID(statuses)는 요청하지 않으며 밀도 학습에만 사용
+    - 요청한 ID는 결과가 올 때까지만 따로 들고 있고, 결과를 받은 ID는 범위 시작 기준 비트맵(ID 하나당 1비트)에 표시함
+      (탐색한 ID 수가 늘어도 메모리는 범위 크기 / 8바이트를 넘지 않음)
+
+    next_id/record는 여러 스레드에서 호출해도 됨 (파이프라인의 feeder와 sink).
+    """
+
+    def __init__(self, start_id, end_id, statuses=None, bucket_size=1000, max_stride=32, stride_factor=0.5,
+                 neighborhood=5, backfill=False):
+        self.start_id = start_id
+        self.end_id = end_id
+        self.max_stride = max_stride
+        self.stride_factor = stride_factor
+        self.neighborhood = neighborhood
+        self.backfill = backfill
+        # 처리 장부의 인덱스(또는 사전)를 그대로 참조 (다른 곳에서 기록한 결과도 바로 반영됨)
+        self.known = statuses if statuses is not None else {}
+        self.density_map = DensityMap.from_statuses(self.known, bucket_size=bucket_size)
+
+        self.counts = {'sweep': 0, 'neighbor': 0, 'backfill': 0, 'valid': 0}
+        # 요청했지만 아직 결과가 오지 않은 ID (동시 요청 수만큼만 쌓임)
+        self._in_flight = set()
+        self._recorded = StatusBitmap()
+        self._cursor = start_id
+        self._dense_until = start_id - 1
+        self._priority = deque()
+        self._backfill_iter = None
+        self._outstanding = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _is_done(self, player_id):
+        return (player_id in self._in_flight or player_id - self.start_id in self._recorded
+                or player_id in self.known)
+
+    def _issue(self, player_id, phase):
+        self._in_flight.add(player_id)
+        self.counts[phase] += 1
+        self._outstanding += 1
+        return player_id
+
+    def stride(self, player_id):
+        """player_id 다음에 건너뛸 간격"""
+        if player_id <= self._dense_until:
+            return 1
+        stride = int(self.stride_factor / self.density_map.density(player_id))
+        return max(1, min(self.max_stride, stride))
+
+    def _backfill_ids(self):
+        """본 탐색에서 건너뛴 ID를 밀도가 높은 구간부터 반환"""
+        bucket_size = self.density_map.bucket_size
+        first_bucket = self.start_id // bucket_size
+        last_bucket = self.end_id // bucket_size
+        buckets = sorted(range(first_bucket, last_bucket + 1),
+                         key=lambda bucket: -self.density_map.density(bucket * bucket_size))
+        for bucket in buckets:
+            low = max(self.start_id, bucket * bucket_size)
+            high = min(self.end_id, (bucket + 1) * bucket_size - 1)
+            for player_id in range(low, high + 1):
+                yield player_id
+
+    def next_id(self):
+        """다음에 요청할 ID (더 확인할 ID가 없으면 None)"""
+        with self._condition:
+            while self._priority:
+                player_id = self._priority.popleft()
+                if not self._is_done(player_id):
+                    return self._issue(player_id, 'neighbor')
+
+            while self._cursor <= self.end_id:
+                player_id = self._cursor
+                self._cursor += self.stride(player_id)
+                if not self._is_done(player_id):
+                    return self._issue(player_id, 'sweep')
+
+            if self.backfill:
+                if self._backfill_iter is None:
+                    self._backfill_iter = self._backfill_ids()
+                for player_id in self._backfill_iter:
+                    if not self._is_done(player_id):
+                        return self._issue(player_id, 'backfill')
+
+            return None
+
+    def record(self, player_id, valid):
+        """요청 결과 반영 (valid가 None이면 오류로 보고 밀도에는 반영하지 않음)"""
+        with self._condition:
+            self._outstanding = max(0, self._outstanding - 1)
+            self._in_flight.discard(player_id)
+            if self.start_id <= player_id <= self.end_id:
+                self._recorded.add(player_id - self.start_id)
+            if valid is not None:
+                self.density_map.add(player_id, valid)
+            if valid:
+                self.counts['valid'] += 1
+                # 이후 구간은 한동안 촘촘하게, 이미 지나간 주변 ID는 우선 확인
+                self._dense_until = max(self._dense_until, player_id + self.neighborhood)
+                for neighbor in range(max(self.start_id, player_id - self.neighborhood),
+                                      min(self.end_id, player_id + self.neighborhood) + 1):
+                    if neighbor < self._cursor and not self._is_done(neighbor):
+                        self._priority.append(neighbor)
+            self._condition.notify_all()
+
+    def close(self):
+        """iter_ids의 대기를 끝냄 (중단 시 사용)"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+
+    def iter_ids(self):
+        """요청할 ID를 차례로 반환
+
+        본 탐색이 끝나도 아직 결과가 오지 않은 요청이 있으면, 그 결과로 주변 ID가 추가될 수 있으므로 기다림.
+        """
+        while True:
+            player_id = self.next_id()
+            if player_id is not None:
+                yield player_id
+                continue
+
+            with self._condition:
+                if self._closed:
+                    return
+                if self._priority:
+                    continue
+                if self._outstanding == 0:
+                    return
+                self._condition.wait(timeout=0.5)
+
+    def skipped_count(self):
+        """범위 안에서 아직 한 번도 확인하지 않은 ID 수 (보충 탐색 대상)"""
+        with self._condition:
+            return sum(1 for player_id in range(self.start_id, self.end_id + 1) if not self._is_done(player_id))
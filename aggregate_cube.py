@@ -0,0 +1,275 @@
+import sqlite3
+import threading
+
+import pandas as pd
+
+from log_utils import get_logger
+from parquet_sink import match_seasons
+from storage_engine import normalize_key_value
+
+logger = get_logger('cube')
+
+# 경기 집계 값 (cube 테이블과 match_facts 테이블에 같은 이름으로 저장)
+MATCH_MEASURES = ['matches', 'minutes', 'goals', 'assists', 'yellow_cards', 'red_cards', 'rating_sum', 'rating_count']
+MATCH_DIMENSIONS = ['player_id', 'team_id', 'league_id', 'season']
+STAT_MEASURES = ['players', 'value_sum', 'value_count']
+STAT_DIMENSIONS = ['league_id', 'season', 'title']
+
+# 기본키에 NULL이 들어가면 같은 그룹이 여러 행으로 나뉘므로 빈 값은 아래 값으로 저장
+_MISSING_ID = -1
+_MISSING_TEXT = ''
+
+# 키 값 형식이 바뀌면 올려서 예전 집계를 다시 만들게 함 (2: 시즌/항목 정규화)
+_CUBE_FORMAT = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS match_facts (
+    player_id INTEGER NOT NULL,
+    match_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    league_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    matches INTEGER NOT NULL,
+    minutes REAL NOT NULL,
+    goals REAL NOT NULL,
+    assists REAL NOT NULL,
+    yellow_cards REAL NOT NULL,
+    red_cards REAL NOT NULL,
+    rating_sum REAL NOT NULL,
+    rating_count INTEGER NOT NULL,
+    PRIMARY KEY (player_id, match_id)
+);
+CREATE TABLE IF NOT EXISTS match_cube (
+    player_id INTEGER NOT NULL,
+    team_id INTEGER NOT NULL,
+    league_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    matches INTEGER NOT NULL,
+    minutes REAL NOT NULL,
+    goals REAL NOT NULL,
+    assists REAL NOT NULL,
+    yellow_cards REAL NOT NULL,
+    red_cards REAL NOT NULL,
+    rating_sum REAL NOT NULL,
+    rating_count INTEGER NOT NULL,
+    PRIMARY KEY (player_id, team_id, league_id, season)
+);
+CREATE INDEX IF NOT EXISTS idx_match_cube_team ON match_cube (team_id, league_id, season);
+CREATE INDEX IF NOT EXISTS idx_match_cube_league ON match_cube (league_id, season);
+CREATE TABLE IF NOT EXISTS stat_facts (
+    player_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    title TEXT NOT NULL,
+    league_id INTEGER NOT NULL,
+    players INTEGER NOT NULL,
+    value_sum REAL NOT NULL,
+    value_count INTEGER NOT NULL,
+    PRIMARY KEY (player_id, season, title)
+);
+CREATE TABLE IF NOT EXISTS stat_cube (
+    league_id INTEGER NOT NULL,
+    season TEXT NOT NULL,
+    title TEXT NOT NULL,
+    players INTEGER NOT NULL,
+    value_sum REAL NOT NULL,
+    value_count INTEGER NOT NULL,
+    PRIMARY KEY (league_id, season, title)
+);
+CREATE TABLE IF NOT EXISTS source_generations (
+    source_table TEXT PRIMARY KEY,
+    generation INTEGER NOT NULL
+);
+"""
+
+def _ids(series):
+    return pd.to_numeric(series, errors='coerce').fillna(_MISSING_ID).astype('int64')
+
+def _texts(series):
+    """텍스트 키 값 (저장 엔진 키와 같이 정규화: CSV에서 float로 읽힌 2024.0도 '2024', 빈 값은 '')"""
+    return series.astype(object).map(normalize_key_value)
+
+def _numbers(series):
+    return pd.to_numeric(series, errors='coerce').fillna(0.0)
+
+def match_facts(df):
+    """경기 행을 집계용 사실 행으로 변환 (키: player_id, match_id)"""
+    rating = pd.to_numeric(df['rating'], errors='coerce')
+    facts = pd.DataFrame({
+        'player_id': _ids(df['player_id']),
+        'match_id': _ids(df['match_id']),
+        'team_id': _ids(df['team_id']),
+        'league_id': _ids(df['league_id']),
+        'season': _texts(match_seasons(df['match_date'])),
+        'matches': 1,
+        'minutes': _numbers(df['minutes_played']),
+        'goals': _numbers(df['goals']),
+        'assists': _numbers(df['assists']),
+        'yellow_cards': _numbers(df['yellow_cards']),
+        'red_cards': _numbers(df['red_cards']),
+        'rating_sum': rating.fillna(0.0),
+        'rating_count': rating.notna().astype('int64'),
+    })
+    # 같은 배치 안에서 키가 겹치면 저장 엔진처럼 나중 행이 우선
+    return facts.drop_duplicates(['player_id', 'match_id'], keep='last')
+
+def stat_facts(df):
+    """통계 행을 집계용 사실 행으로 변환 (키: player_id, season, title)"""
+    value = pd.to_numeric(df['value'], errors='coerce')
+    facts = pd.DataFrame({
+        'player_id': _ids(df['player_id']),
+        'season': _texts(df['season']),
+        'title': _texts(df['title']),
+        'league_id': _ids(df['league_id']),
+        'players': 1,
+        'value_sum': value.fillna(0.0),
+        'value_count': value.notna().astype('int64'),
+    })
+    return facts.drop_duplicates(['player_id', 'season', 'title'], keep='last')
+
+class AggregateCube:
+    """경기/통계 테이블 위에 증분으로 유지하는 집계 테이블 (SQLite)
+
+    - match_cube: (선수, 팀, 리그, 시즌)별 경기 수, 출전 시간, 골, 도움, 카드, 평점 합/개수
+    - stat_cube: (리그, 시즌, 통계 항목)별 선수 수, 값 합/개수
+    - *_facts: 행마다 집계에 더한 값. 같은 키의 행이 다시 저장되면 예전 값을 빼고(retraction) 새 값을 더함
+
+    팀/리그/시즌 단위 요약은 가장 세밀한 그룹을 다시 묶어 계산하므로 경기 행 수가 아니라 그룹 수에 비례함.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != _CUBE_FORMAT:
+            # 반영한 세대 기록을 지워 get_aggregate_cube가 저장소 전체로 다시 만들게 함
+            with self.conn:
+                self.conn.execute("DELETE FROM source_generations")
+                self.conn.execute(f"PRAGMA user_version = {_CUBE_FORMAT}")
+
+    def fact_count(self, table):
+        """집계에 반영된 행 수 (저장 엔진의 행 수와 다르면 다시 만들어야 함)"""
+        fact_table = {'matches': 'match_facts', 'stats': 'stat_facts'}[table]
+        with self._lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM {fact_table}").fetchone()[0]
+
+    def generation(self, table):
+        """집계에 마지막으로 반영한 저장 엔진 테이블의 쓰기 세대 (기록이 없으면 None)"""
+        with self._lock:
+            row = self.conn.execute("SELECT generation FROM source_generations WHERE source_table = ?",
+                                    (table,)).fetchone()
+        return row[0] if row else None
+
+    def set_generation(self, table, generation):
+        """저장 엔진 테이블의 generation까지 집계에 반영했다고 기록"""
+        with self._lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO source_generations (source_table, generation) VALUES (?, ?)",
+                              (table, generation))
+
+    def apply(self, table, df):
+        """저장 엔진에 upsert한 배치를 집계에 반영 (경기/통계 외 테이블은 무시)"""
+        if df is None or df.empty or table not in ('matches', 'stats'):
+            return 0
+        if table == 'matches':
+            facts = match_facts(df)
+            self._apply(facts, 'match_facts', 'match_cube', ['player_id', 'match_id'], MATCH_DIMENSIONS, MATCH_MEASURES)
+        else:
+            facts = stat_facts(df)
+            self._apply(facts, 'stat_facts', 'stat_cube', ['player_id', 'season', 'title'], STAT_DIMENSIONS, STAT_MEASURES)
+        return len(facts)
+
+    def _apply(self, facts, fact_table, cube_table, keys, dimensions, measures):
+        columns = list(facts.columns)
+        with self._lock, self.conn:
+            # 이번 배치 키의 예전 값 조회 (임시 테이블과 조인)
+            self.conn.execute("DROP TABLE IF EXISTS temp.batch_keys")
+            self.conn.execute(f"CREATE TEMP TABLE batch_keys ({', '.join(keys)})")
+            self.conn.executemany(f"INSERT INTO temp.batch_keys VALUES ({', '.join('?' * len(keys))})",
+                                  facts[keys].astype(object).itertuples(index=False, name=None))
+            join = ' AND '.join(f"f.{key} = k.{key}" for key in keys)
+            old = pd.read_sql_query(
+                f"SELECT f.* FROM {fact_table} f JOIN temp.batch_keys k ON {join}", self.conn)
+
+            # 예전 값은 빼고 새 값은 더한 변화량을 그룹별로 합침
+            if not old.empty:
+                old[measures] = -old[measures]
+                changes = pd.concat([old[columns], facts], ignore_index=True)
+            else:
+                changes = facts
+            delta = changes.groupby(dimensions, as_index=False)[measures].sum()
+
+            updates = ', '.join(f"{measure} = {measure} + excluded.{measure}" for measure in measures)
+            self.conn.executemany(
+                f"INSERT INTO {cube_table} ({', '.join(dimensions + measures)}) "
+                f"VALUES ({', '.join('?' * (len(dimensions) + len(measures)))}) "
+                f"ON CONFLICT ({', '.join(dimensions)}) DO UPDATE SET {updates}",
+                delta[dimensions + measures].astype(object).itertuples(index=False, name=None))
+            # 이번 배치로 행이 모두 빠진 그룹은 제거
+            self.conn.executemany(
+                f"DELETE FROM {cube_table} WHERE {' AND '.join(f'{column} = ?' for column in dimensions)} "
+                f"AND {measures[0]} <= 0",
+                delta.loc[delta[measures[0]] < 0, dimensions].astype(object).itertuples(index=False, name=None))
+
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {fact_table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                facts.astype(object).itertuples(index=False, name=None))
+            self.conn.execute("DROP TABLE temp.batch_keys")
+
+    def rebuild(self, matches_df=None, stats_df=None):
+        """집계를 비우고 테이블 전체로 다시 만듦"""
+        with self._lock, self.conn:
+            for name in ('match_facts', 'match_cube', 'stat_facts', 'stat_cube', 'source_generations'):
+                self.conn.execute(f"DELETE FROM {name}")
+        self.apply('matches', matches_df)
+        self.apply('stats', stats_df)
+        logger.info("집계를 다시 만들었습니다 (경기 %s개, 통계 %s개)", self.fact_count('matches'), self.fact_count('stats'))
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def _summary(self, group_by, filters):
+        """match_cube를 group_by 컬럼으로 다시 묶은 요약 (filters: 컬럼 -> 값, None은 조건 없음)"""
+        conditions = [(column, value) for column, value in filters.items() if value is not None]
+        where = f"WHERE {' AND '.join(f'{column} = ?' for column, _ in conditions)}" if conditions else ''
+        select = ', '.join(group_by + [f"SUM({measure}) AS {measure}" for measure in MATCH_MEASURES])
+        df = self._query(f"SELECT {select} FROM match_cube {where} GROUP BY {', '.join(group_by)}",
+                         [value for _, value in conditions])
+        df['avg_rating'] = (df['rating_sum'] / df['rating_count']).where(df['rating_count'] > 0)
+        return _restore_missing(df.drop(columns=['rating_sum', 'rating_count']))
+
+    def player_summary(self, player_id=None, season=None):
+        """선수(와 시즌)별 경기 수, 출전 시간, 골, 도움, 카드, 평균 평점"""
+        return self._summary(['player_id', 'season'], {'player_id': player_id, 'season': season})
+
+    def team_summary(self, league_id=None, season=None):
+        """팀/리그/시즌별 합계"""
+        return self._summary(['team_id', 'league_id', 'season'], {'league_id': league_id, 'season': season})
+
+    def league_summary(self, season=None):
+        """리그/시즌별 합계"""
+        return self._summary(['league_id', 'season'], {'season': season})
+
+    def stat_summary(self, league_id=None, season=None):
+        """리그/시즌/통계 항목별 선수 수, 합계, 평균"""
+        conditions = [(column, value) for column, value in (('league_id', league_id), ('season', season)) if value is not None]
+        where = f"WHERE {' AND '.join(f'{column} = ?' for column, _ in conditions)}" if conditions else ''
+        df = self._query(f"SELECT * FROM stat_cube {where}", [value for _, value in conditions])
+        df['value_avg'] = (df['value_sum'] / df['value_count']).where(df['value_count'] > 0)
+        return _restore_missing(df)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+def _restore_missing(df):
+    """저장할 때 바꾼 빈 값을 다시 None으로"""
+    for column in ('player_id', 'team_id', 'league_id'):
+        if column in df:
+            df[column] = df[column].astype(object).where(df[column] != _MISSING_ID, None)
+    for column in ('season', 'title'):
+        if column in df:
+            df[column] = df[column].where(df[column] != _MISSING_TEXT, None)
+    return df
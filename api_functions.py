@@ -1,95 +1,208 @@
 import requests
 import json
+import logging
 import time
 import os
 import traceback
+import threading
 
-def fetch_player_data(player_id):
-    """선수 ID를 사용하여 FotMob API에서 데이터를 수집하는 함수"""
-    url = f"https://www.fotmob.com/api/playerData?id={player_id}"
-    
-    headers = {
-        'sec-ch-ua-platform': 'macOS',
-        'Referer': f'https://www.fotmob.com/players/{player_id}',
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
-        'sec-ch-ua': '"Chromium";v="134", "Not:A-Brand";v="24", "Google Chrome";v="134"',
-        'sec-ch-ua-mobile': '?0',
-        'x-mas': 'eyJib2R5Ijp7InVybCI6Ii9hcGkvcGxheWVyRGF0YT9pZD0yMTI4NjciLCJjb2RlIjoxNzQ0MjAxMTg1MjA4LCJmb28iOiJwcm9kdWN0aW9uOjYxNDNkZWVhMmM2ODdkNzBhOTU5MTZlY2YzOTIzZTk1ZmRlYjMzYWQtdW5kZWZpbmVkIn0sInNpZ25hdHVyZSI6IjEyRDkwQ0U1ODA4QTlDMUZDNTYxQkZDMTIyNTI5NDAxIn0='
-    }
-    
-    # 최대 재시도 횟수 설정
-    max_retries = 3
-    retry_delay = 2
-    
+import metrics
+from log_utils import get_logger, log_event
+from rate_control import RateController, parse_retry_after
+from raw_store import RawStore
+
+logger = get_logger('api')
+
+# API 기본 주소 (로컬 테스트 서버 등으로 바꿀 수 있음)
+API_BASE_URL = os.environ.get('FOTMOB_API_BASE_URL', 'https://www.fotmob.com').rstrip('/')
+
+# 요청 하나의 타임아웃(초)
+REQUEST_TIMEOUT = float(os.environ.get('FOTMOB_REQUEST_TIMEOUT', '15'))
+
+# 속도 제어기를 따로 설정하지 않았을 때 시작하는 초당 요청 수 (예전 1.5초 간격, 이후 AIMD로 올림)
+DEFAULT_REQUESTS_PER_SECOND = float(os.environ.get('FOTMOB_DEFAULT_RPS', 1 / 1.5))
+
+# 기본 제어기가 AIMD로 올릴 수 있는 초당 요청 수 상한 (0 이하이면 상한 없음)
+DEFAULT_MAX_REQUESTS_PER_SECOND = float(os.environ.get('FOTMOB_MAX_RPS', '2'))
+
+# 모든 요청 경로가 공유하는 속도 제어기 (처음 사용할 때 기본 설정으로 생성)
+_rate_controller = None
+
+# 원본 데이터 저장소 (처음 사용할 때 생성)
+_raw_store = None
+
+# 스레드별 HTTP 세션 (연결 재사용)
+_thread_local = threading.local()
+
+# 요청 하나당 최대 시도 횟수
+MAX_RETRIES = 5
+
+# fetch_json이 끝날 때마다 시도 기록을 넘겨받는 함수 (부하 테스트 등에서 사용)
+_fetch_observer = None
+
+def set_api_base_url(base_url):
+    """API 기본 주소 변경 (예: 로컬 대체 서버 'http://127.0.0.1:8765')"""
+    global API_BASE_URL
+    API_BASE_URL = base_url.rstrip('/')
+
+def set_fetch_observer(observer):
+    """요청이 끝날 때마다 observer(player_id, elapsed, attempts)를 호출하도록 설정 (None이면 해제)
+
+    attempts는 시도마다 (결과, 소요 시간) 목록. 결과는 'ok', 'not_found', 'http_429', 'http_5xx', 'http_error',
+    'json_error', 'timeout', 'connection_error', 'request_error' 중 하나.
+    """
+    global _fetch_observer
+    _fetch_observer = observer
+
+def get_rate_controller():
+    """fetch_json이 사용하는 전역 속도 제어기
+
+    기본 제어기는 DEFAULT_REQUESTS_PER_SECOND로 시작해 정상 응답이 이어지면 DEFAULT_MAX_REQUESTS_PER_SECOND까지
+    올리고 429/5xx면 내림 (실제 API에 제한 없이 요청하지 않도록).
+    """
+    global _rate_controller
+    if _rate_controller is None:
+        _rate_controller = RateController(DEFAULT_REQUESTS_PER_SECOND, max_rate=DEFAULT_MAX_REQUESTS_PER_SECOND)
+    return _rate_controller
+
+def set_rate_controller(controller):
+    """전역 속도 제어기 교체 (None이면 다음 요청 때 기본 제어기를 새로 만듦)"""
+    global _rate_controller
+    _rate_controller = controller
+
+def _get_session():
+    """현재 스레드의 requests 세션 반환"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = requests.Session()
+        _thread_local.session = session
+    return session
+
+def fetch_json(url, headers=None, player_id=None, timeout=None, max_retries=MAX_RETRIES):
+    """공유 속도 제어기를 거쳐 JSON을 요청 (404나 모든 재시도 실패 시 None)
+
+    429/5xx는 요청 수를 줄이고 Retry-After(없으면 지터를 더한 지수 백오프)만큼 기다린 뒤 재시도함.
+    timeout이 없으면 REQUEST_TIMEOUT 사용.
+    """
+    controller = get_rate_controller()
+    observer = _fetch_observer
+    attempts = [] if observer is not None else None
+    started = time.perf_counter()
+    data = _fetch_with_retries(url, headers, player_id, timeout or REQUEST_TIMEOUT, max_retries, controller, attempts)
+    if observer is not None:
+        observer(player_id, time.perf_counter() - started, attempts)
+    return data
+
+def _record_attempt(attempts, outcome, attempt_started):
+    metrics.FETCH_ATTEMPTS.labels(outcome=outcome).inc()
+    if attempts is not None:
+        attempts.append((outcome, time.perf_counter() - attempt_started if attempt_started is not None else 0.0))
+
+def _fetch_with_retries(url, headers, player_id, timeout, max_retries, controller, attempts):
+    """fetch_json의 재시도 루프 (attempts가 있으면 시도마다 결과와 소요 시간을 덧붙임)"""
     for attempt in range(max_retries):
+        retry_after = None
+        attempt_started = None
         try:
-            print(f"API 요청 시도 중... (시도 {attempt + 1}/{max_retries})")
-            response = requests.get(url, headers=headers, timeout=15)  # 타임아웃 추가
+            logger.debug("API 요청 시도 중... (ID %s, 시도 %d/%d)", player_id, attempt + 1, max_retries)
+            controller.acquire()
+            # 속도 제어기 대기 시간은 빼고 요청 시간만 기록
+            attempt_started = time.perf_counter()
+            with metrics.stage('fetch'):
+                response = _get_session().get(url, headers=headers, timeout=timeout)
+            metrics.DOWNLOADED_BYTES.inc(len(response.content))
             
             # 응답 상태 코드 확인
             if response.status_code == 200:
-                print(f"API 요청 성공: 상태 코드 {response.status_code}")
+                controller.record_success()
+                logger.debug("API 요청 성공: ID %s, 상태 코드 %d", player_id, response.status_code)
                 try:
-                    data = response.json()
+                    with metrics.stage('decode'):
+                        data = response.json()
+                    _record_attempt(attempts, 'ok', attempt_started)
                     return data
                 except json.JSONDecodeError as je:
-                    print(f"JSON 파싱 오류: {je}")
-                    print(f"응답 내용 미리보기: {response.text[:200]}...")
-                    if attempt == max_retries - 1:
-                        return None
+                    _record_attempt(attempts, 'json_error', attempt_started)
+                    log_event(logger, logging.WARNING, 'json_error', "JSON 파싱 오류 (ID %s): %s", player_id, je,
+                              player_id=player_id, attempt=attempt + 1)
+                    logger.debug("응답 내용 미리보기: %s...", response.text[:200])
             elif response.status_code == 404:
-                print(f"선수를 찾을 수 없음 (404): ID {player_id}는 유효하지 않은 것 같습니다.")
+                controller.record_success()
+                _record_attempt(attempts, 'not_found', attempt_started)
+                logger.debug("선수를 찾을 수 없음 (404): ID %s는 유효하지 않은 것 같습니다.", player_id)
                 return None  # 404는 재시도하지 않음
-            elif response.status_code == 429:
-                print(f"요청 한도 초과 (429): 속도 제한에 도달했습니다. 더 긴 대기 시간이 필요합니다.")
-                # 429 오류는 더 오래 대기
-                if attempt < max_retries - 1:
-                    longer_delay = retry_delay * 3
-                    print(f"{longer_delay}초 후에 재시도합니다...")
-                    time.sleep(longer_delay)
+            elif response.status_code == 429 or response.status_code >= 500:
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                controller.record_throttle(retry_after, response.status_code)
+                _record_attempt(attempts, 'http_429' if response.status_code == 429 else 'http_5xx', attempt_started)
+                if response.status_code == 429:
+                    log_event(logger, logging.WARNING, 'http_429', "요청 한도 초과 (429): 속도 제한에 도달했습니다. (ID %s)", player_id,
+                              player_id=player_id, attempt=attempt + 1, retry_after=retry_after)
                 else:
-                    return None
+                    log_event(logger, logging.WARNING, 'http_error', "API 오류: 상태 코드 %d (ID %s)", response.status_code, player_id,
+                              player_id=player_id, status_code=response.status_code, attempt=attempt + 1, retry_after=retry_after)
             else:
-                print(f"API 오류: 상태 코드 {response.status_code}")
-                # 다른 오류는 일반적인 지연으로 재시도
-                if attempt < max_retries - 1:
-                    print(f"{retry_delay}초 후에 재시도합니다...")
-                    time.sleep(retry_delay)
-                else:
-                    return None
+                controller.record_failure()
+                _record_attempt(attempts, 'http_error', attempt_started)
+                log_event(logger, logging.WARNING, 'http_error', "API 오류: 상태 코드 %d (ID %s)", response.status_code, player_id,
+                          player_id=player_id, status_code=response.status_code, attempt=attempt + 1)
         
         except requests.exceptions.Timeout:
-            print(f"API 요청 타임아웃")
-            if attempt < max_retries - 1:
-                print(f"{retry_delay}초 후에 재시도합니다...")
-                time.sleep(retry_delay)
-            else:
-                return None
+            controller.record_failure()
+            _record_attempt(attempts, 'timeout', attempt_started)
+            log_event(logger, logging.WARNING, 'timeout', "API 요청 타임아웃 (ID %s)", player_id,
+                      player_id=player_id, attempt=attempt + 1)
         
         except requests.exceptions.ConnectionError:
-            print(f"연결 오류: 네트워크 문제가 발생했습니다.")
-            if attempt < max_retries - 1:
-                print(f"{retry_delay}초 후에 재시도합니다...")
-                time.sleep(retry_delay)
-            else:
-                return None
+            controller.record_failure()
+            _record_attempt(attempts, 'connection_error', attempt_started)
+            log_event(logger, logging.WARNING, 'connection_error', "연결 오류: 네트워크 문제가 발생했습니다. (ID %s)", player_id,
+                      player_id=player_id, attempt=attempt + 1)
                 
         except requests.exceptions.RequestException as e:
-            print(f"API 요청 오류: {e}")
-            if attempt < max_retries - 1:
-                print(f"{retry_delay}초 후에 재시도합니다...")
-                time.sleep(retry_delay)
-            else:
-                return None
+            controller.record_failure()
+            _record_attempt(attempts, 'request_error', attempt_started)
+            log_event(logger, logging.WARNING, 'request_error', "API 요청 오류 (ID %s): %s", player_id, e,
+                      player_id=player_id, attempt=attempt + 1)
+        
+        if attempt < max_retries - 1:
+            metrics.FETCH_RETRIES.inc()
+            delay = controller.backoff_delay(attempt, retry_after)
+            logger.debug("%.1f초 후에 재시도합니다...", delay)
+            time.sleep(delay)
     
-    print(f"모든 재시도 실패: player ID {player_id}에 대한 데이터를 가져올 수 없습니다.")
+    log_event(logger, logging.ERROR, 'fetch_failed', "모든 재시도 실패: player ID %s에 대한 데이터를 가져올 수 없습니다.", player_id,
+              player_id=player_id)
     return None
 
-def save_raw_data(data, player_id):
-    """수집한 원본 데이터를 파일로 저장"""
-    os.makedirs('raw_data', exist_ok=True)
+def fetch_player_data(player_id):
+    """선수 ID를 사용하여 FotMob API에서 데이터를 수집하는 함수"""
+    url = f"{API_BASE_URL}/api/playerData?id={player_id}"
     
-    with open(f'raw_data/player_{player_id}.json', 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    headers = {
+        'sec-ch-ua-platform': 'macOS',
+        'Referer': f'https://www.fotmob.com/players/{player_id}',
+        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/134.0.0.0 Safari/537.36',
+        'sec-ch-ua': '"Chromium";v="134", "Not:A-Brand";v="24", "Google Chrome";v="134"',
+        'sec-ch-ua-mobile': '?0',
+        'x-mas': 'eyJib2R5Ijp7InVybCI6Ii9hcGkvcGxheWVyRGF0YT9pZD0yMTI4NjciLCJjb2RlIjoxNzQ0MjAxMTg1MjA4LCJmb28iOiJwcm9kdWN0aW9uOjYxNDNkZWVhMmM2ODdkNzBhOTU5MTZlY2YzOTIzZTk1ZmRlYjMzYWQtdW5kZWZpbmVkIn0sInNpZ25hdHVyZSI6IjEyRDkwQ0U1ODA4QTlDMUZDNTYxQkZDMTIyNTI5NDAxIn0='
+    }
     
-    print(f"Raw data for player {player_id} saved successfully")
\ No newline at end of file
+    return fetch_json(url, headers, player_id)
+
+def get_raw_store():
+    """원본 데이터 저장소 반환"""
+    global _raw_store
+    if _raw_store is None:
+        _raw_store = RawStore('raw_data')
+    return _raw_store
+
+def save_raw_data(data, player_id):
+    """수집한 원본 데이터를 압축해 내용 해시로 저장하고 해시 반환 (직전 스냅샷과 같으면 쓰지 않음)"""
+    with metrics.stage('raw_save'):
+        content_hash, added = get_raw_store().put_with_hash(player_id, data)
+    if added:
+        logger.debug("Raw data for player %s saved successfully", player_id)
+    else:
+        logger.debug("Raw data for player %s unchanged since last snapshot", player_id)
+    return content_hash
\ No newline at end of file
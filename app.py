@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 
+from dashboard_data import DashboardData
+
 # ✅ 1. 배경 이미지 + 버튼 스타일 CSS
 page_bg_css = '''
 <style>
@@ -35,30 +37,28 @@ st.markdown(page_bg_css, unsafe_allow_html=True)
 # ✅ 2. 제목
 st.title('⚽ 축구 선수 데이터 분석 대시보드')
 
-# ✅ 3. 데이터 불러오기
-@st.cache_data
-def load_data():
-    players = pd.read_csv("football_players_data_players.csv")
-    matches = pd.read_csv("football_players_data_matches.csv")
-    stats = pd.read_csv("football_players_data_stats.csv")
-    return players, matches, stats
+# ✅ 3. 데이터 불러오기 (시작할 때는 선수 목록만 읽고, 선수별 데이터는 선택할 때 인덱스로 읽음)
+@st.cache_resource
+def get_data():
+    return DashboardData("football_players_data")
 
-players_df, matches_df, stats_df = load_data()
+data = get_data()
+player_list_df = data.player_list()
 
 # ✅ 4. 선수 데이터 미리보기
 st.subheader('📋 선수 데이터 미리보기')
-st.dataframe(players_df.head())
+st.dataframe(pd.concat([data.player(player_id) for player_id in player_list_df['id'].head()], ignore_index=True)
+             if not player_list_df.empty else player_list_df)
 
-# ✅ 5. 선수 선택
-player_list = players_df['name'].tolist()
-selected_player = st.selectbox('🔍 선수 선택:', player_list)
+# ✅ 5. 선수 선택 (ID로 선택하고 이름으로 표시)
+player_names = dict(zip(player_list_df['id'], player_list_df['name']))
+player_id = st.selectbox('🔍 선수 선택:', list(player_names), format_func=lambda player_id: player_names[player_id])
+selected_player = player_names.get(player_id)
 
 # ✅ 6. 선택된 선수의 경기 데이터 + 버튼 기능
 if selected_player:
-    player_id = players_df[players_df['name'] == selected_player]['id'].values[0]
-
     if st.button(f"📊 {selected_player}의 경기 데이터 보기"):
-        player_matches = matches_df[matches_df['player_id'] == player_id]
+        player_matches = data.matches(player_id)
         st.subheader(f'📌 {selected_player}의 경기 데이터')
         st.dataframe(player_matches)
 
@@ -72,9 +72,18 @@ if selected_player:
         )
 
     if st.button(f"📈 {selected_player}의 주요 스탯 보기"):
-        player_stats = stats_df[stats_df['player_id'] == player_id]
+        # 통계 행렬이 있으면 항목별 컬럼과 90분당 값으로, 없으면 긴 형식 그대로 표시
+        player_stats = data.stats_wide(player_id)
+        if player_stats is None:
+            player_stats = data.stats(player_id)
         st.subheader(f"📍 {selected_player}의 주요 스탯")
         st.dataframe(player_stats)
 
+# ✅ 7. 리그/시즌 요약 (저장소 집계 테이블에서 읽음)
+league_summary_df = data.league_summary()
+if not league_summary_df.empty:
+    st.subheader('🏆 리그/시즌 요약')
+    st.dataframe(league_summary_df)
+
 # ✅ 외부 링크 버튼 예시
 st.link_button("🌐 FIFA 공식 홈페이지 가기", "https://www.fifa.com")
@@ -0,0 +1,203 @@
+import pandas as pd
+
+from data_extractors import extract_all_tables, extract_player_info, extract_match_data, extract_stats_data
+from payload_schema import decode_player_payload
+
+# 추출 함수가 만드는 행의 컬럼 순서 (선수별 DataFrame을 concat했을 때와 같은 순서)
+PLAYER_COLUMNS = [
+    'id', 'name', 'birth_date', 'team', 'team_id', 'position', 'is_captain',
+    'country', 'height', 'shirt', 'age', 'preferred_foot', 'market_value',
+]
+MATCH_COLUMNS = [
+    'player_id', 'match_id', 'match_date', 'league_id', 'league_name', 'team_id', 'team_name',
+    'opponent_team_id', 'opponent_team_name', 'is_home', 'home_score', 'away_score',
+    'minutes_played', 'goals', 'assists', 'yellow_cards', 'red_cards', 'rating',
+]
+STATS_COLUMNS = ['player_id', 'league_id', 'league_name', 'season', 'title', 'value']
+# extract_all_tables가 추가로 만드는 테이블의 컬럼 순서
+EXTRA_COLUMNS = {
+    'career': ['player_id', 'career_type', 'team_id', 'team_name', 'start_date', 'end_date', 'active',
+               'appearances', 'goals', 'assists'],
+    'seasons': ['player_id', 'season', 'tournament_id', 'tournament_name', 'entry_id'],
+    'traits': ['player_id', 'trait_group', 'key', 'title', 'value'],
+    'trophies': ['player_id', 'team_id', 'team_name', 'ccode', 'league_id', 'league_name', 'season', 'result'],
+}
+
+def _estimated_size(value):
+    """값 하나가 버퍼에서 차지하는 대략적인 바이트 수 (리스트 칸 포함)"""
+    if value is None or isinstance(value, bool):
+        return 8
+    if isinstance(value, str):
+        return 8 + 49 + len(value)
+    return 8 + 32
+
+class ColumnBuffers:
+    """테이블 하나의 행을 컬럼별 리스트에 이어 붙여 모아 두는 버퍼
+
+    행마다 DataFrame을 만들지 않고, 배치가 끝날 때 컬럼 리스트로 DataFrame(또는 Arrow 테이블)을 한 번만 만듦.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._data = {column: [] for column in self.columns}
+        self._length = 0
+        self._row_bytes = None
+        self._sampled_at = 0
+
+    def __len__(self):
+        return self._length
+
+    def append(self, row):
+        for column, values in self._data.items():
+            values.append(row.get(column))
+        self._length += 1
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def clear(self):
+        # 리스트를 새로 만들어 이미 내보낸 DataFrame과 메모리를 공유하지 않도록 함
+        self._data = {column: [] for column in self.columns}
+        self._length = 0
+        self._row_bytes = None
+        self._sampled_at = 0
+
+    def estimated_bytes(self):
+        """모아 둔 행이 차지하는 대략적인 메모리 (표본 행의 평균 크기 x 행 수)
+
+        행마다 크기를 재지 않고 행 수가 두 배가 될 때마다 최대 32행을 다시 표본으로 잼.
+        """
+        if not self._length:
+            return 0
+        if self._row_bytes is None or self._length >= self._sampled_at * 2:
+            sample = range(0, self._length, max(1, self._length // 32))
+            total = sum(_estimated_size(values[i]) for values in self._data.values() for i in sample)
+            self._row_bytes = total / len(sample)
+            self._sampled_at = self._length
+        return int(self._length * self._row_bytes)
+
+    def to_dataframe(self):
+        """모아 둔 행으로 DataFrame 하나 생성 (비어 있으면 None)"""
+        if not self._length:
+            return None
+        return pd.DataFrame(self._data, columns=self.columns)
+
+    def to_arrow(self, table):
+        """모아 둔 행으로 타입이 지정된 Arrow 테이블 생성 (pyarrow 필요, 비어 있으면 None)"""
+        df = self.to_dataframe()
+        if df is None:
+            return None
+        from parquet_sink import to_arrow_table
+        return to_arrow_table(table, df)
+
+class BatchExtractor:
+    """여러 선수의 추출 결과를 선수/경기/통계 컬럼 버퍼에 직접 모으는 배치 추출기"""
+
+    def __init__(self):
+        self.players = ColumnBuffers(PLAYER_COLUMNS)
+        self.matches = ColumnBuffers(MATCH_COLUMNS)
+        self.stats = ColumnBuffers(STATS_COLUMNS)
+
+    def __len__(self):
+        return len(self.players)
+
+    def add_rows(self, player_info, match_rows=None, stats_rows=None):
+        """이미 추출한 행들을 버퍼에 추가"""
+        if player_info:
+            self.players.append(player_info)
+        if match_rows:
+            self.matches.extend(match_rows)
+        if stats_rows:
+            self.stats.extend(stats_rows)
+
+    def add_payload(self, payload):
+        """payload(dict, JSON 바이트 또는 PlayerPayload) 하나를 한 번 디코딩해 세 테이블 행을 추가
+
+        선수 기본 정보 추출 결과(실패 시 None)를 반환함.
+        """
+        payload = decode_player_payload(payload)
+        player_info = extract_player_info(payload)
+        self.add_rows(player_info, extract_match_data(payload), extract_stats_data(payload))
+        return player_info
+
+    def _buffers(self):
+        return [self.players, self.matches, self.stats]
+
+    def is_empty(self):
+        return not (len(self.players) or len(self.matches) or len(self.stats))
+
+    def row_count(self):
+        """모든 테이블 버퍼의 행 수 합"""
+        return sum(len(buffer) for buffer in self._buffers())
+
+    def estimated_bytes(self):
+        """모든 테이블 버퍼의 대략적인 메모리 크기"""
+        return sum(buffer.estimated_bytes() for buffer in self._buffers())
+
+    def to_frames(self):
+        """(players_df, matches_df, stats_df) 반환 (비어 있는 테이블은 None)"""
+        return self.players.to_dataframe(), self.matches.to_dataframe(), self.stats.to_dataframe()
+
+    def to_arrow_tables(self):
+        """테이블 이름 -> Arrow 테이블 사전 반환 (pyarrow 필요)"""
+        return {
+            'players': self.players.to_arrow('players'),
+            'matches': self.matches.to_arrow('matches'),
+            'stats': self.stats.to_arrow('stats'),
+        }
+
+    def clear(self):
+        self.players.clear()
+        self.matches.clear()
+        self.stats.clear()
+
+class MultiTableExtractor(BatchExtractor):
+    """선수/경기/통계에 더해 경력/시즌 목록/특성/트로피까지 한 번의 순회로 모으는 배치 추출기
+
+    to_frames()는 BatchExtractor와 같이 세 테이블을 반환하므로 기존 저장 경로에 그대로 넘길 수 있고,
+    추가 테이블은 extra_frames()로 가져옴.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.extras = {table: ColumnBuffers(columns) for table, columns in EXTRA_COLUMNS.items()}
+
+    def add_extra_rows(self, extra_rows):
+        """테이블 이름 -> 행 목록 사전을 추가 테이블 버퍼에 추가"""
+        for table, rows in (extra_rows or {}).items():
+            if rows:
+                self.extras[table].extend(rows)
+
+    def add_tables(self, tables):
+        """extract_all_tables 결과 하나를 모든 버퍼에 추가"""
+        self.add_rows(tables['players'], tables['matches'], tables['stats'])
+        self.add_extra_rows({table: tables[table] for table in self.extras})
+
+    def add_payload(self, payload):
+        """payload 하나를 한 번 디코딩/순회해 모든 테이블 행을 추가하고 선수 기본 정보(실패 시 None) 반환"""
+        tables = extract_all_tables(payload)
+        self.add_tables(tables)
+        return tables['players']
+
+    def _buffers(self):
+        return super()._buffers() + list(self.extras.values())
+
+    def is_empty(self):
+        return super().is_empty() and not any(len(buffer) for buffer in self.extras.values())
+
+    def extra_frames(self):
+        """추가 테이블 이름 -> DataFrame 사전 (비어 있는 테이블은 None)"""
+        return {table: buffer.to_dataframe() for table, buffer in self.extras.items()}
+
+    def clear(self):
+        super().clear()
+        for buffer in self.extras.values():
+            buffer.clear()
+
+def extract_batch(payloads):
+    """여러 payload를 한 번에 추출해 테이블마다 DataFrame 하나씩 반환"""
+    extractor = BatchExtractor()
+    for payload in payloads:
+        extractor.add_payload(payload)
+    return extractor.to_frames()
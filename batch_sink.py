@@ -0,0 +1,83 @@
+import os
+
+from batch_extractor import BatchExtractor, MultiTableExtractor
+from data_processor import save_batch
+from log_utils import get_logger
+
+logger = get_logger('sink')
+
+# 저장하기 전까지 메모리에 모아 둘 최대 행 수 / 메모리(MB) (환경 변수로 바꿀 수 있음)
+DEFAULT_MAX_ROWS = int(os.environ.get('KICKSTATS_BATCH_MAX_ROWS') or 100_000)
+DEFAULT_MAX_BYTES = int(float(os.environ.get('KICKSTATS_BATCH_MAX_MB') or 64) * 2 ** 20)
+
+_REASONS = {'players': '선수 수', 'rows': '행 수', 'bytes': '메모리', 'final': '마지막 저장'}
+
+class BatchSink:
+    """추출한 행을 모았다가 예산을 넘으면 저장소에 저장하고 메모리에서 비우는 sink
+
+    - max_players: 유효 선수를 이만큼 모으면 저장 (None이면 선수 수로는 저장하지 않음)
+    - max_rows / max_bytes: 모든 테이블의 행 수 합 / 대략적인 메모리 크기가 넘으면 저장 (None이면 제한 없음)
+    저장은 save_batch로 저장 엔진에 새 세그먼트를 추가하므로 (임시 파일에 쓴 뒤 이름 변경) 중간에 중단되어도
+    이미 저장한 데이터가 깨지지 않고, 저장한 행은 버퍼에서 바로 비워 메모리 사용량이 예산 안에서 일정함.
+    저장에 실패한 행은 버퍼에 남겨 두고 다음 저장 때 다시 시도함.
+    on_flush(saved)를 주면 저장할 때마다 호출 (저장 후 지문 기록 등).
+    """
+
+    def __init__(self, base_filename='football_players_data', sqlite_path=None, extra_tables=False,
+                 max_players=None, max_rows=DEFAULT_MAX_ROWS, max_bytes=DEFAULT_MAX_BYTES, on_flush=None):
+        self.base_filename = base_filename
+        self.sqlite_path = sqlite_path
+        self.max_players = max_players
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.on_flush = on_flush
+        self.batch = MultiTableExtractor() if extra_tables else BatchExtractor()
+        self.players = 0
+        self.stats = {'flushes': 0, 'failed_flushes': 0, 'rows': 0, 'peak_rows': 0, 'peak_bytes': 0}
+
+    def add(self, player_info, match_rows=None, stats_rows=None, extra_rows=None):
+        """유효 선수 한 명의 행을 추가하고 예산을 넘었으면 저장 (저장했으면 True)"""
+        self.batch.add_rows(player_info, match_rows, stats_rows)
+        if extra_rows:
+            self.batch.add_extra_rows(extra_rows)
+        self.players += 1
+
+        reason = self._over_budget()
+        if reason is None:
+            return False
+        self.flush(reason)
+        return True
+
+    def _over_budget(self):
+        if self.max_players and self.players >= self.max_players:
+            return 'players'
+        if self.max_rows and self.batch.row_count() >= self.max_rows:
+            return 'rows'
+        if self.max_bytes and self.batch.estimated_bytes() >= self.max_bytes:
+            return 'bytes'
+        return None
+
+    def is_empty(self):
+        return self.batch.is_empty()
+
+    def flush(self, reason='final'):
+        """모아 둔 행을 저장소(와 SQLite)에 저장하고 버퍼를 비움 (저장에 성공하면 True, 실패하면 버퍼 유지)"""
+        rows, size = self.batch.row_count(), self.batch.estimated_bytes()
+        self.stats['peak_rows'] = max(self.stats['peak_rows'], rows)
+        self.stats['peak_bytes'] = max(self.stats['peak_bytes'], size)
+        logger.info("선수 %d명의 %d개 행 (약 %.1fMB)을 저장소에 저장합니다 (%s)",
+                    self.players, rows, size / 2 ** 20, _REASONS.get(reason, reason))
+
+        saved = save_batch(self.batch, self.base_filename, self.sqlite_path)
+        if saved:
+            self.players = 0
+            self.stats['flushes'] += 1
+            self.stats['rows'] += rows
+        else:
+            # 버퍼를 비우지 않았으므로 예산을 넘은 채로 남아 다음 add에서 다시 저장을 시도함
+            self.stats['failed_flushes'] += 1
+            logger.error("저장에 실패해 선수 %d명의 %d개 행을 버퍼에 남겨 두고 다음 저장 때 다시 시도합니다",
+                         self.players, rows)
+        if self.on_flush is not None:
+            self.on_flush(saved)
+        return saved
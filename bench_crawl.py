@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+
+import api_functions
+import data_processor
+from fake_fotmob_server import start_server
+from id_explorer import explore_player_ids_concurrent
+from log_utils import setup_logging
+from rate_control import RateController
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+
+def reset_work_state():
+    """현재 디렉터리 기준으로 장부, 저장 엔진, 원본 저장소를 다시 열도록 프로세스 전역 객체를 비움"""
+    data_processor.configure_processed_ledger('processed_player_ids.csv')
+    data_processor._storage_engines.clear()
+    for stores in (data_processor._fingerprint_stores, data_processor._aggregate_cubes):
+        for store in stores.values():
+            store.close()
+        stores.clear()
+    data_processor._stats_matrices.clear()
+    api_functions._raw_store = None
+
+def run_once(base_url, start_id, count, concurrency, requests_per_second):
+    """임시 디렉터리에서 탐색을 한 번 실행하고 (소요 시간, 결과 요약) 반환"""
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        api_functions.set_api_base_url(base_url)
+        # 실행마다 임시 디렉터리의 새 장부와 저장소 사용
+        reset_work_state()
+        if not requests_per_second:
+            # 로컬 서버이므로 기본 속도 대신 제한 없이 시작
+            api_functions.set_rate_controller(RateController(burst=concurrency))
+        try:
+            started = time.perf_counter()
+            summary = explore_player_ids_concurrent(
+                start_id, start_id + count - 1,
+                batch_size=50,
+                concurrency=concurrency,
+                requests_per_second=requests_per_second,
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            api_functions.set_rate_controller(None)
+            reset_work_state()
+            os.chdir(original_cwd)
+    return elapsed, summary
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 대체 서버를 이용한 동시 탐색 처리량 측정')
+    parser.add_argument('--count', type=int, default=200, help='탐색할 ID 개수')
+    parser.add_argument('--start-id', type=int, default=900000)
+    parser.add_argument('--latency', type=float, default=0.05, help='서버 응답 지연(초)')
+    parser.add_argument('--valid-ratio', type=float, default=0.1)
+    parser.add_argument('--rps', type=float, default=0, help='초당 요청 수 제한 (0이면 제한 없음)')
+    parser.add_argument('--concurrency', default='1,2,4,8,16')
+    args = parser.parse_args()
+
+    # 탐색 과정의 로그는 측정에서 제외
+    setup_logging('ERROR')
+
+    server, base_url = start_server(raw_dir=RAW_DIR, latency=args.latency, valid_ratio=args.valid_ratio)
+    try:
+        print(f"서버: {base_url}, 지연: {args.latency}s, 유효 비율: {args.valid_ratio}, ID 개수: {args.count}")
+        print(f"{'동시성':>6} {'소요(초)':>10} {'ID/초':>10} {'유효':>6} {'무효':>6} {'오류':>6}")
+
+        baseline = None
+        for concurrency in [int(c) for c in args.concurrency.split(',')]:
+            elapsed, summary = run_once(base_url, args.start_id, args.count, concurrency, args.rps)
+            throughput = args.count / elapsed
+            baseline = baseline or throughput
+            print(f"{concurrency:>6} {elapsed:>10.2f} {throughput:>10.1f} "
+                  f"{summary['valid']:>6} {summary['invalid']:>6} {summary['errors']:>6}"
+                  f"  (x{throughput / baseline:.1f})")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+import payload_schema
+from data_extractors import extract_player_info, extract_match_data, extract_stats_data
+from log_utils import setup_logging
+from payload_schema import decode_player_payload
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+
+def _time_per_payload(func, payloads, repeat):
+    """payload 하나당 평균 소요 시간(마이크로초)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            func(payload)
+    return (time.perf_counter() - started) / (repeat * len(payloads)) * 1e6
+
+def _extract_all(payload):
+    extract_player_info(payload)
+    extract_match_data(payload)
+    extract_stats_data(payload)
+
+def main():
+    parser = argparse.ArgumentParser(description='원본 payload 디코딩/추출 시간 비교')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    # 추출 함수의 경고 로그는 측정에서 제외
+    setup_logging('ERROR')
+
+    raw_payloads = []
+    for path in sorted(glob.glob(os.path.join(RAW_DIR, 'player_*.json'))):
+        with open(path, 'rb') as f:
+            # API 응답과 같은 공백 없는 JSON으로 맞춤
+            raw_payloads.append(json.dumps(json.loads(f.read()), ensure_ascii=False).encode('utf-8'))
+
+    decoder = 'msgspec' if payload_schema.msgspec is not None else ('orjson' if payload_schema.orjson is not None else 'json')
+    print(f"payload {len(raw_payloads)}개, 평균 크기 {sum(map(len, raw_payloads)) // len(raw_payloads)} 바이트, 타입 디코더: {decoder}")
+
+    # 이전: response.json()처럼 전체를 dict로 만든 뒤 세 추출 함수가 각각 dict를 탐색
+    before_decode = _time_per_payload(json.loads, raw_payloads, args.repeat)
+    dict_payloads = [json.loads(raw) for raw in raw_payloads]
+    before_extract = _time_per_payload(_extract_all, dict_payloads, args.repeat)
+
+    # 이후: 필요한 필드만 한 번 디코딩/검증한 뒤 세 추출 함수가 함께 사용
+    after_decode = _time_per_payload(decode_player_payload, raw_payloads, args.repeat)
+    typed_payloads = [decode_player_payload(raw) for raw in raw_payloads]
+    after_extract = _time_per_payload(_extract_all, typed_payloads, args.repeat)
+
+    print(f"{'':<28}{'디코딩(us)':>12}{'추출(us)':>12}{'합계(us)':>12}")
+    print(f"{'이전 (json.loads + dict)':<28}{before_decode:>12.1f}{before_extract:>12.1f}{before_decode + before_extract:>12.1f}")
+    print(f"{'이후 (타입 디코더)':<28}{after_decode:>12.1f}{after_extract:>12.1f}{after_decode + after_extract:>12.1f}")
+    print(f"속도 향상: x{(before_decode + before_extract) / (after_decode + after_extract):.1f}")
+
+if __name__ == "__main__":
+    main()
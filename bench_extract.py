@@ -0,0 +1,90 @@
+import argparse
+import glob
+import json
+import os
+import time
+
+from batch_extractor import BatchExtractor, MultiTableExtractor
+from data_extractors import (EXTRA_TABLE_EXTRACTORS, extract_all_tables, extract_match_data, extract_player_info,
+                             extract_stats_data)
+from log_utils import setup_logging
+from payload_schema import decode_full_payload, decode_player_payload
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+
+def _time_per_payload(func, payloads, repeat):
+    """payload 하나당 평균 소요 시간(마이크로초)"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            func(payload)
+    return (time.perf_counter() - started) / (repeat * len(payloads)) * 1e6
+
+def _three_functions(payload):
+    """현재 방식: 세 추출 함수를 각각 호출 (함수마다 id 확인과 구역 탐색)"""
+    extract_player_info(payload)
+    extract_match_data(payload)
+    extract_stats_data(payload)
+
+def _extra_passes(payload):
+    """추가 테이블을 테이블마다 따로 순회"""
+    for extract in EXTRA_TABLE_EXTRACTORS.values():
+        extract(payload)
+
+def _separate_passes(raw):
+    """단일 순회가 없을 때: 세 함수 + 추가 테이블용 디코딩과 테이블별 순회"""
+    _three_functions(decode_player_payload(raw))
+    _extra_passes(decode_full_payload(raw))
+
+def main():
+    parser = argparse.ArgumentParser(description='세 추출 함수와 단일 순회 다중 테이블 추출기의 시간 비교')
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    # 추출 함수의 경고 로그는 측정에서 제외
+    setup_logging('ERROR')
+
+    raw_payloads = []
+    for path in sorted(glob.glob(os.path.join(RAW_DIR, 'player_*.json'))):
+        with open(path, 'rb') as f:
+            # API 응답과 같은 공백 없는 JSON으로 맞춤
+            raw_payloads.append(json.dumps(json.loads(f.read()), ensure_ascii=False).encode('utf-8'))
+
+    tables = [extract_all_tables(raw) for raw in raw_payloads]
+    rows = {table: sum(len(t[table]) if isinstance(t[table], list) else t[table] is not None for t in tables)
+            for table in tables[0]}
+    print(f"payload {len(raw_payloads)}개, 테이블별 행 수: {rows}")
+
+    player_payloads = [decode_player_payload(raw) for raw in raw_payloads]
+    full_payloads = [decode_full_payload(raw) for raw in raw_payloads]
+    repeat = args.repeat
+    decode_player = _time_per_payload(decode_player_payload, raw_payloads, repeat)
+    decode_full = _time_per_payload(decode_full_payload, raw_payloads, repeat)
+    three = _time_per_payload(_three_functions, player_payloads, repeat)
+    extra = _time_per_payload(_extra_passes, full_payloads, repeat)
+    single = _time_per_payload(extract_all_tables, full_payloads, repeat)
+
+    # (이름, 테이블 수, 디코딩, 추출)
+    results = [
+        ('세 함수 (현재)', 3, decode_player, three),
+        ('세 함수 + 추가 테이블 따로', 7, decode_player + decode_full, three + extra),
+        ('단일 순회', 7, decode_full, single),
+    ]
+    print(f"{'방식':<24}{'테이블':>8}{'디코딩(us)':>12}{'추출(us)':>12}{'합계(us)':>12}")
+    for name, table_count, decode, extract in results:
+        print(f"{name:<24}{table_count:>8}{decode:>12.1f}{extract:>12.1f}{decode + extract:>12.1f}")
+
+    # 배치 버퍼에 모으는 비용까지 포함한 전체 (JSON 바이트 입력)
+    def batch_add(extractor_class):
+        def run(raw):
+            extractor_class().add_payload(raw)
+        return run
+
+    separate = _time_per_payload(_separate_passes, raw_payloads, repeat)
+    batch = _time_per_payload(batch_add(BatchExtractor), raw_payloads, repeat)
+    multi = _time_per_payload(batch_add(MultiTableExtractor), raw_payloads, repeat)
+    print(f"JSON 바이트 입력 전체: 따로 순회 {separate:.1f}us, 단일 순회 {decode_full + single:.1f}us "
+          f"(x{separate / (decode_full + single):.2f}), BatchExtractor(3개) {batch:.1f}us, MultiTableExtractor(7개) {multi:.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import numpy as np
+
+import api_functions
+from bench_crawl import reset_work_state
+from fake_fotmob_server import FakeFotMobServer, start_server
+from id_explorer import explore_player_ids, explore_player_ids_concurrent
+from log_utils import setup_logging
+from rate_control import RateController
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+
+# 서버가 응답해 재시도가 끝나는 결과
+FINAL_OUTCOMES = ('ok', 'not_found')
+
+class FetchRecorder:
+    """api_functions.set_fetch_observer로 등록해 ID별 소요 시간과 시도별 결과를 모음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.fetch_seconds = []
+        self.attempt_seconds = []
+        self.outcomes = Counter()
+        self.retried_ids = 0
+        self.failed_ids = 0
+
+    def __call__(self, player_id, elapsed, attempts):
+        with self._lock:
+            self.fetch_seconds.append(elapsed)
+            for outcome, seconds in attempts:
+                self.outcomes[outcome] += 1
+                self.attempt_seconds.append(seconds)
+            if len(attempts) > 1:
+                self.retried_ids += 1
+            if not attempts or attempts[-1][0] not in FINAL_OUTCOMES:
+                self.failed_ids += 1
+
+    def report(self):
+        with self._lock:
+            attempts = sum(self.outcomes.values())
+            return {
+                'fetches': len(self.fetch_seconds),
+                'attempts': attempts,
+                'retries': attempts - len(self.fetch_seconds),
+                'retried_ids': self.retried_ids,
+                'failed_ids': self.failed_ids,
+                'outcomes': dict(self.outcomes),
+                'fetch_latency': _percentiles(self.fetch_seconds),
+                'attempt_latency': _percentiles(self.attempt_seconds),
+            }
+
+def _percentiles(values):
+    """p50/p90/p99/최댓값(초). 값이 없으면 빈 dict"""
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(max(values))}
+
+def run_load(base_url, start_id, count, mode='concurrent', concurrency=8, requests_per_second=0,
+             batch_size=50, strategy='full', request_timeout=2.0):
+    """임시 디렉터리에서 실제 탐색기를 base_url에 대해 한 번 실행하고 결과 보고서 반환"""
+    recorder = FetchRecorder()
+    original_cwd = os.getcwd()
+    original_timeout = api_functions.REQUEST_TIMEOUT
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        api_functions.set_api_base_url(base_url)
+        api_functions.REQUEST_TIMEOUT = request_timeout
+        api_functions.set_fetch_observer(recorder)
+        # 실행마다 임시 디렉터리의 새 장부와 저장소 사용
+        reset_work_state()
+        try:
+            started = time.perf_counter()
+            end_id = start_id + count - 1
+            if mode == 'sequential':
+                # 시작 간격이 0이면 제한 없이 시작해 429/5xx부터 조절
+                delay = 1 / requests_per_second if requests_per_second else 0
+                summary = explore_player_ids(start_id, end_id, batch_size, delay, strategy=strategy)
+            else:
+                if not requests_per_second:
+                    # 로컬 서버이므로 기본 속도 대신 제한 없이 시작해 429/5xx부터 조절
+                    api_functions.set_rate_controller(RateController(burst=concurrency))
+                summary = explore_player_ids_concurrent(start_id, end_id, batch_size, concurrency,
+                                                        requests_per_second, strategy=strategy)
+            elapsed = time.perf_counter() - started
+        finally:
+            api_functions.set_fetch_observer(None)
+            api_functions.set_rate_controller(None)
+            api_functions.REQUEST_TIMEOUT = original_timeout
+            reset_work_state()
+            os.chdir(original_cwd)
+
+    report = recorder.report()
+    report.update(elapsed=elapsed, ids_per_second=count / elapsed,
+                  attempts_per_second=report['attempts'] / elapsed)
+    if summary:
+        report['crawl'] = {key: summary.get(key) for key in ('checked', 'valid', 'invalid', 'errors')}
+    return report
+
+def _format_latency(latency):
+    if not latency:
+        return '-'
+    return ' / '.join(f"{latency[key] * 1000:.0f}" for key in ('p50', 'p90', 'p99', 'max'))
+
+def print_report(report, server_stats=None):
+    print(f"소요 {report['elapsed']:.2f}초, {report['ids_per_second']:.1f} ID/초, 시도 {report['attempts_per_second']:.1f}건/초")
+    if 'crawl' in report:
+        crawl = report['crawl']
+        print(f"탐색 결과: 검사 {crawl['checked']}, 유효 {crawl['valid']}, 무효 {crawl['invalid']}, 오류 {crawl['errors']}")
+    print(f"요청 {report['fetches']}건, 시도 {report['attempts']}회, 재시도 {report['retries']}회 "
+          f"(재시도한 ID {report['retried_ids']}개, 끝내 실패한 ID {report['failed_ids']}개)")
+    print("시도 결과: " + ', '.join(f"{outcome} {count}" for outcome, count in sorted(report['outcomes'].items())))
+    print(f"{'지연(ms)':<28}{'p50 / p90 / p99 / max':>24}")
+    print(f"{'ID별 (재시도, 대기 포함)':<28}{_format_latency(report['fetch_latency']):>24}")
+    print(f"{'시도별 (응답 시간)':<28}{_format_latency(report['attempt_latency']):>24}")
+    if server_stats:
+        print("서버 통계: " + ', '.join(f"{key} {value}" for key, value in server_stats.items()))
+
+def main():
+    parser = argparse.ArgumentParser(description='로컬 대체 서버에 실제 탐색기를 돌려 처리량, 지연 백분위, 재시도 수를 측정')
+    parser.add_argument('--base-url', help='이미 실행 중인 서버 주소 (없으면 로컬 대체 서버를 띄움)')
+    parser.add_argument('--count', type=int, default=300, help='탐색할 ID 개수')
+    parser.add_argument('--start-id', type=int, default=900000)
+    parser.add_argument('--mode', choices=('concurrent', 'sequential'), default='concurrent',
+                        help='explore_player_ids_concurrent 또는 explore_player_ids')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--rps', type=float, default=0, help='탐색기의 초당 요청 수 제한 (0이면 제한 없이 AIMD)')
+    parser.add_argument('--strategy', choices=('full', 'adaptive', 'adaptive_backfill'), default='full')
+    parser.add_argument('--request-timeout', type=float, default=2.0, help='클라이언트 요청 타임아웃(초)')
+    # 서버 설정
+    parser.add_argument('--latency', type=float, default=0.05, help='평균 응답 지연(초)')
+    parser.add_argument('--latency-dist', default='lognormal', choices=FakeFotMobServer.LATENCY_DISTRIBUTIONS)
+    parser.add_argument('--latency-sigma', type=float, default=0.8)
+    parser.add_argument('--valid-ratio', type=float, default=0.1, help='유효한 ID 비율 (나머지는 404)')
+    parser.add_argument('--server-rps', type=float, help='서버가 허용하는 초당 요청 수 (넘으면 429)')
+    parser.add_argument('--retry-after', type=int, help='429 응답의 Retry-After 값(초)')
+    parser.add_argument('--error-ratio', type=float, default=0.0, help='503 비율')
+    parser.add_argument('--timeout-ratio', type=float, default=0.0, help='응답하지 않을 요청 비율')
+    parser.add_argument('--malformed-ratio', type=float, default=0.0, help='잘린 JSON 비율')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='결과를 JSON으로 저장할 경로')
+    args = parser.parse_args()
+
+    # 탐색 과정의 로그는 측정에서 제외 (실패한 ID는 보고서에 집계)
+    setup_logging('CRITICAL')
+
+    server = None
+    base_url = args.base_url
+    if base_url is None:
+        server, base_url = start_server(
+            raw_dir=RAW_DIR, latency=args.latency, valid_ratio=args.valid_ratio, seed=args.seed,
+            max_rps=args.server_rps, retry_after=args.retry_after, error_ratio=args.error_ratio,
+            latency_dist=args.latency_dist, latency_sigma=args.latency_sigma,
+            timeout_ratio=args.timeout_ratio, timeout_delay=args.request_timeout * 2,
+            malformed_ratio=args.malformed_ratio)
+        print(f"서버: {base_url}, 지연 {args.latency_dist} 평균 {args.latency}s, 유효 비율 {args.valid_ratio}, "
+              f"429 한도 {args.server_rps or '없음'}, 503 {args.error_ratio}, 타임아웃 {args.timeout_ratio}, "
+              f"잘린 JSON {args.malformed_ratio}")
+    else:
+        print(f"서버: {base_url}")
+    print(f"탐색: {args.mode}, ID {args.count}개, 동시성 {args.concurrency}, 초당 제한 {args.rps or '없음'}, "
+          f"타임아웃 {args.request_timeout}s")
+
+    try:
+        report = run_load(base_url, args.start_id, args.count, args.mode, args.concurrency, args.rps,
+                          strategy=args.strategy, request_timeout=args.request_timeout)
+        server_stats = dict(server.stats) if server is not None else None
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    print_report(report, server_stats)
+    if args.output:
+        report['server'] = server_stats
+        report['args'] = vars(args)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"결과를 '{args.output}'에 저장했습니다")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import argparse
+import os
+import tempfile
+import time
+
+from api_functions import set_api_base_url, set_rate_controller
+from bench_crawl import reset_work_state
+from fake_fotmob_server import start_server
+from id_explorer import explore_player_ids_concurrent
+from log_utils import setup_logging
+from rate_control import RateController
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+
+def run_once(server, base_url, start_id, count, concurrency, controller):
+    """임시 디렉터리에서 주어진 속도 제어기로 탐색을 한 번 실행하고 (소요 시간, 결과 요약, 서버 통계) 반환"""
+    original_cwd = os.getcwd()
+    server.reset_stats()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        set_api_base_url(base_url)
+        # 실행마다 임시 디렉터리의 새 장부와 저장소 사용
+        reset_work_state()
+        set_rate_controller(controller)
+        try:
+            started = time.perf_counter()
+            # requests_per_second=0이면 파이프라인이 속도 제어기를 바꾸지 않음
+            summary = explore_player_ids_concurrent(
+                start_id, start_id + count - 1,
+                batch_size=50,
+                concurrency=concurrency,
+                requests_per_second=0,
+            )
+            elapsed = time.perf_counter() - started
+        finally:
+            reset_work_state()
+            set_rate_controller(None)
+            os.chdir(original_cwd)
+    return elapsed, summary, dict(server.stats)
+
+def main():
+    parser = argparse.ArgumentParser(description='속도 제한을 거는 로컬 대체 서버에서 고정 속도와 AIMD 속도 조절 비교')
+    parser.add_argument('--count', type=int, default=200, help='탐색할 ID 개수')
+    parser.add_argument('--start-id', type=int, default=900000)
+    parser.add_argument('--latency', type=float, default=0.02, help='서버 응답 지연(초)')
+    parser.add_argument('--valid-ratio', type=float, default=0.1)
+    parser.add_argument('--server-rps', type=float, default=40, help='서버가 허용하는 초당 요청 수')
+    parser.add_argument('--retry-after', type=int, help='429 응답의 Retry-After 값(초, 없으면 헤더 없음)')
+    parser.add_argument('--error-ratio', type=float, default=0.0, help='503을 돌려줄 요청 비율')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--fixed-rates', default='20,80', help='비교할 고정 초당 요청 수 목록')
+    args = parser.parse_args()
+
+    # 탐색 과정의 로그는 측정에서 제외
+    setup_logging('ERROR')
+
+    server, base_url = start_server(raw_dir=RAW_DIR, latency=args.latency, valid_ratio=args.valid_ratio)
+    server.config.update(max_rps=args.server_rps, retry_after=args.retry_after, error_ratio=args.error_ratio)
+
+    # 실패 응답이 이어져도 비교 중에는 서킷을 열지 않음 (열리면 측정 시간 대부분이 대기 시간이 됨)
+    no_circuit = {'failure_threshold': 10 ** 9, 'backoff_base': 0.25, 'seed': 0}
+    candidates = [(f"고정 {rate:g}/s", RateController(rate, burst=args.concurrency, adaptive=False, **no_circuit))
+                  for rate in (float(r) for r in args.fixed_rates.split(','))]
+    candidates.append(("AIMD", RateController(burst=args.concurrency, **no_circuit)))
+
+    try:
+        print(f"서버: {base_url}, 허용 {args.server_rps:g}/s, Retry-After: {args.retry_after}, "
+              f"503 비율: {args.error_ratio}, ID 개수: {args.count}, 동시성: {args.concurrency}")
+        print(f"{'방식':>12} {'소요(초)':>10} {'ID/초':>8} {'요청':>6} {'429':>6} {'503':>6} {'오류 ID':>8} {'최종 속도':>10}")
+
+        for name, controller in candidates:
+            elapsed, summary, stats = run_once(server, base_url, args.start_id, args.count, args.concurrency, controller)
+            final_rate = controller.snapshot()['rate']
+            print(f"{name:>12} {elapsed:>10.2f} {args.count / elapsed:>8.1f} {stats['requests']:>6} "
+                  f"{stats['throttled']:>6} {stats['errors']:>6} {summary['errors']:>8} "
+                  f"{final_rate if final_rate is None else round(final_rate, 1)!s:>10}")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+import argparse
+import gc
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+import data_processor
+from bench_crawl import reset_work_state
+from data_extractors import extract_all_tables, extract_match_data, extract_player_info, extract_stats_data
+from log_utils import setup_logging
+from storage_engine import StorageEngine
+
+RAW_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'raw_data')
+# 합성 선수 ID 시작 값 (실제 선수 ID와 겹치지 않도록 큰 값 사용)
+SYNTHETIC_START_ID = 50_000_000
+
+def load_seed_payloads(raw_dir=RAW_DIR):
+    """raw_data의 선수 payload를 dict 목록으로 읽음 (합성 데이터의 원본)"""
+    seeds = []
+    for path in sorted(glob.glob(os.path.join(raw_dir, 'player_*.json'))):
+        with open(path, 'r', encoding='utf-8') as f:
+            seeds.append(json.load(f))
+    if not seeds:
+        raise SystemExit(f"'{raw_dir}'에 선수 payload가 없습니다")
+    return seeds
+
+def synthetic_payload(seeds, index):
+    """index번째 합성 선수 payload (원본을 돌아가며 쓰고 id/이름만 바꿈, 하위 구조는 원본과 공유)"""
+    seed = seeds[index % len(seeds)]
+    payload = dict(seed)
+    payload['id'] = SYNTHETIC_START_ID + index
+    payload['name'] = f"{seed.get('name')} #{index}"
+    return payload
+
+def synthetic_tables(seeds, count, start=0):
+    """start번째부터 합성 선수 count명의 (players, matches, stats) 데이터프레임
+
+    원본마다 한 번만 추출하고 행을 복제해 player_id만 바꾸므로 10만 명 규모도 빠르게 만듦.
+    """
+    seed_tables = [extract_all_tables(seed) for seed in seeds]
+    frames = {'players': [], 'matches': [], 'stats': []}
+    for offset, tables in enumerate(seed_tables):
+        # synthetic_payload와 같은 규칙: index번째 선수는 seeds[index % len(seeds)]
+        first = start + (offset - start) % len(seeds)
+        ids = [SYNTHETIC_START_ID + index for index in range(first, start + count, len(seeds))]
+        if not ids:
+            continue
+        id_frame = pd.DataFrame({'_synthetic_id': ids})
+        for table, rows in (('players', [tables['players']] if tables['players'] else []),
+                            ('matches', tables['matches']), ('stats', tables['stats'])):
+            if not rows:
+                continue
+            # 원본 행 x 합성 ID 곱집합
+            df = pd.DataFrame(rows).merge(id_frame, how='cross')
+            key = 'id' if table == 'players' else 'player_id'
+            df[key] = df.pop('_synthetic_id')
+            frames[table].append(df)
+    return tuple(pd.concat(dfs, ignore_index=True) if dfs else pd.DataFrame() for dfs in frames.values())
+
+def _timed(func, *args):
+    gc.collect()
+    started = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - started, result
+
+def _best_of(repeat, func):
+    """func(i)를 repeat번 실행한 시간 중 가장 짧은 값 (짧은 측정의 잡음을 줄임)"""
+    return min(_timed(func, i)[0] for i in range(repeat))
+
+class Results:
+    """측정 결과 목록 (이름, 규모, 값, 단위, 측정한 항목 수)"""
+
+    def __init__(self):
+        self.items = []
+
+    def add(self, name, scale, value, unit, items=1):
+        self.items.append({'name': name, 'scale': scale, 'value': value, 'unit': unit, 'items': items})
+        print(f"  {name:<34}{scale:>9}  {value:>12.3f} {unit:<3} ({items} items)", flush=True)
+
+def bench_extract(results, seeds, scale, sample, repeat):
+    """extract_* 함수의 payload당 시간 (dict 입력, fetch 결과와 같은 형태)"""
+    count = min(scale, sample)
+    payloads = [synthetic_payload(seeds, i) for i in range(count)]
+    for name, func in (('extract_player_info', extract_player_info), ('extract_match_data', extract_match_data),
+                       ('extract_stats_data', extract_stats_data), ('extract_all_tables', extract_all_tables)):
+        elapsed = _best_of(repeat, lambda _: [func(payload) for payload in payloads])
+        results.add(name, scale, elapsed / count * 1e6, 'us', count)
+
+def bench_process_player_data(results, seeds, scale, sample, repeat):
+    """fetch를 합성 payload로 바꾼 process_player_data의 선수당 시간 (원본 저장 제외)"""
+    count = min(scale, sample)
+    original_fetch = data_processor.fetch_player_data
+    data_processor.fetch_player_data = lambda player_id: synthetic_payload(seeds, player_id - SYNTHETIC_START_ID)
+    try:
+        ids = [SYNTHETIC_START_ID + i for i in range(count)]
+        elapsed = _best_of(repeat, lambda _: [data_processor.process_player_data(player_id, save_raw=False)
+                                              for player_id in ids])
+    finally:
+        data_processor.fetch_player_data = original_fetch
+    results.add('process_player_data', scale, elapsed / count * 1e6, 'us', count)
+
+def bench_save(results, seeds, scale, batch_players, repeat):
+    """기존 CSV에 scale명이 있을 때 batch_players명 배치 하나를 저장하는 시간 (save_to_csv와 save_to_store)
+
+    save_to_csv는 저장할 때마다 기존 파일 전체를 다시 읽고 쓰므로 규모에 비례해 늘어나고
+    (수집 전체로는 제곱), save_to_store는 배치 크기에만 비례해야 함.
+    """
+    players_df, matches_df, stats_df = synthetic_tables(seeds, scale)
+    # 기존 scale명 뒤에 붙는 새 선수들 (저장소에는 반복마다 다른 배치를 추가)
+    batches = [synthetic_tables(seeds, batch_players, start=scale + i * batch_players) for i in range(repeat)]
+    new_players, new_matches, new_stats = batches[0]
+
+    base = 'bench_data'
+    players_df.to_csv(f"{base}_players.csv", index=False)
+    matches_df.to_csv(f"{base}_matches.csv", index=False)
+    stats_df.to_csv(f"{base}_stats.csv", index=False)
+    existing_rows = len(players_df) + len(matches_df) + len(stats_df)
+
+    # 저장소는 같은 CSV를 가져와 만든 뒤 측정 (가져오기 시간 제외)
+    data_processor.get_storage_engine(base)
+    data_processor.get_aggregate_cube(base)
+    data_processor.get_stats_matrix(base)
+    elapsed = _best_of(repeat, lambda i: data_processor.save_to_store(
+        [batches[i][0]], [batches[i][1]], [batches[i][2]], base))
+    results.add('save_to_store', scale, elapsed, 's', existing_rows)
+
+    elapsed, _ = _timed(data_processor.save_to_csv, [new_players], [new_matches], [new_stats], base)
+    results.add('save_to_csv', scale, elapsed, 's', existing_rows)
+
+def bench_ledger(results, scale, appends, repeat):
+    """scale개가 기록된 장부에서 save_processed_id appends번과 load_processed_ids (인덱스 없음/있음) 시간"""
+    snapshot = 'bench_ids.csv'
+    statuses = ['invalid'] * 9 + ['valid_processed']
+    pd.DataFrame({
+        'player_id': range(SYNTHETIC_START_ID, SYNTHETIC_START_ID + scale),
+        'status': [statuses[i % len(statuses)] for i in range(scale)],
+        'timestamp': '2025-01-01 00:00:00',
+    }).to_csv(snapshot, index=False)
+
+    # 처음 열 때는 스냅샷 전체로 비트맵 인덱스를 만듦
+    data_processor.configure_processed_ledger(snapshot)
+    elapsed, _ = _timed(data_processor.load_processed_ids)
+    results.add('load_processed_ids_cold', scale, elapsed, 's', scale)
+
+    def append_ids(round_index):
+        first = SYNTHETIC_START_ID + scale + round_index * appends
+        for player_id in range(first, first + appends):
+            data_processor.save_processed_id(player_id, 'invalid')
+        data_processor.get_processed_ledger().flush()
+    elapsed = _best_of(repeat, append_ids)
+    results.add('save_processed_id', scale, elapsed / appends * 1e6, 'us', appends)
+
+    # 인덱스가 있으면 저널 뒷부분만 읽음
+    data_processor.configure_processed_ledger(snapshot)
+    elapsed, _ = _timed(data_processor.load_processed_ids)
+    results.add('load_processed_ids_warm', scale, elapsed, 's', scale + appends * repeat)
+    data_processor.configure_processed_ledger(snapshot)
+
+def bench_store_index(results, seeds, scale):
+    """scale명이 저장된 저장소를 열 때 메모리 기본키 인덱스가 차지하는 크기 (키 수에 비례해 늘어남)"""
+    base = 'bench_index'
+    players_df, matches_df, stats_df = synthetic_tables(seeds, scale)
+    players_df.to_csv(f"{base}_players.csv", index=False)
+    matches_df.to_csv(f"{base}_matches.csv", index=False)
+    stats_df.to_csv(f"{base}_stats.csv", index=False)
+    StorageEngine(base, background_compaction=False).close()
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        engine = StorageEngine(base, background_compaction=False, import_csv=False)
+        used = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    keys = sum(engine.row_count(table) for table in ('players', 'matches', 'stats'))
+    engine.close()
+    results.add('store_key_index', scale, used / 1024 ** 2, 'MB', keys)
+    results.add('store_key_index_per_key', scale, used / max(1, keys), 'B', keys)
+
+BENCHMARKS = ('extract', 'process', 'save', 'ledger', 'index')
+
+def run_suite(scales, only=None, sample=5000, batch_players=100, appends=1000, repeat=3):
+    """규모마다 새 임시 디렉터리에서 벤치마크를 실행하고 결과 목록 반환"""
+    seeds = load_seed_payloads()
+    results = Results()
+    original_cwd = os.getcwd()
+    for scale in scales:
+        print(f"[규모 {scale}]", flush=True)
+        work_dir = tempfile.mkdtemp(prefix='kickstats-bench-')
+        os.chdir(work_dir)
+        reset_work_state()
+        try:
+            if only is None or 'extract' in only:
+                bench_extract(results, seeds, scale, sample, repeat)
+            if only is None or 'process' in only:
+                bench_process_player_data(results, seeds, scale, sample, repeat)
+            if only is None or 'save' in only:
+                bench_save(results, seeds, scale, batch_players, repeat)
+            if only is None or 'ledger' in only:
+                bench_ledger(results, scale, appends, repeat)
+            if only is None or 'index' in only:
+                bench_store_index(results, seeds, scale)
+        finally:
+            reset_work_state()
+            os.chdir(original_cwd)
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return results.items
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, tolerance):
+    """기준 결과와 비교해 표를 출력하고 느려진 항목 목록 반환 (모든 값은 작을수록 좋음)"""
+    base_values = {(item['name'], item['scale']): item['value'] for item in baseline.get('results', [])}
+    regressions = []
+    print(f"\n기준 결과와 비교 (기준: {baseline.get('meta', {}).get('commit')}, 허용 {tolerance:.0%})")
+    print(f"{'항목':<34}{'규모':>9}{'현재':>12}{'기준':>12}{'비율':>8}")
+    for item in results:
+        key = (item['name'], item['scale'])
+        if key not in base_values:
+            continue
+        base_value = base_values[key]
+        ratio = item['value'] / base_value if base_value else float('inf')
+        flag = ''
+        if ratio > 1 + tolerance:
+            flag = '  느려짐'
+            regressions.append(key)
+        elif ratio < 1 / (1 + tolerance):
+            flag = '  빨라짐'
+        print(f"{item['name']:<34}{item['scale']:>9}{item['value']:>12.3f}{base_value:>12.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+def print_scaling(results):
+    """항목별로 규모가 커질 때 값이 늘어나는 비율 (호출당 시간이 규모에 비례하면 전체 수집은 제곱)"""
+    by_name = {}
+    for item in results:
+        by_name.setdefault(item['name'], []).append(item)
+    print(f"\n{'항목':<34}{'규모 증가':>14}{'값 증가':>10}")
+    for name, items in by_name.items():
+        items = sorted(items, key=lambda item: item['scale'])
+        for previous, current in zip(items, items[1:]):
+            growth = current['value'] / previous['value'] if previous['value'] else float('inf')
+            print(f"{name:<34}{previous['scale']:>6} -> {current['scale']:<6}{growth:>9.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='raw_data payload로 합성 선수를 만들어 수집 경로의 성능 측정')
+    parser.add_argument('--scales', default='1000,10000,100000', help='합성 선수 수 목록')
+    parser.add_argument('--only', help=f"실행할 벤치마크 ({','.join(BENCHMARKS)})")
+    parser.add_argument('--sample', type=int, default=5000, help='추출/처리 시간을 잴 최대 payload 수')
+    parser.add_argument('--batch-players', type=int, default=100, help='저장 시간을 잴 배치의 선수 수')
+    parser.add_argument('--appends', type=int, default=1000, help='save_processed_id 호출 횟수')
+    parser.add_argument('--repeat', type=int, default=3, help='짧은 측정을 반복해 가장 짧은 값을 쓸 횟수')
+    parser.add_argument('--output', default='bench_results.json', help='결과 JSON 파일')
+    parser.add_argument('--baseline', help='비교할 기준 결과 JSON 파일')
+    parser.add_argument('--save-baseline', help='이번 결과를 기준 결과로 저장할 경로')
+    parser.add_argument('--tolerance', type=float, default=0.5, help='느려짐으로 판단할 비율 (0.5 = 50%%, 측정 잡음보다 크게)')
+    args = parser.parse_args()
+
+    # 측정 대상 함수의 로그는 측정에서 제외
+    setup_logging('ERROR')
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    only = set(args.only.split(',')) if args.only else None
+    results = run_suite(scales, only, args.sample, args.batch_players, args.appends, args.repeat)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'scales': scales,
+            'sample': args.sample,
+            'batch_players': args.batch_players,
+            'appends': args.appends,
+            'repeat': args.repeat,
+        },
+        'results': results,
+    }
+    for path in filter(None, (args.output, args.save_baseline)):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n결과를 '{args.output}'에 저장했습니다")
+
+    print_scaling(results)
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n느려진 항목 {len(regressions)}개: {regressions}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import hashlib
+import json
+import sqlite3
+import threading
+
+from data_extractors import extract_player_info, extract_match_data, extract_stats_data
+from log_utils import get_logger
+from payload_schema import PayloadValidationError, decode_player_payload
+from raw_store import canonical_bytes, payload_hash
+
+logger = get_logger('changes')
+
+# 테이블마다 추출 함수가 읽는 최상위 필드 (이 필드들이 그대로면 그 테이블의 행도 그대로)
+PLAYER_FIELDS = ('id', 'name', 'birthDate', 'isCaptain', 'primaryTeam', 'positionDescription', 'playerInformation')
+STATS_FIELDS = ('mainLeague',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    player_id INTEGER PRIMARY KEY,
+    digests TEXT NOT NULL
+);
+"""
+
+def _digest(value):
+    return hashlib.blake2b(canonical_bytes(value), digest_size=16).hexdigest()
+
+def section_digests(data):
+    """선수 정보/리그 통계 구역과 최근 경기별 지문
+
+    최근 경기는 경기 ID마다 따로 지문을 만들어 새로 추가되거나 바뀐 경기만 찾을 수 있게 함.
+    """
+    matches = data.get('recentMatches')
+    if isinstance(matches, list) and all(isinstance(match, dict) and match.get('id') is not None for match in matches):
+        match_digests = {str(match['id']): _digest(match) for match in matches}
+    else:
+        # 경기 ID로 나눌 수 없으면 구역 전체를 하나로 비교
+        match_digests = {'*': _digest(matches)}
+
+    return {
+        'player': _digest({field: data.get(field) for field in PLAYER_FIELDS}),
+        'stats': _digest({field: data.get(field) for field in STATS_FIELDS}),
+        'matches': match_digests,
+    }
+
+def extract_changed_rows(player_id, data, previous=None, content_hash=None):
+    """직전 지문과 비교해 바뀐 구역만 추출
+
+    content_hash는 원본 저장소가 계산한 페이로드 전체의 해시 (없으면 여기서 계산).
+    전체 해시가 직전과 같으면 해시 비교 한 번으로 끝나고, 다를 때만 구역별 지문을 계산함.
+
+    (결과, 지문) 반환. 결과는 player_info/match_rows/stats_rows/unchanged/ok 키를 가진 dict이며,
+    player_info는 선수 정보 구역이 바뀌었을 때만 채워짐. ok가 False면 선수 정보 추출에 실패한 것으로
+    지문을 저장하지 않아야 함 (다음 수집 때 다시 추출).
+    """
+    content_hash = content_hash or payload_hash(data)
+    result = {'player_info': None, 'match_rows': [], 'stats_rows': [], 'unchanged': False, 'ok': True}
+
+    if previous is not None and previous.get('payload') == content_hash:
+        result['unchanged'] = True
+        return result, previous
+
+    digests = section_digests(data)
+    digests['payload'] = content_hash
+
+    previous = previous or {}
+    player_changed = previous.get('player') != digests['player']
+    stats_changed = previous.get('stats') != digests['stats']
+    previous_matches = previous.get('matches', {})
+    changed_matches = {key for key, digest in digests['matches'].items() if previous_matches.get(key) != digest}
+
+    # 바뀐 구역만 남긴 페이로드를 한 번 디코딩해 필요한 추출 함수만 호출
+    partial = {'id': data.get('id')}
+    if player_changed:
+        partial.update({field: data[field] for field in PLAYER_FIELDS if field in data})
+    if stats_changed and 'mainLeague' in data:
+        partial['mainLeague'] = data['mainLeague']
+    if changed_matches and 'recentMatches' in data:
+        if '*' in digests['matches']:
+            partial['recentMatches'] = data['recentMatches']
+        else:
+            partial['recentMatches'] = [match for match in data['recentMatches'] if str(match['id']) in changed_matches]
+
+    try:
+        payload = decode_player_payload(partial)
+    except PayloadValidationError as e:
+        logger.warning("오류: 선수 ID %s의 데이터 형식이 올바르지 않습니다: %s", player_id, e)
+        result['ok'] = False
+        return result, digests
+
+    if player_changed:
+        result['player_info'] = extract_player_info(payload) or None
+        result['ok'] = result['player_info'] is not None
+    if stats_changed:
+        result['stats_rows'] = extract_stats_data(payload)
+    if 'recentMatches' in partial:
+        result['match_rows'] = extract_match_data(payload)
+
+    logger.debug("선수 ID %s 변경 구역: 선수 정보 %s, 통계 %s, 경기 %d개", player_id,
+                 player_changed, stats_changed, len(changed_matches))
+    return result, digests
+
+class FingerprintStore:
+    """선수별 마지막으로 저장한 페이로드 지문을 보관하는 SQLite 파일
+
+    지문은 해당 배치가 저장소에 저장된 뒤에만 기록해야 함 (저장 전에 중단되면 다음 수집 때 다시 추출).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def get(self, player_id):
+        """저장된 지문 (없으면 None)"""
+        with self._lock:
+            row = self.conn.execute("SELECT digests FROM fingerprints WHERE player_id = ?", (player_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_many(self, items):
+        """(player_id, 지문) 목록을 한 트랜잭션으로 기록"""
+        rows = [(player_id, json.dumps(digests, separators=(',', ':'))) for player_id, digests in items]
+        if not rows:
+            return 0
+        with self._lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO fingerprints (player_id, digests) VALUES (?, ?)", rows)
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
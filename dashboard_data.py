@@ -0,0 +1,272 @@
+import io
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+from stats_matrix import StatsMatrix
+
+# 인덱스 파일 형식이 바뀌면 올려서 예전 인덱스를 다시 만들게 함
+_INDEX_FORMAT = 1
+
+# 문자열 컬럼 (선수 한 명의 행만 읽으면 값이 모두 비어 있거나 숫자처럼 보여 타입이 달라지지 않도록 지정)
+TEXT_COLUMNS = {
+    'players': ['name', 'birth_date', 'team', 'position', 'country', 'preferred_foot'],
+    'matches': ['match_date', 'league_name', 'team_name', 'opponent_team_name'],
+    'stats': ['league_name', 'season', 'title', 'value'],
+}
+
+def _file_version(path):
+    """파일 버전 (수정 시각, 크기). 파일이 없으면 None"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _write_json_atomic(path, record):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+class LRUCache:
+    """최근에 쓴 항목 maxsize개만 남기는 캐시 (여러 스레드에서 호출해도 됨)"""
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+                self.hits += 1
+                return self._items[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def discard(self, predicate):
+        """predicate(key)가 참인 항목 제거"""
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                del self._items[key]
+
+    def __len__(self):
+        return len(self._items)
+
+class CsvRowIndex:
+    """CSV 파일의 키 컬럼 값 -> 행이 있는 바이트 구간 목록 인덱스
+
+    CSV는 저장소 세그먼트 순서로 내보내져 같은 선수의 행이 여러 구간에 나뉠 수 있으므로 구간 목록을 보관함.
+    인덱스는 '<CSV 경로>.idx'에 파일 버전(수정 시각, 크기)과 함께 저장하고, 버전이 같으면 다시 읽지 않고 사용함.
+    키 컬럼은 첫 번째 컬럼이어야 함 (내보내기 형식의 player_id, id).
+    """
+
+    def __init__(self, path, text_columns=None):
+        self.path = path
+        self.text_columns = text_columns or []
+        self.index_path = f"{path}.idx"
+        self.version = None
+        self.header = b''
+        self.ranges = {}
+
+    def load(self):
+        """CSV 버전이 바뀌었으면 인덱스를 다시 읽거나 만듦. 바뀌어서 다시 읽었으면 True"""
+        version = _file_version(self.path)
+        if version == self.version:
+            return False
+
+        if version is None:
+            self.version, self.header, self.ranges = None, b'', {}
+            return True
+
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except (FileNotFoundError, ValueError):
+            saved = None
+
+        if saved and saved.get('format') == _INDEX_FORMAT and saved.get('version') == version:
+            self.header = saved['header'].encode('utf-8')
+            self.ranges = {int(key): ranges for key, ranges in saved['ranges'].items()}
+        else:
+            self._build()
+            try:
+                _write_json_atomic(self.index_path, {
+                    'format': _INDEX_FORMAT,
+                    'version': version,
+                    'header': self.header.decode('utf-8'),
+                    'ranges': self.ranges,
+                })
+            except OSError:
+                # 읽기 전용 위치면 메모리에만 두고 사용
+                pass
+        self.version = version
+        return True
+
+    def _build(self):
+        """CSV를 한 번 훑어 키별 바이트 구간 목록 생성"""
+        ranges = {}
+        with open(self.path, 'rb') as f:
+            self.header = f.readline()
+            offset = len(self.header)
+            current_key, run_start = None, offset
+            record_start, first_line, in_quotes = offset, b'', False
+
+            for line in f:
+                if not in_quotes:
+                    record_start, first_line = offset, line
+                offset += len(line)
+                # 따옴표 안의 줄바꿈은 같은 행으로 취급
+                if line.count(b'"') % 2:
+                    in_quotes = not in_quotes
+                if in_quotes:
+                    continue
+
+                try:
+                    key = int(float(first_line.split(b',', 1)[0].strip(b'"\r\n')))
+                except ValueError:
+                    continue
+
+                if key != current_key:
+                    if current_key is not None:
+                        ranges.setdefault(current_key, []).append([run_start, record_start])
+                    current_key, run_start = key, record_start
+
+            if current_key is not None:
+                ranges.setdefault(current_key, []).append([run_start, offset])
+        self.ranges = ranges
+
+    def keys(self):
+        return self.ranges.keys()
+
+    def read_rows(self, key):
+        """키에 해당하는 행만 읽어 데이터프레임으로 반환 (없으면 빈 데이터프레임)
+
+        인덱스를 읽은 뒤 CSV가 다시 내보내졌으면 None (load 후 다시 호출해야 함).
+        """
+        chunks = [self.header]
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if [stat.st_mtime_ns, stat.st_size] != self.version:
+                return None
+            for start, end in self.ranges.get(key, []):
+                f.seek(start)
+                chunks.append(f.read(end - start))
+        return pd.read_csv(io.BytesIO(b''.join(chunks)), dtype={column: str for column in self.text_columns})
+
+class DashboardData:
+    """대시보드용 지연 로딩 데이터 접근 계층
+
+    - 시작할 때는 선수 목록(<base>_player_ids.csv, 없으면 선수 CSV의 id/name/team)만 읽음
+    - 선수별 경기/통계/기본 정보는 player_id -> 바이트 구간 인덱스로 해당 행만 읽음
+    - 읽은 결과는 LRU 캐시에 두고, CSV 수정 시각/크기가 바뀌면 인덱스를 다시 읽고 그 테이블의 캐시를 비움
+    """
+
+    TABLES = ('players', 'matches', 'stats')
+
+    def __init__(self, base_filename='football_players_data', cache_size=128):
+        self.base_filename = base_filename
+        self.cache = LRUCache(cache_size)
+        self._indexes = {table: CsvRowIndex(f"{base_filename}_{table}.csv", TEXT_COLUMNS[table]) for table in self.TABLES}
+        self._player_list = None
+        self._player_list_version = None
+        self._matrix = None
+        self._matrix_version = None
+        self._lock = threading.Lock()
+
+    def _index(self, table):
+        index = self._indexes[table]
+        with self._lock:
+            if index.load():
+                self.cache.discard(lambda key: key[0] == table)
+        return index
+
+    def player_list(self):
+        """선수 목록 (id, name, team) 데이터프레임. 파일이 바뀌었을 때만 다시 읽음"""
+        ids_path = f"{self.base_filename}_player_ids.csv"
+        players_path = f"{self.base_filename}_players.csv"
+        path = ids_path if os.path.exists(ids_path) else players_path
+        version = (path, _file_version(path))
+
+        with self._lock:
+            if self._player_list is None or version != self._player_list_version:
+                if version[1] is None:
+                    self._player_list = pd.DataFrame(columns=['id', 'name', 'team'])
+                else:
+                    self._player_list = pd.read_csv(path, usecols=['id', 'name', 'team'])
+                self._player_list_version = version
+            return self._player_list
+
+    def _rows(self, table, player_id):
+        for _ in range(3):
+            index = self._index(table)
+            if index.version is None:
+                return pd.DataFrame()
+            key = (table, int(player_id), tuple(index.version))
+            rows = self.cache.get(key)
+            if rows is None:
+                rows = index.read_rows(int(player_id))
+                if rows is None:
+                    # 읽는 사이 파일이 바뀜: 인덱스를 다시 읽고 재시도
+                    continue
+                self.cache.put(key, rows)
+            return rows
+        raise RuntimeError(f"'{index.path}' 파일이 계속 바뀌고 있어 읽을 수 없습니다")
+
+    def player(self, player_id):
+        """선수 한 명의 기본 정보 (한 행짜리 데이터프레임)"""
+        return self._rows('players', player_id)
+
+    def matches(self, player_id):
+        """선수 한 명의 경기 데이터"""
+        return self._rows('matches', player_id)
+
+    def stats(self, player_id):
+        """선수 한 명의 리그 통계"""
+        return self._rows('stats', player_id)
+
+    def stats_matrix(self):
+        """저장소의 통계 행렬 (파일이 바뀌었을 때만 다시 읽음, 없으면 None)"""
+        path = os.path.join(f"{self.base_filename}_store", 'stats_matrix.npz')
+        version = _file_version(path)
+        with self._lock:
+            if version != self._matrix_version:
+                self._matrix = StatsMatrix.load(path) if version is not None else None
+                self._matrix_version = version
+            return self._matrix
+
+    def stats_wide(self, player_id, min_minutes=0.0):
+        """선수 한 명의 시즌별 통계를 항목 컬럼과 90분당 컬럼으로 (행렬이 없으면 None)"""
+        matrix = self.stats_matrix()
+        if matrix is None:
+            return None
+        return matrix.to_frame(player_id=player_id, per90=True, min_minutes=min_minutes)
+
+    def league_summary(self, season=None):
+        """저장소 집계 테이블의 리그/시즌별 요약 (집계가 없으면 빈 데이터프레임)
+
+        저장소 디렉터리의 aggregates.db를 읽으므로 경기 CSV 크기와 상관없이 그룹 수만큼만 읽음.
+        """
+        cube_path = os.path.join(f"{self.base_filename}_store", 'aggregates.db')
+        if not os.path.exists(cube_path):
+            return pd.DataFrame()
+        cube = AggregateCube(cube_path)
+        try:
+            return cube.league_summary(season)
+        finally:
+            cube.close()
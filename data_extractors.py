@@ -1,247 +1,431 @@
-import traceback
+import logging
+from datetime import datetime, timezone
+
+from log_utils import get_logger
+from payload_schema import MISSING, PayloadValidationError, decode_full_payload, decode_player_payload
+
+logger = get_logger('extract')
+
+def _value(value):
+    """페이로드에 없는 필드는 None으로 취급"""
+    return None if value is MISSING else value
+
+def _player_info_row(payload):
+    """id를 확인한 payload에서 선수 기본 정보 추출 (필수 필드가 없으면 None)"""
+    # 필수 필드 체크와 상세 로깅
+    required_fields = [
+        ('name',),
+        ('birthDate', 'utcTime'),
+        ('primaryTeam', 'teamName'),
+        ('primaryTeam', 'teamId'),
+        ('positionDescription', 'primaryPosition', 'label'),
+        ('isCaptain',)
+    ]
+
+    for field_path in required_fields:
+        temp_data = payload
+
+        for i, field in enumerate(field_path):
+            temp_data = getattr(temp_data, field)
+            if temp_data is MISSING or (temp_data is None and i < len(field_path) - 1):
+                # 필드가 없거나 중간 단계가 null이면 추출 실패 (예전에는 null일 때 스택 트레이스까지 출력)
+                path_str = f"['{field_path[0]}']" + ''.join(f".{name}" for name in field_path[1:i + 1])
+                reason = '데이터에 없습니다' if temp_data is MISSING else 'null입니다'
+                logger.warning("키 오류: 선수 ID %s의 '%s' 경로의 '%s' 필드가 %s.", payload.id, path_str, field, reason)
+                return None
+
+    # 모든 필수 필드가 확인되면 선수 정보 생성
+    player_info = {
+        'id': payload.id,
+        'name': payload.name,
+        'birth_date': payload.birthDate.utcTime,
+        'team': payload.primaryTeam.teamName,
+        'team_id': payload.primaryTeam.teamId,
+        'position': payload.positionDescription.primaryPosition.label,
+        'is_captain': payload.isCaptain,
+        'country': None,
+        'height': None,
+        'shirt': None,
+        'age': None,
+        'preferred_foot': None,
+        'market_value': None
+    }
+
+    # 선수 세부 정보가 있는지 확인
+    if payload.playerInformation is MISSING:
+        logger.debug("경고: 선수 ID %s에 'playerInformation' 필드가 데이터에 없습니다.", payload.id)
+    else:
+        # 선수 세부 정보 추출
+        for item in payload.playerInformation:
+            if item.title is MISSING or item.value is MISSING:
+                logger.debug("경고: playerInformation 항목에 'title' 또는 'value' 필드가 없습니다: %s", item)
+                continue
+
+            title = item.title.lower()
+            if title == 'country':
+                player_info['country'] = item.value.fallback
+            elif title == 'height':
+                player_info['height'] = item.value.numberValue
+            elif title == 'shirt':
+                player_info['shirt'] = item.value.numberValue
+            elif title == 'age':
+                player_info['age'] = item.value.numberValue
+            elif title == 'preferred foot':
+                player_info['preferred_foot'] = item.value.key
+            elif title == 'market value':
+                player_info['market_value'] = item.value.numberValue
+
+    return player_info
 
 def extract_player_info(data):
-    """선수의 기본 정보 추출"""
+    """선수의 기본 정보 추출 (dict, JSON 바이트 또는 PlayerPayload 모두 가능)"""
     try:
+        payload = decode_player_payload(data)
+
         # 기본 정보 추출 전 데이터 구조 확인
-        if 'id' not in data:
-            print(f"키 오류: 'id' 필드가 데이터에 없습니다.")
+        if payload.id is MISSING:
+            logger.warning("키 오류: 'id' 필드가 데이터에 없습니다.")
             return None
-        
-        # 필수 필드 체크와 상세 로깅
-        required_fields = [
-            ('name', None), 
-            ('birthDate', 'utcTime'), 
-            ('primaryTeam', 'teamName'), 
-            ('primaryTeam', 'teamId'),
-            ('positionDescription', 'primaryPosition', 'label'),
-            ('isCaptain', None)
-        ]
-        
-        # 필수 필드 체크
-        for field_path in required_fields:
-            temp_data = data
-            path_str = ""
-            
-            for i, field in enumerate(field_path):
-                if field is None:
-                    continue
-                    
-                path_str += f"['{field}']" if i == 0 else f".{field}"
-                
-                if field not in temp_data:
-                    print(f"키 오류: '{path_str}' 경로의 '{field}' 필드가 데이터에 없습니다.")
-                    print(f"사용 가능한 키: {list(temp_data.keys())}")
-                    if isinstance(temp_data, dict) and len(temp_data) < 10:
-                        print(f"현재 데이터 내용: {temp_data}")
-                    return None
-                
-                temp_data = temp_data[field]
-        
-        # 모든 필수 필드가 확인되면 선수 정보 생성
-        player_info = {
-            'id': data['id'],
-            'name': data['name'],
-            'birth_date': data.get('birthDate', {}).get('utcTime', None),
-            'team': data.get('primaryTeam', {}).get('teamName', None),
-            'team_id': data.get('primaryTeam', {}).get('teamId', None),
-            'position': data.get('positionDescription', {}).get('primaryPosition', {}).get('label', None),
-            'is_captain': data.get('isCaptain', False),
-            'country': None,
-            'height': None,
-            'shirt': None,
-            'age': None,
-            'preferred_foot': None,
-            'market_value': None
-        }
-        
-        # 선수 세부 정보가 있는지 확인
-        if 'playerInformation' not in data:
-            print("경고: 'playerInformation' 필드가 데이터에 없습니다.")
-        else:
-            # 선수 세부 정보 추출
-            for item in data['playerInformation']:
-                if 'title' not in item or 'value' not in item:
-                    print(f"경고: playerInformation 항목에 'title' 또는 'value' 필드가 없습니다: {item}")
-                    continue
-                    
-                title = item['title'].lower()
-                if title == 'country':
-                    player_info['country'] = item['value'].get('fallback')
-                elif title == 'height':
-                    player_info['height'] = item['value'].get('numberValue')
-                elif title == 'shirt':
-                    player_info['shirt'] = item['value'].get('numberValue')
-                elif title == 'age':
-                    player_info['age'] = item['value'].get('numberValue')
-                elif title == 'preferred foot':
-                    player_info['preferred_foot'] = item['value'].get('key')
-                elif title == 'market value':
-                    player_info['market_value'] = item['value'].get('numberValue')
-        
-        return player_info
-    except KeyError as e:
-        print(f"Error extracting player info - KeyError: {e}")
+
+        return _player_info_row(payload)
+    except PayloadValidationError as e:
+        logger.warning("Error extracting player info - 데이터 형식 오류: %s", e)
         return None
     except Exception as e:
-        print(f"Error extracting player info - Unexpected error: {str(e)}")
-        print(f"상세 오류 정보: {traceback.format_exc()}")
+        logger.exception("Error extracting player info - Unexpected error: %s", e)
         return None
 
+# 경기 데이터의 필수 필드 (누락 시 경고만 하고 None으로 채움)
+_MATCH_FIELDS = [
+    'id', 'matchDate', 'leagueId', 'leagueName', 'teamId', 'teamName',
+    'opponentTeamId', 'opponentTeamName', 'isHomeTeam', 'homeScore', 'awayScore',
+    'minutesPlayed', 'goals', 'assists', 'yellowCards', 'redCards'
+]
+
+def _match_rows(payload):
+    """id를 확인한 payload에서 최근 경기 행 목록 추출"""
+    player_id = payload.id
+    matches = []
+
+    # recentMatches 필드 확인
+    if payload.recentMatches is MISSING:
+        logger.debug("선수 ID %s에 대한 'recentMatches' 데이터가 없습니다", player_id)
+        return []
+
+    if not payload.recentMatches:
+        logger.debug("선수 ID %s의 최근 경기 데이터가 비어있습니다", player_id)
+        return []
+
+    # 각 경기 데이터 처리
+    for i, match in enumerate(payload.recentMatches):
+        try:
+            # 누락된 필드가 있는지 확인 (디버그 로그가 꺼져 있으면 검사하지 않음)
+            if logger.isEnabledFor(logging.DEBUG):
+                missing_fields = [field for field in _MATCH_FIELDS if getattr(match, field) is MISSING]
+                if missing_fields:
+                    logger.debug("선수 ID %s 경기 #%d에 누락된 필드가 있습니다: %s", player_id, i, missing_fields)
+            # 누락된 필드가 있어도 계속 진행 (None으로 채움)
+
+            # matchDate가 있는지 확인하고 utcTime 확인
+            if match.matchDate is MISSING:
+                logger.debug("선수 ID %s 경기 #%d에 'matchDate' 필드가 없습니다", player_id, i)
+                match_date = None
+            elif match.matchDate.utcTime is MISSING:
+                logger.debug("선수 ID %s 경기 #%d의 'matchDate'에 'utcTime' 필드가 없습니다", player_id, i)
+                match_date = None
+            else:
+                match_date = match.matchDate.utcTime
+
+            rating_props = match.ratingProps
+
+            match_info = {
+                'player_id': player_id,
+                'match_id': _value(match.id),
+                'match_date': match_date,
+                'league_id': _value(match.leagueId),
+                'league_name': _value(match.leagueName),
+                'team_id': _value(match.teamId),
+                'team_name': _value(match.teamName),
+                'opponent_team_id': _value(match.opponentTeamId),
+                'opponent_team_name': _value(match.opponentTeamName),
+                'is_home': _value(match.isHomeTeam),
+                'home_score': _value(match.homeScore),
+                'away_score': _value(match.awayScore),
+                'minutes_played': _value(match.minutesPlayed),
+                'goals': _value(match.goals),
+                'assists': _value(match.assists),
+                'yellow_cards': _value(match.yellowCards),
+                'red_cards': _value(match.redCards),
+                'rating': None if rating_props is MISSING else rating_props.num
+            }
+            matches.append(match_info)
+        except Exception as e:
+            logger.warning("선수 ID %s 경기 #%d 데이터 추출 중 오류 발생: %s", player_id, i, e)
+            # 오류가 있지만 계속 진행
+
+    return matches
+
 def extract_match_data(data):
-    """선수의 경기 데이터 추출"""
+    """선수의 경기 데이터 추출 (dict, JSON 바이트 또는 PlayerPayload 모두 가능)"""
     try:
-        matches = []
-        
+        payload = decode_player_payload(data)
+
         # 기본 확인
-        if 'id' not in data:
-            print("경고: 선수 ID가 데이터에 없습니다")
-            return []
-            
-        player_id = data['id']
-        
-        # recentMatches 필드 확인
-        if 'recentMatches' not in data:
-            print(f"선수 ID {player_id}에 대한 'recentMatches' 데이터가 없습니다")
+        if payload.id is MISSING:
+            logger.warning("경고: 선수 ID가 데이터에 없습니다")
             return []
-            
-        if not data['recentMatches']:
-            print(f"선수 ID {player_id}의 최근 경기 데이터가 비어있습니다")
-            return []
-        
-        # 각 경기 데이터 처리
-        for i, match in enumerate(data['recentMatches']):
-            try:
-                # 필수 필드 확인
-                required_fields = [
-                    'id', 'matchDate', 'leagueId', 'leagueName', 'teamId', 'teamName',
-                    'opponentTeamId', 'opponentTeamName', 'isHomeTeam', 'homeScore', 'awayScore',
-                    'minutesPlayed', 'goals', 'assists', 'yellowCards', 'redCards'
-                ]
-                
-                # 누락된 필드가 있는지 확인
-                missing_fields = [field for field in required_fields if field not in match]
-                if missing_fields:
-                    print(f"경기 #{i}에 누락된 필드가 있습니다: {missing_fields}")
-                    # 누락된 필드가 있지만 계속 진행 (None으로 채움)
-                
-                # matchDate가 있는지 확인하고 utcTime 확인
-                if 'matchDate' not in match:
-                    print(f"경기 #{i}에 'matchDate' 필드가 없습니다")
-                    match_date = None
-                elif 'utcTime' not in match['matchDate']:
-                    print(f"경기 #{i}의 'matchDate'에 'utcTime' 필드가 없습니다")
-                    match_date = None
-                else:
-                    match_date = match['matchDate']['utcTime']
-                
-                # 안전하게 필드 접근
-                match_info = {
-                    'player_id': player_id,
-                    'match_id': match.get('id'),
-                    'match_date': match_date,
-                    'league_id': match.get('leagueId'),
-                    'league_name': match.get('leagueName'),
-                    'team_id': match.get('teamId'),
-                    'team_name': match.get('teamName'),
-                    'opponent_team_id': match.get('opponentTeamId'),
-                    'opponent_team_name': match.get('opponentTeamName'),
-                    'is_home': match.get('isHomeTeam'),
-                    'home_score': match.get('homeScore'),
-                    'away_score': match.get('awayScore'),
-                    'minutes_played': match.get('minutesPlayed'),
-                    'goals': match.get('goals'),
-                    'assists': match.get('assists'),
-                    'yellow_cards': match.get('yellowCards'),
-                    'red_cards': match.get('redCards'),
-                    'rating': match.get('ratingProps', {}).get('num', None)
-                }
-                matches.append(match_info)
-            except Exception as e:
-                print(f"경기 #{i} 데이터 추출 중 오류 발생: {str(e)}")
-                # 오류가 있지만 계속 진행
-            
-        return matches
-    except KeyError as e:
-        print(f"Error extracting match data - KeyError: {e}")
+
+        return _match_rows(payload)
+    except PayloadValidationError as e:
+        logger.warning("Error extracting match data - 데이터 형식 오류: %s", e)
         return []
     except Exception as e:
-        print(f"Error extracting match data - Unexpected error: {str(e)}")
-        print(f"상세 오류 정보: {traceback.format_exc()}")
+        logger.exception("Error extracting match data - Unexpected error: %s", e)
         return []
 
+def _stats_rows(payload):
+    """id를 확인한 payload에서 주 리그 통계 행 목록 추출"""
+    player_id = payload.id
+    main_league = payload.mainLeague
+    stats = []
+
+    # mainLeague 필드 확인
+    if main_league is MISSING:
+        logger.debug("선수 ID %s에 대한 'mainLeague' 데이터가 없습니다", player_id)
+        return []
+
+    if main_league is None:
+        logger.debug("선수 ID %s의 'mainLeague' 데이터가 비어있습니다", player_id)
+        return []
+
+    # stats 필드 확인
+    if main_league.stats is MISSING:
+        logger.debug("선수 ID %s의 'mainLeague'에 'stats' 데이터가 없습니다", player_id)
+        return []
+
+    if main_league.stats is None:
+        logger.debug("선수 ID %s의 'mainLeague' 'stats' 데이터가 비어있습니다", player_id)
+        return []
+
+    # 필수 필드 확인
+    if main_league.leagueId is MISSING:
+        logger.debug("선수 ID %s의 'mainLeague'에 'leagueId' 필드가 없습니다", player_id)
+    league_id = _value(main_league.leagueId)
+
+    if main_league.leagueName is MISSING:
+        logger.debug("선수 ID %s의 'mainLeague'에 'leagueName' 필드가 없습니다", player_id)
+    league_name = _value(main_league.leagueName)
+
+    if main_league.season is MISSING:
+        logger.debug("선수 ID %s의 'mainLeague'에 'season' 필드가 없습니다", player_id)
+    season = _value(main_league.season)
+
+    # 각 통계 데이터 처리
+    for i, stat in enumerate(main_league.stats):
+        # 필수 필드 확인
+        if stat.title is MISSING:
+            logger.debug("선수 ID %s 통계 #%d에 'title' 필드가 없습니다", player_id, i)
+            continue
+
+        if stat.value is MISSING:
+            logger.debug("선수 ID %s 통계 '%s'에 'value' 필드가 없습니다", player_id, stat.title)
+            continue
+
+        stats.append({
+            'player_id': player_id,
+            'league_id': league_id,
+            'league_name': league_name,
+            'season': season,
+            'title': stat.title,
+            'value': stat.value
+        })
+
+    return stats
+
 def extract_stats_data(data):
-    """선수의 리그 통계 데이터 추출"""
+    """선수의 리그 통계 데이터 추출 (dict, JSON 바이트 또는 PlayerPayload 모두 가능)"""
     try:
-        stats = []
-        
+        payload = decode_player_payload(data)
+
         # 기본 확인
-        if 'id' not in data:
-            print("경고: 선수 ID가 데이터에 없습니다")
+        if payload.id is MISSING:
+            logger.warning("경고: 선수 ID가 데이터에 없습니다")
             return []
-            
-        player_id = data['id']
-        
-        # mainLeague 필드 확인
-        if 'mainLeague' not in data:
-            print(f"선수 ID {player_id}에 대한 'mainLeague' 데이터가 없습니다")
-            return []
-            
-        # stats 필드 확인
-        if 'stats' not in data['mainLeague']:
-            print(f"선수 ID {player_id}의 'mainLeague'에 'stats' 데이터가 없습니다")
-            return []
-            
-        # 필수 필드 확인
-        if 'leagueId' not in data['mainLeague']:
-            print(f"선수 ID {player_id}의 'mainLeague'에 'leagueId' 필드가 없습니다")
-            print(f"사용 가능한 키: {list(data['mainLeague'].keys())}")
-            league_id = None
-        else:
-            league_id = data['mainLeague']['leagueId']
-            
-        if 'leagueName' not in data['mainLeague']:
-            print(f"선수 ID {player_id}의 'mainLeague'에 'leagueName' 필드가 없습니다")
-            league_name = None
-        else:
-            league_name = data['mainLeague']['leagueName']
-            
-        if 'season' not in data['mainLeague']:
-            print(f"선수 ID {player_id}의 'mainLeague'에 'season' 필드가 없습니다")
-            season = None
-        else:
-            season = data['mainLeague']['season']
-        
-        # 각 통계 데이터 처리
-        for i, stat in enumerate(data['mainLeague']['stats']):
-            try:
-                # 필수 필드 확인
-                if 'title' not in stat:
-                    print(f"통계 #{i}에 'title' 필드가 없습니다")
-                    continue
-                    
-                if 'value' not in stat:
-                    print(f"통계 '{stat.get('title', f'#{i}')}' 에 'value' 필드가 없습니다")
-                    continue
-                
-                stat_info = {
-                    'player_id': player_id,
-                    'league_id': league_id,
-                    'league_name': league_name,
-                    'season': season,
-                    'title': stat['title'],
-                    'value': stat['value']
-                }
-                stats.append(stat_info)
-            except Exception as e:
-                print(f"통계 #{i} 데이터 추출 중 오류 발생: {str(e)}")
-                # 오류가 있지만 계속 진행
-                
-        return stats
-    except KeyError as e:
-        print(f"Error extracting stats data - KeyError: {e}")
+
+        return _stats_rows(payload)
+    except PayloadValidationError as e:
+        logger.warning("Error extracting stats data - 데이터 형식 오류: %s", e)
         return []
     except Exception as e:
-        print(f"Error extracting stats data - Unexpected error: {str(e)}")
-        print(f"상세 오류 정보: {traceback.format_exc()}")
-        return []
\ No newline at end of file
+        logger.exception("Error extracting stats data - Unexpected error: %s", e)
+        return []
+
+def _date_text(value):
+    """경력 날짜를 ISO 문자열로 (밀리초 타임스탬프는 UTC로 변환, 빈 값은 None)"""
+    if value is MISSING or value is None or value == '':
+        return None
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value / 1000, tz=timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+    return str(value)
+
+def _count(value):
+    """경력 출전/골/도움 값 ('450' 같은 문자열)을 정수로 (숫자가 아니면 None)"""
+    if value is MISSING or value is None:
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _career_rows(payload):
+    """경력(careerHistory) 구역의 팀별 재적 기간 행 목록"""
+    player_id = payload.id
+    history = payload.careerHistory
+    if history is MISSING or history is None or not history.careerItems:
+        logger.debug("선수 ID %s에 대한 'careerHistory' 데이터가 없습니다", player_id)
+        return []
+
+    rows = []
+    for career_type, section in history.careerItems.items():
+        if section is None or not section.teamEntries:
+            continue
+        for entry in section.teamEntries:
+            rows.append({
+                'player_id': player_id,
+                'career_type': career_type,
+                'team_id': _value(entry.teamId),
+                'team_name': _value(entry.team),
+                'start_date': _date_text(entry.startDate),
+                'end_date': _date_text(entry.endDate),
+                'active': _value(entry.active),
+                'appearances': _count(entry.appearances),
+                'goals': _count(entry.goals),
+                'assists': _count(entry.assists),
+            })
+    return rows
+
+def _season_rows(payload):
+    """statSeasons 구역의 시즌별 참가 대회 행 목록"""
+    player_id = payload.id
+    if payload.statSeasons is MISSING or not payload.statSeasons:
+        logger.debug("선수 ID %s에 대한 'statSeasons' 데이터가 없습니다", player_id)
+        return []
+
+    rows = []
+    for season in payload.statSeasons:
+        if season is None or not season.tournaments:
+            continue
+        for tournament in season.tournaments:
+            rows.append({
+                'player_id': player_id,
+                'season': _value(season.seasonName),
+                'tournament_id': _value(tournament.tournamentId),
+                'tournament_name': _value(tournament.name),
+                'entry_id': _value(tournament.entryId),
+            })
+    return rows
+
+def _trait_rows(payload):
+    """traits 구역의 같은 포지션 대비 특성 값 행 목록"""
+    player_id = payload.id
+    traits = payload.traits
+    if traits is MISSING or traits is None or not traits.items:
+        logger.debug("선수 ID %s에 대한 'traits' 데이터가 없습니다", player_id)
+        return []
+
+    return [{
+        'player_id': player_id,
+        'trait_group': _value(traits.key),
+        'key': _value(item.key),
+        'title': _value(item.title),
+        'value': _value(item.value),
+    } for item in traits.items if item is not None]
+
+def _trophy_rows(payload):
+    """trophies 구역의 우승/준우승 행 목록 (시즌마다 한 행)"""
+    player_id = payload.id
+    trophies = payload.trophies
+    if trophies is MISSING or trophies is None or not trophies.playerTrophies:
+        logger.debug("선수 ID %s에 대한 'trophies' 데이터가 없습니다", player_id)
+        return []
+
+    rows = []
+    for team in trophies.playerTrophies:
+        if team is None or not team.tournaments:
+            continue
+        for tournament in team.tournaments:
+            for result, seasons in (('won', tournament.seasonsWon), ('runner_up', tournament.seasonsRunnerUp)):
+                # MISSING도 거짓으로 취급되므로 없는 목록은 건너뜀
+                for season in seasons or []:
+                    rows.append({
+                        'player_id': player_id,
+                        'team_id': _value(team.teamId),
+                        'team_name': _value(team.teamName),
+                        'ccode': _value(tournament.ccode),
+                        'league_id': _value(tournament.leagueId),
+                        'league_name': _value(tournament.leagueName),
+                        'season': season,
+                        'result': result,
+                    })
+    return rows
+
+# extract_all_tables가 만드는 추가 테이블과 추출 함수
+EXTRA_TABLE_EXTRACTORS = {
+    'career': _career_rows,
+    'seasons': _season_rows,
+    'traits': _trait_rows,
+    'trophies': _trophy_rows,
+}
+
+def extract_extra_tables(data):
+    """경력/시즌 목록/특성/트로피 테이블만 추출 (테이블 이름 -> 행 목록)"""
+    try:
+        payload = decode_full_payload(data)
+        if payload.id is MISSING:
+            logger.warning("경고: 선수 ID가 데이터에 없습니다")
+            return {table: [] for table in EXTRA_TABLE_EXTRACTORS}
+        return {table: extract(payload) for table, extract in EXTRA_TABLE_EXTRACTORS.items()}
+    except PayloadValidationError as e:
+        logger.warning("Error extracting extra tables - 데이터 형식 오류: %s", e)
+        return {table: [] for table in EXTRA_TABLE_EXTRACTORS}
+    except Exception as e:
+        logger.exception("Error extracting extra tables - Unexpected error: %s", e)
+        return {table: [] for table in EXTRA_TABLE_EXTRACTORS}
+
+def extract_all_tables(data):
+    """payload를 한 번 디코딩하고 id를 한 번 확인한 뒤 모든 테이블을 추출
+
+    세 추출 함수(extract_player_info, extract_match_data, extract_stats_data)를 따로 부를 때처럼
+    구역마다 디코딩/id 확인을 반복하지 않음. 반환값은 테이블 이름 -> 값 사전으로,
+    'players'는 선수 정보 dict(실패 시 None), 나머지는 행 목록.
+    형식이 맞지 않거나 추출 중 오류가 난 추가 구역(경력/시즌 목록/특성/트로피)은 그 테이블만 비우고
+    선수/경기/통계 테이블은 그대로 반환함.
+    """
+    empty = {'players': None, 'matches': [], 'stats': [], **{table: [] for table in EXTRA_TABLE_EXTRACTORS}}
+    try:
+        # 구역별로 검증하므로 형식이 맞지 않는 구역만 없는 것으로 디코딩됨
+        payload = decode_full_payload(data)
+
+        if payload.id is MISSING:
+            logger.warning("키 오류: 'id' 필드가 데이터에 없습니다.")
+            return empty
+
+        tables = {
+            'players': _player_info_row(payload),
+            'matches': _match_rows(payload),
+            'stats': _stats_rows(payload),
+        }
+    except PayloadValidationError as e:
+        logger.warning("Error extracting tables - 데이터 형식 오류: %s", e)
+        return empty
+    except Exception as e:
+        logger.exception("Error extracting tables - Unexpected error: %s", e)
+        return empty
+
+    for table, extract in EXTRA_TABLE_EXTRACTORS.items():
+        try:
+            tables[table] = extract(payload)
+        except Exception as e:
+            logger.exception("Error extracting %s table for player %s: %s", table, payload.id, e)
+            tables[table] = []
+    return tables
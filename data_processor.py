@@ -1,75 +1,97 @@
 import os
+import atexit
+import shutil
+import logging
 import pandas as pd
-import traceback
 from datetime import datetime
-import time
 
 from api_functions import fetch_player_data, save_raw_data
 from data_extractors import extract_player_info, extract_match_data, extract_stats_data
+from payload_schema import decode_player_payload, PayloadValidationError
+from storage_engine import StorageEngine, atomic_write_csv
+from processed_ledger import ProcessedLedger
+from status_index import VALID_STATUSES, StatusIndex
+from sqlite_store import SQLiteStore
+from change_detector import FingerprintStore
+from aggregate_cube import AggregateCube
+from stats_matrix import StatsMatrix
+from log_utils import get_logger, log_event
+import metrics
+
+logger = get_logger('processor')
 
 def process_player_data(player_id, save_raw=True):
     """선수 데이터를 가져와서 처리하고 데이터프레임으로 반환"""
-    print(f"\n{'='*50}")
-    print(f"Processing player ID: {player_id}")
-    print(f"{'='*50}")
+    logger.debug("Processing player ID: %s", player_id)
     
     try:
         # 데이터 가져오기
         player_data = fetch_player_data(player_id)
         if not player_data:
-            print(f"Could not fetch data for player {player_id}")
+            logger.info("Could not fetch data for player %s", player_id)
             return None, None, None
-        
+    except Exception as e:
+        logger.exception("Error processing player %s: %s (%s)", player_id, e, type(e).__name__)
+        return None, None, None
+    
+    return process_player_payload(player_id, player_data, save_raw)
+
+def process_player_payload(player_id, player_data, save_raw=True):
+    """이미 받아온 선수 데이터를 다시 요청하지 않고 처리하여 데이터프레임으로 반환"""
+    player_info, match_data, stats_data = process_player_rows(player_id, player_data, save_raw)
+    
+    # 데이터프레임 생성
+    player_df = pd.DataFrame([player_info]) if player_info else None
+    matches_df = pd.DataFrame(match_data) if match_data else None
+    stats_df = pd.DataFrame(stats_data) if stats_data else None
+    return player_df, matches_df, stats_df
+
+def process_player_rows(player_id, player_data, save_raw=True):
+    """이미 받아온 선수 데이터를 처리하여 (선수 정보, 경기 행 목록, 통계 행 목록)으로 반환
+    
+    데이터프레임은 만들지 않으므로 여러 선수를 BatchExtractor에 모아 배치 단위로 한 번에 만들 때 사용.
+    선수 기본 정보 추출에 실패하면 첫 번째 값이 None.
+    """
+    try:
         # 원본 데이터 저장 (옵션)
         if save_raw:
             save_raw_data(player_data, player_id)
         
         # 데이터 구조 기본 검증
         if not isinstance(player_data, dict):
-            print(f"오류: player_data가 딕셔너리가 아닙니다. 타입: {type(player_data)}")
+            logger.warning("오류: 선수 ID %s의 player_data가 딕셔너리가 아닙니다. 타입: %s", player_id, type(player_data))
             # 간단한 데이터 내용 출력
-            print(f"데이터 미리보기: {str(player_data)[:200]}...")
-            return None, None, None
+            logger.debug("데이터 미리보기: %.200s...", player_data)
+            return None, [], []
         
-        print(f"API 응답 수신 완료. 데이터 크기: {len(str(player_data))} 바이트")
-        print(f"데이터에 포함된 키: {list(player_data.keys())}")
+        # 응답 키 목록은 디버그 로그가 켜져 있을 때만 만듦
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("데이터에 포함된 키: %s", list(player_data.keys()))
         
-        # 데이터 추출
-        print("\n----- 선수 기본 정보 추출 시작 -----")
-        player_info = extract_player_info(player_data)
-        if player_info:
-            print(f"선수 기본 정보 추출 성공: {player_info['name'] if 'name' in player_info else 'Unknown'}")
-        else:
-            print("선수 기본 정보 추출 실패")
-        
-        print("\n----- 경기 데이터 추출 시작 -----")
-        match_data = extract_match_data(player_data)
-        print(f"경기 데이터 추출 결과: {len(match_data)}개의 경기 정보 찾음")
-        
-        print("\n----- 통계 데이터 추출 시작 -----")
-        stats_data = extract_stats_data(player_data)
-        print(f"통계 데이터 추출 결과: {len(stats_data)}개의 통계 정보 찾음")
-        
-        # 데이터프레임 생성
-        player_df = pd.DataFrame([player_info]) if player_info else None
-        matches_df = pd.DataFrame(match_data) if match_data else None
-        stats_df = pd.DataFrame(stats_data) if stats_data else None
+        with metrics.stage('extract'):
+            # 필요한 필드만 한 번 골라 검증한 뒤 세 추출 함수가 함께 사용
+            try:
+                payload = decode_player_payload(player_data)
+            except PayloadValidationError as e:
+                logger.warning("오류: 선수 ID %s의 데이터 형식이 올바르지 않습니다: %s", player_id, e)
+                return None, [], []
+            
+            # 데이터 추출
+            player_info = extract_player_info(payload)
+            match_data = extract_match_data(payload)
+            stats_data = extract_stats_data(payload)
         
         # 결과 요약
-        print("\n----- 처리 결과 요약 -----")
-        print(f"선수 기본 정보: {'성공' if player_df is not None else '실패'}")
-        print(f"경기 데이터: {'성공 - ' + str(len(match_data)) + '개 항목' if matches_df is not None else '없음'}")
-        print(f"통계 데이터: {'성공 - ' + str(len(stats_data)) + '개 항목' if stats_df is not None else '없음'}")
-        
-        print(f"\nSuccessfully processed data for player {player_id}")
-        return player_df, matches_df, stats_df
+        log_event(logger, logging.DEBUG, 'player_processed',
+                  "선수 ID %s 처리 완료: 기본 정보 %s, 경기 %d개, 통계 %d개",
+                  player_id, '성공' if player_info else '실패', len(match_data), len(stats_data),
+                  player_id=player_id, player_ok=bool(player_info), matches=len(match_data), stats=len(stats_data))
+        return player_info or None, match_data, stats_data
     except Exception as e:
-        print(f"\n----- 오류 발생 -----")
-        print(f"Error processing player {player_id}: {str(e)}")
-        print(f"오류 종류: {type(e).__name__}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
-        return None, None, None
+        logger.exception("Error processing player %s: %s (%s)", player_id, e, type(e).__name__)
+        return None, [], []
 
+@metrics.stage('csv_save')
 def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename='football_players_data'):
     """수집된 데이터를 CSV 파일에 저장 (기존 데이터 유지하며 업데이트)"""
     try:
@@ -114,27 +136,27 @@ def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename
                     duplicate_ids = existing_ids.intersection(new_ids)
                     
                     if duplicate_ids:
-                        print(f"중복된 선수 ID {len(duplicate_ids)}개 발견: 최신 데이터로 업데이트합니다.")
+                        logger.debug("중복된 선수 ID %s개 발견: 최신 데이터로 업데이트합니다.", len(duplicate_ids))
                         # 중복 ID 제거 (새 데이터 우선)
                         existing_players_df = existing_players_df[~existing_players_df['id'].isin(duplicate_ids)]
                     
                     # 기존 데이터에 새 데이터 추가
                     final_players_df = pd.concat([existing_players_df, new_players_df], ignore_index=True)
-                    print(f"선수 정보: 기존 {len(existing_players_df)}개 + 신규 {len(new_players_df)}개 = 총 {len(final_players_df)}개")
+                    logger.debug("선수 정보: 기존 %s개 + 신규 %s개 = 총 %s개", len(existing_players_df), len(new_players_df), len(final_players_df))
                 except Exception as e:
-                    print(f"기존 선수 파일을 읽는 중 오류 발생: {e}. 새 데이터만 저장합니다.")
+                    logger.warning("기존 선수 파일을 읽는 중 오류 발생: %s. 새 데이터만 저장합니다.", e)
                     final_players_df = new_players_df
             else:
                 final_players_df = new_players_df
                 
-            # 선수 정보 저장
-            final_players_df.to_csv(players_file, index=False)
-            print(f"Saved {len(final_players_df)} player records to '{players_file}'")
+            # 선수 정보 저장 (임시 파일에 쓴 뒤 이름을 바꿔 중단되어도 기존 파일이 깨지지 않음)
+            atomic_write_csv(final_players_df, players_file)
+            logger.info("Saved %s player records to '%s'", len(final_players_df), players_file)
             
             # 선수 ID 목록 파일 업데이트
             id_name_df = final_players_df[['id', 'name', 'team']].copy()
-            id_name_df.to_csv(id_name_file, index=False)
-            print(f"Updated player ID list in '{id_name_file}'")
+            atomic_write_csv(id_name_df, id_name_file)
+            logger.info("Updated player ID list in '%s'", id_name_file)
         
         # 2. 경기 데이터 처리 (선수 ID + 경기 ID를 복합키로 사용)
         if not new_matches_df.empty:
@@ -152,7 +174,7 @@ def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename
                         duplicate_keys = existing_keys.intersection(new_keys)
                         
                         if duplicate_keys:
-                            print(f"중복된 경기 데이터 {len(duplicate_keys)}개 발견: 최신 데이터로 업데이트합니다.")
+                            logger.debug("중복된 경기 데이터 %s개 발견: 최신 데이터로 업데이트합니다.", len(duplicate_keys))
                             existing_matches_df = existing_matches_df[~existing_matches_df['composite_key'].isin(duplicate_keys)]
                         
                         # 복합키 컬럼 제거
@@ -160,16 +182,16 @@ def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename
                         new_matches_df = new_matches_df.drop('composite_key', axis=1)
                     
                     final_matches_df = pd.concat([existing_matches_df, new_matches_df], ignore_index=True)
-                    print(f"경기 데이터: 기존 {len(existing_matches_df)}개 + 신규 {len(new_matches_df)}개 = 총 {len(final_matches_df)}개")
+                    logger.debug("경기 데이터: 기존 %s개 + 신규 %s개 = 총 %s개", len(existing_matches_df), len(new_matches_df), len(final_matches_df))
                 except Exception as e:
-                    print(f"기존 경기 파일을 읽는 중 오류 발생: {e}. 새 데이터만 저장합니다.")
+                    logger.warning("기존 경기 파일을 읽는 중 오류 발생: %s. 새 데이터만 저장합니다.", e)
                     final_matches_df = new_matches_df
             else:
                 final_matches_df = new_matches_df
                 
             # 경기 데이터 저장
-            final_matches_df.to_csv(matches_file, index=False)
-            print(f"Saved {len(final_matches_df)} match records to '{matches_file}'")
+            atomic_write_csv(final_matches_df, matches_file)
+            logger.info("Saved %s match records to '%s'", len(final_matches_df), matches_file)
         
         # 3. 통계 데이터 처리 (선수 ID + 시즌 + 통계 제목을 복합키로 사용)
         if not new_stats_df.empty:
@@ -187,7 +209,7 @@ def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename
                         duplicate_keys = existing_keys.intersection(new_keys)
                         
                         if duplicate_keys:
-                            print(f"중복된 통계 데이터 {len(duplicate_keys)}개 발견: 최신 데이터로 업데이트합니다.")
+                            logger.debug("중복된 통계 데이터 %s개 발견: 최신 데이터로 업데이트합니다.", len(duplicate_keys))
                             existing_stats_df = existing_stats_df[~existing_stats_df['composite_key'].isin(duplicate_keys)]
                         
                         # 복합키 컬럼 제거
@@ -195,132 +217,298 @@ def save_to_csv(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename
                         new_stats_df = new_stats_df.drop('composite_key', axis=1)
                     
                     final_stats_df = pd.concat([existing_stats_df, new_stats_df], ignore_index=True)
-                    print(f"통계 데이터: 기존 {len(existing_stats_df)}개 + 신규 {len(new_stats_df)}개 = 총 {len(final_stats_df)}개")
+                    logger.debug("통계 데이터: 기존 %s개 + 신규 %s개 = 총 %s개", len(existing_stats_df), len(new_stats_df), len(final_stats_df))
                 except Exception as e:
-                    print(f"기존 통계 파일을 읽는 중 오류 발생: {e}. 새 데이터만 저장합니다.")
+                    logger.warning("기존 통계 파일을 읽는 중 오류 발생: %s. 새 데이터만 저장합니다.", e)
                     final_stats_df = new_stats_df
             else:
                 final_stats_df = new_stats_df
                 
             # 통계 데이터 저장
-            final_stats_df.to_csv(stats_file, index=False)
-            print(f"Saved {len(final_stats_df)} stat records to '{stats_file}'")
+            atomic_write_csv(final_stats_df, stats_file)
+            logger.info("Saved %s stat records to '%s'", len(final_stats_df), stats_file)
+        
+        logger.info("All data successfully saved with base name '%s'", base_filename)
+        return True
+    except Exception as e:
+        metrics.STAGE_ERRORS.labels(stage='csv_save').inc()
+        logger.exception("Error saving data to CSV: %s", e)
+        return False
+
+# base_filename별 저장 엔진 (프로세스 안에서 재사용)
+_storage_engines = {}
+
+def get_storage_engine(base_filename='football_players_data'):
+    """base_filename에 해당하는 증분 저장 엔진 반환"""
+    if base_filename not in _storage_engines:
+        _storage_engines[base_filename] = StorageEngine(base_filename)
+    return _storage_engines[base_filename]
+
+# base_filename별 페이로드 지문 (저장소 디렉터리 안에 두어 저장소를 지우면 함께 지워짐)
+_fingerprint_stores = {}
+
+def get_fingerprint_store(base_filename='football_players_data'):
+    """base_filename 저장소에 마지막으로 저장한 선수별 페이로드 지문 반환"""
+    if base_filename not in _fingerprint_stores:
+        engine = get_storage_engine(base_filename)
+        _fingerprint_stores[base_filename] = FingerprintStore(os.path.join(engine.root, 'fingerprints.db'))
+    return _fingerprint_stores[base_filename]
+
+# base_filename별 집계 테이블 (저장소 디렉터리 안에 두어 저장소를 지우면 함께 지워짐)
+_aggregate_cubes = {}
+
+def get_aggregate_cube(base_filename='football_players_data'):
+    """base_filename 저장소의 경기/통계 집계 반환 (저장소와 쓰기 세대나 행 수가 다르면 처음 열 때 다시 만듦)"""
+    if base_filename not in _aggregate_cubes:
+        engine = get_storage_engine(base_filename)
+        cube = AggregateCube(os.path.join(engine.root, 'aggregates.db'))
+        # 집계 도입 전 저장소, 저장 도중 중단 등으로 어긋났으면 저장소 전체로 다시 계산
+        # (같은 키를 덮어쓰면 행 수는 그대로이므로 쓰기 세대로 확인)
+        tables = ('matches', 'stats')
+        if any(cube.generation(table) != engine.generation(table) or cube.fact_count(table) != engine.row_count(table)
+               for table in tables):
+            cube.rebuild(engine.read_table('matches'), engine.read_table('stats'))
+            for table in tables:
+                cube.set_generation(table, engine.generation(table))
+        _aggregate_cubes[base_filename] = cube
+    return _aggregate_cubes[base_filename]
+
+# base_filename별 통계 행렬 (메모리에서 갱신하고 CSV로 내보낼 때 저장소 디렉터리에 파일로 저장)
+_stats_matrices = {}
+
+def get_stats_matrix(base_filename='football_players_data'):
+    """base_filename 저장소의 (선수, 시즌) x 통계 항목 행렬 반환 (저장소와 칸 수가 다르면 처음 열 때 다시 만듦)"""
+    if base_filename not in _stats_matrices:
+        engine = get_storage_engine(base_filename)
+        matrix = StatsMatrix.load(os.path.join(engine.root, 'stats_matrix.npz'))
+        if matrix is None or matrix.cell_count() != engine.row_count('stats'):
+            matrix = StatsMatrix()
+            matrix.apply(engine.read_table('stats'))
+            logger.info("통계 행렬을 다시 만들었습니다 (%s행, 항목 %s개)", len(matrix), len(matrix.titles))
+        _stats_matrices[base_filename] = matrix
+    return _stats_matrices[base_filename]
+
+def save_stats_matrix(base_filename='football_players_data'):
+    """열려 있는 통계 행렬을 저장소 디렉터리에 저장 (열린 적이 없으면 아무것도 하지 않음)"""
+    matrix = _stats_matrices.get(base_filename)
+    if matrix is not None:
+        matrix.save(os.path.join(get_storage_engine(base_filename).root, 'stats_matrix.npz'))
+
+@metrics.stage('store_save')
+def save_to_store(player_dfs=None, matches_dfs=None, stats_dfs=None, base_filename='football_players_data', extra_dfs=None):
+    """새로 수집한 배치만 저장 엔진에 추가 (기존 데이터를 다시 읽거나 쓰지 않음)
+
+    extra_dfs: 추가 테이블 이름(career, seasons, traits, trophies) -> 데이터프레임 목록
+    """
+    try:
+        engine = get_storage_engine(base_filename)
+        # 배치를 저장하기 전에 집계를 열어 둠 (저장 후에 처음 열면 세대가 달라 전체를 다시 계산함)
+        cube = get_aggregate_cube(base_filename)
+        
+        tables = [('players', player_dfs), ('matches', matches_dfs), ('stats', stats_dfs)]
+        tables.extend((extra_dfs or {}).items())
+        for table, dfs in tables:
+            dfs = [df for df in (dfs or []) if df is not None and not df.empty]
+            if dfs:
+                df = pd.concat(dfs, ignore_index=True)
+                count = engine.upsert(table, df)
+                # 같은 배치를 집계에 반영 (다시 저장된 키는 예전 값을 빼고 새 값을 더함)
+                cube.apply(table, df)
+                if table in ('matches', 'stats'):
+                    cube.set_generation(table, engine.generation(table))
+                if table == 'stats':
+                    get_stats_matrix(base_filename).apply(df)
+                logger.info("%s 데이터 %s개를 저장소에 추가했습니다 (총 %s개)", table, count, engine.row_count(table))
+        
+        return True
+    except Exception as e:
+        metrics.STAGE_ERRORS.labels(stage='store_save').inc()
+        logger.exception("Error saving data to store: %s", e)
+        return False
+
+def save_batch(batch, base_filename='football_players_data', sqlite_path=None):
+    """BatchExtractor에 모아 둔 행을 테이블마다 데이터프레임 하나로 만들어 저장소(와 SQLite)에 저장한 뒤 비움
+
+    저장에 실패하면 버퍼를 그대로 두어 다음 저장 때 다시 시도함 (처리 상태는 이미 기록되어 다시 수집되지 않으므로).
+    같은 키는 나중 행으로 대체되므로 일부 테이블만 저장된 뒤 다시 저장해도 중복되지 않음.
+    """
+    players_df, matches_df, stats_df = batch.to_frames()
+    # MultiTableExtractor면 경력/시즌 목록/특성/트로피 테이블도 함께 저장 (SQLite에는 세 테이블만 저장)
+    extra_dfs = {table: [df] for table, df in batch.extra_frames().items()} if hasattr(batch, 'extra_frames') else None
+    saved = save_to_store([players_df], [matches_df], [stats_df], base_filename, extra_dfs)
+    if sqlite_path:
+        saved = save_to_sqlite([players_df], [matches_df], [stats_df], sqlite_path) and saved
+    if saved:
+        batch.clear()
+    return saved
+
+@metrics.stage('csv_save')
+def export_store_to_csv(base_filename='football_players_data'):
+    """저장 엔진의 현재 데이터를 기존 CSV 파일 형식으로 내보내기"""
+    try:
+        engine = get_storage_engine(base_filename)
+        engine.close()
+        engine.export_csv()
+        save_stats_matrix(base_filename)
+        logger.info("All data successfully saved with base name '%s'", base_filename)
+        return True
+    except Exception as e:
+        metrics.STAGE_ERRORS.labels(stage='csv_save').inc()
+        logger.exception("Error exporting store to CSV: %s", e)
+        return False
+
+def export_aggregates(base_filename='football_players_data'):
+    """집계 테이블에서 팀/리그/통계 요약을 CSV로 내보내기 (경기 행 전체를 다시 읽지 않음)"""
+    try:
+        cube = get_aggregate_cube(base_filename)
+        for name, df in (('team_summary', cube.team_summary()),
+                         ('league_summary', cube.league_summary()),
+                         ('stat_summary', cube.stat_summary())):
+            df.to_csv(f"{base_filename}_{name}.csv", index=False)
+            logger.info("%s %s개 그룹을 내보냈습니다", name, len(df))
+        return True
+    except Exception as e:
+        logger.exception("Error exporting aggregates: %s", e)
+        return False
+
+def replace_store_contents(players_df=None, matches_df=None, stats_df=None, base_filename='football_players_data',
+                           extra_dfs=None):
+    """저장소를 비우고 주어진 테이블로 한 번에 다시 채운 뒤 CSV로 내보내기 (전체 재구축용)
+
+    extra_dfs: 추가 테이블 이름 -> 데이터프레임
+    """
+    try:
+        engine = _storage_engines.pop(base_filename, None)
+        if engine is not None:
+            engine.close()
+        for stores in (_fingerprint_stores, _aggregate_cubes):
+            store = stores.pop(base_filename, None)
+            if store is not None:
+                store.close()
+        _stats_matrices.pop(base_filename, None)
+        store_root = f"{base_filename}_store"
+        if os.path.exists(store_root):
+            shutil.rmtree(store_root)
+        
+        # 예전 CSV를 가져오지 않는 빈 저장소에 테이블마다 한 번씩 기록
+        engine = StorageEngine(base_filename, import_csv=False)
+        _storage_engines[base_filename] = engine
+        tables = [('players', players_df), ('matches', matches_df), ('stats', stats_df)]
+        tables.extend((extra_dfs or {}).items())
+        for table, df in tables:
+            count = engine.upsert(table, df)
+            logger.info("%s 데이터 %s개로 저장소를 다시 만들었습니다", table, count)
+        
+        engine.export_csv()
+        get_stats_matrix(base_filename)
+        save_stats_matrix(base_filename)
+        return True
+    except Exception as e:
+        logger.exception("Error rebuilding store: %s", e)
+        return False
+
+def export_store_to_parquet(base_filename='football_players_data', output_dir=None):
+    """저장 엔진의 현재 데이터를 타입이 지정된 Parquet 데이터셋으로 내보내기 (pyarrow 필요)"""
+    try:
+        from parquet_sink import write_parquet_tables
         
-        print(f"All data successfully saved with base name '{base_filename}'")
+        engine = get_storage_engine(base_filename)
+        engine.close()
+        write_parquet_tables(
+            engine.read_table('players'),
+            engine.read_table('matches'),
+            engine.read_table('stats'),
+            output_dir or f"{base_filename}_parquet",
+        )
         return True
     except Exception as e:
-        print(f"Error saving data to CSV: {e}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
+        logger.exception("Error exporting store to Parquet: %s", e)
         return False
 
+# DB 경로별 SQLite 저장소 (프로세스 안에서 재사용)
+_sqlite_stores = {}
+
+def get_sqlite_store(db_path='football_players_data.db'):
+    """db_path에 해당하는 SQLite 저장소 반환"""
+    if db_path not in _sqlite_stores:
+        _sqlite_stores[db_path] = SQLiteStore(db_path)
+    return _sqlite_stores[db_path]
+
+def save_to_sqlite(player_dfs=None, matches_dfs=None, stats_dfs=None, db_path='football_players_data.db'):
+    """수집된 배치를 SQLite에 upsert (배치 하나가 하나의 트랜잭션)"""
+    try:
+        counts = get_sqlite_store(db_path).save(player_dfs, matches_dfs, stats_dfs)
+        for table, count in counts.items():
+            logger.info("%s 데이터 %s개를 '%s'에 저장했습니다", table, count, db_path)
+        return True
+    except Exception as e:
+        logger.exception("Error saving data to SQLite: %s", e)
+        return False
+
+# 처리한 ID 장부 (프로세스 안에서 하나만 사용)
+_processed_ledger = None
+_processed_ledger_path = 'processed_player_ids.csv'
+
+def get_processed_ledger():
+    """processed_player_ids.csv 기반 추가 전용 장부 반환"""
+    global _processed_ledger
+    if _processed_ledger is None:
+        _processed_ledger = ProcessedLedger(_processed_ledger_path)
+        # 종료 시 아직 fsync하지 않은 기록 반영
+        atexit.register(_processed_ledger.close)
+    return _processed_ledger
+
+def configure_processed_ledger(snapshot_path):
+    """이 프로세스가 사용할 장부 파일 변경 (구간 분할 탐색의 작업 프로세스는 각자 장부에 기록)"""
+    global _processed_ledger, _processed_ledger_path
+    if _processed_ledger is not None:
+        _processed_ledger.close()
+        # 이미 닫았으므로 종료 시 다시 닫지 않음 (그 사이 장부 디렉터리가 지워졌을 수 있음)
+        atexit.unregister(_processed_ledger.close)
+        _processed_ledger = None
+    _processed_ledger_path = snapshot_path
+
 def load_processed_ids():
-    """이미 처리한 선수 ID와 결과를 불러옴"""
+    """이미 처리한 선수 ID와 결과를 불러옴 (ID -> 결과 비트맵 인덱스, 조회는 O(1))"""
     try:
-        if os.path.exists('processed_player_ids.csv'):
-            df = pd.read_csv('processed_player_ids.csv')
-            # 이미 처리된 ID를 사전 형태로 변환 (ID -> 결과)
-            processed_ids = dict(zip(df['player_id'], df['status']))
-            print(f"Loaded {len(processed_ids)} previously processed player IDs")
-            return processed_ids
+        ledger = get_processed_ledger()
+        # 다른 프로세스가 그동안 기록한 내용 반영
+        ledger.refresh()
+        if ledger.statuses:
+            logger.info("Loaded %s previously processed player IDs", len(ledger.statuses))
         else:
-            print("No previously processed IDs found")
-            return {}
+            logger.info("No previously processed IDs found")
+        return ledger.statuses
     except Exception as e:
-        print(f"Error loading processed IDs: {e}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
-        return {}
+        logger.exception("Error loading processed IDs: %s", e)
+        return StatusIndex()
 
 def save_processed_id(player_id, status):
-    """처리한 선수 ID와 결과를 CSV에 저장"""
+    """처리한 선수 ID와 결과를 장부 저널에 추가"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     try:
-        new_row = {'player_id': player_id, 'status': status, 'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-        
-        # 파일 잠금을 통한 동시 접근 방지
-        max_retries = 5
-        retry_delay = 1
-        
-        for attempt in range(max_retries):
-            try:
-                # 기존 파일이 있으면 추가, 없으면 새로 생성
-                if os.path.exists('processed_player_ids.csv'):
-                    try:
-                        df = pd.read_csv('processed_player_ids.csv')
-                        
-                        # 이미 처리된 ID인지 확인
-                        if player_id in df['player_id'].values:
-                            # 이미 있는 ID는 업데이트
-                            idx = df[df['player_id'] == player_id].index[0]
-                            df.at[idx, 'status'] = status
-                            df.at[idx, 'timestamp'] = new_row['timestamp']
-                        else:
-                            # 새 ID 추가
-                            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                    except pd.errors.EmptyDataError:
-                        # 파일이 비어있는 경우
-                        print(f"Warning: processed_player_ids.csv exists but is empty. Creating new file.")
-                        df = pd.DataFrame([new_row])
-                    except Exception as e:
-                        print(f"Error reading processed_player_ids.csv: {e}")
-                        # 파일이 손상된 경우, 백업 후 새로 생성
-                        backup_file = f'processed_player_ids_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-                        print(f"Creating backup of existing file as {backup_file} and recreating")
-                        try:
-                            import shutil
-                            shutil.copy2('processed_player_ids.csv', backup_file)
-                        except Exception as be:
-                            print(f"Failed to create backup: {be}")
-                        df = pd.DataFrame([new_row])
-                else:
-                    # 새 파일 생성
-                    df = pd.DataFrame([new_row])
-                
-                # CSV 저장
-                df.to_csv('processed_player_ids.csv', index=False)
-                return True
-                
-            except PermissionError:
-                # 파일이 다른 프로세스에 의해 사용 중인 경우
-                if attempt < max_retries - 1:
-                    print(f"CSV 파일 접근 충돌. {retry_delay}초 후 재시도 ({attempt+1}/{max_retries})...")
-                    time.sleep(retry_delay)
-                else:
-                    # 마지막 시도에서도 실패한 경우 별도 파일에 저장
-                    fallback_file = f'processed_player_ids_temp_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-                    print(f"CSV 파일 접근이 계속 실패하여 임시 파일 {fallback_file}에 저장합니다.")
-                    pd.DataFrame([new_row]).to_csv(fallback_file, index=False)
-                    return False
-            except Exception as e:
-                # 마지막 시도에서도 실패한 경우 별도 파일에 저장
-                print(f"ID {player_id} 저장 중 예상치 못한 오류 발생: {str(e)}")
-                fallback_file = f'processed_player_ids_error_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
-                print(f"임시 파일 {fallback_file}에 저장합니다.")
-                pd.DataFrame([new_row]).to_csv(fallback_file, index=False)
-                break
-                
+        get_processed_ledger().record(player_id, status, timestamp)
+        return True
     except Exception as e:
-        print(f"Error saving processed ID {player_id}: {e}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
+        logger.exception("Error saving processed ID %s: %s", player_id, e)
         
         # 오류가 발생해도 데이터 손실을 막기 위해 임시 파일에 저장
         try:
             emergency_file = f'player_id_{player_id}_status_{status}.txt'
             with open(emergency_file, 'w') as f:
-                f.write(f"player_id: {player_id}\nstatus: {status}\ntimestamp: {new_row['timestamp']}")
-            print(f"긴급 백업 파일 {emergency_file}에 정보를 저장했습니다.")
+                f.write(f"player_id: {player_id}\nstatus: {status}\ntimestamp: {timestamp}")
+            logger.warning("긴급 백업 파일 %s에 정보를 저장했습니다.", emergency_file)
         except:
-            print("긴급 백업 파일 생성도 실패했습니다.")
+            logger.error("긴급 백업 파일 생성도 실패했습니다.")
             
         return False
 
 def get_valid_player_ids():
     """유효한 선수 ID만 추출"""
     try:
-        if os.path.exists('processed_player_ids.csv'):
-            df = pd.read_csv('processed_player_ids.csv')
-            valid_ids = df[df['status'].str.startswith('valid')]['player_id'].tolist()
-            return valid_ids
-        return []
+        ledger = get_processed_ledger()
+        ledger.refresh()
+        return ledger.statuses.ids(*VALID_STATUSES)
     except Exception as e:
-        print(f"유효한 선수 ID 추출 중 오류 발생: {e}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
-        return []
\ No newline at end of file
+        logger.exception("유효한 선수 ID 추출 중 오류 발생: %s", e)
+        return []
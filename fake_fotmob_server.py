@@ -0,0 +1,254 @@
+import argparse
+import glob
+import json
+import os
+import random
+import threading
+import math
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+class FakeFotMobHandler(BaseHTTPRequestHandler):
+    """/api/playerData?id= 요청에 raw_data 기반 응답을 돌려주는 핸들러"""
+
+    # keep-alive 연결을 유지해야 클라이언트 세션 재사용이 의미가 있음
+    protocol_version = 'HTTP/1.1'
+    # 헤더와 본문을 따로 쓰므로 Nagle 알고리즘을 끄지 않으면 지연 ACK 때문에 응답마다 수십 ms가 더해짐
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        config = self.server.config
+        parsed = urlparse(self.path)
+
+        if parsed.path != '/api/playerData':
+            self._send(404, b'{}')
+            return
+
+        try:
+            player_id = int(parse_qs(parsed.query)['id'][0])
+        except (KeyError, ValueError, IndexError):
+            self._send(400, b'{"error": "invalid id"}')
+            return
+
+        delay = self.server.sample_latency()
+        if delay > 0:
+            time.sleep(delay)
+
+        # 속도 제한/오류 주입
+        rejection = self.server.admit()
+        if rejection is not None:
+            status, headers = rejection
+            self._send(status, b'{"error": "throttled"}' if status == 429 else b'{"error": "unavailable"}', headers)
+            return
+
+        fault = self.server.inject_fault()
+        if fault == 'timeout':
+            # 클라이언트 타임아웃보다 오래 기다린 뒤 응답 없이 연결을 끊음
+            self.server.count('timeouts')
+            time.sleep(config['timeout_delay'])
+            self.close_connection = True
+            return
+
+        body = self.server.payload_for(player_id)
+        if body is None:
+            self.server.count('not_found')
+            self._send(404, b'{}')
+        elif fault == 'malformed':
+            # 중간에 잘린 JSON
+            self.server.count('malformed')
+            self._send(200, body[:max(1, len(body) // 2)])
+        else:
+            self.server.count('ok')
+            self._send(200, body)
+
+    def handle_one_request(self):
+        try:
+            super().handle_one_request()
+        except (BrokenPipeError, ConnectionResetError):
+            # 타임아웃 주입 등으로 클라이언트가 먼저 연결을 끊음
+            self.close_connection = True
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 요청마다 출력하지 않음
+        pass
+
+class FakeFotMobServer(ThreadingHTTPServer):
+    """FotMob API를 흉내 내는 로컬 테스트 서버
+
+    - raw_data의 선수 ID는 저장된 원본을, 그 외 ID는 valid_ratio 비율로 원본을 본뜬 합성 payload를 돌려주고
+      나머지는 404 (같은 ID는 항상 같은 결과)
+    - 응답 지연은 latency를 평균으로 latency_dist 분포에서 뽑음
+      ('fixed', 'uniform': 0~2배 균등, 'exponential', 'lognormal': latency_sigma가 클수록 꼬리가 김)
+    - max_rps를 주면 초당 요청 수가 넘는 요청에 429를 돌려주고 (retry_after가 있으면 Retry-After 헤더 포함),
+      error_ratio 비율의 요청에는 503을 돌려줌
+    - timeout_ratio 비율의 요청은 timeout_delay초 동안 응답하지 않고, malformed_ratio 비율의 요청에는 잘린 JSON을 돌려줌
+    stats에 응답 종류별 개수를 기록함.
+    """
+
+    daemon_threads = True
+    # 타임아웃 주입으로 잠들어 있는 요청 스레드를 종료할 때 기다리지 않음
+    block_on_close = False
+
+    LATENCY_DISTRIBUTIONS = ('fixed', 'uniform', 'exponential', 'lognormal')
+    STAT_KEYS = ('requests', 'ok', 'not_found', 'throttled', 'errors', 'timeouts', 'malformed')
+
+    def __init__(self, address, raw_dir='raw_data', latency=0.05, valid_ratio=0.3, seed=0,
+                 max_rps=None, retry_after=None, error_ratio=0.0, latency_dist='fixed', latency_sigma=1.0,
+                 timeout_ratio=0.0, timeout_delay=30.0, malformed_ratio=0.0):
+        if latency_dist not in self.LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"알 수 없는 지연 분포: {latency_dist}")
+        super().__init__(address, FakeFotMobHandler)
+        self.config = {
+            'latency': latency,
+            'latency_dist': latency_dist,
+            'latency_sigma': latency_sigma,
+            'valid_ratio': valid_ratio,
+            'seed': seed,
+            'max_rps': max_rps,
+            'retry_after': retry_after,
+            'error_ratio': error_ratio,
+            'timeout_ratio': timeout_ratio,
+            'timeout_delay': timeout_delay,
+            'malformed_ratio': malformed_ratio,
+        }
+        self.stats = dict.fromkeys(self.STAT_KEYS, 0)
+        self._stats_lock = threading.Lock()
+        self._tokens = float(max_rps or 0)
+        self._last_refill = time.monotonic()
+        self._error_random = random.Random(seed)
+        self._latency_random = random.Random(seed + 1)
+        self.raw_dir = raw_dir
+        self.templates = []
+        for path in sorted(glob.glob(os.path.join(raw_dir, 'player_*.json'))):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.templates.append(json.load(f))
+
+    def count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def reset_stats(self):
+        with self._stats_lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+    def sample_latency(self):
+        """설정한 분포에서 응답 지연 시간(초)을 뽑음"""
+        config = self.config
+        mean = config['latency']
+        if mean <= 0:
+            return 0.0
+        dist = config['latency_dist']
+        with self._stats_lock:
+            rng = self._latency_random
+            if dist == 'uniform':
+                return rng.uniform(0, 2 * mean)
+            if dist == 'exponential':
+                return rng.expovariate(1 / mean)
+            if dist == 'lognormal':
+                # 평균이 mean이 되도록 mu를 맞춤
+                sigma = config['latency_sigma']
+                return rng.lognormvariate(math.log(mean) - sigma ** 2 / 2, sigma)
+        return mean
+
+    def inject_fault(self):
+        """이번 요청에 주입할 장애 ('timeout', 'malformed' 또는 None. 잘린 JSON은 200 응답에만 적용)"""
+        config = self.config
+        if not config['timeout_ratio'] and not config['malformed_ratio']:
+            return None
+        with self._stats_lock:
+            roll = self._error_random.random()
+            if roll < config['timeout_ratio']:
+                return 'timeout'
+            if roll < config['timeout_ratio'] + config['malformed_ratio']:
+                return 'malformed'
+        return None
+
+    def admit(self):
+        """요청을 받을지 결정 (거절하면 (상태 코드, 헤더), 받으면 None)"""
+        config = self.config
+        with self._stats_lock:
+            self.stats['requests'] += 1
+
+            if config['max_rps']:
+                # 서버 쪽 토큰 버킷 (1초 분량까지 몰아서 받을 수 있음)
+                now = time.monotonic()
+                self._tokens = min(config['max_rps'], self._tokens + (now - self._last_refill) * config['max_rps'])
+                self._last_refill = now
+                if self._tokens < 1:
+                    self.stats['throttled'] += 1
+                    headers = {}
+                    if config['retry_after'] is not None:
+                        headers['Retry-After'] = str(config['retry_after'])
+                    return 429, headers
+                self._tokens -= 1
+
+            if config['error_ratio'] and self._error_random.random() < config['error_ratio']:
+                self.stats['errors'] += 1
+                return 503, {}
+        return None
+
+    def payload_for(self, player_id):
+        """선수 ID에 대한 응답 본문 (유효하지 않은 ID면 None)"""
+        raw_path = os.path.join(self.raw_dir, f'player_{player_id}.json')
+        if os.path.exists(raw_path):
+            with open(raw_path, 'rb') as f:
+                return f.read()
+
+        # 같은 ID는 항상 같은 결과가 나오도록 ID 기반 난수 사용
+        rng = random.Random(player_id * 7919 + self.config['seed'])
+        if not self.templates or rng.random() >= self.config['valid_ratio']:
+            return None
+
+        payload = dict(rng.choice(self.templates))
+        payload['id'] = player_id
+        payload['name'] = f"{payload.get('name', 'Player')} {player_id}"
+        return json.dumps(payload, ensure_ascii=False).encode('utf-8')
+
+def start_server(host='127.0.0.1', port=0, **config):
+    """백그라운드 스레드에서 서버를 시작하고 (서버, 기본 주소) 반환"""
+    server = FakeFotMobServer((host, port), **config)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://{host}:{server.server_address[1]}"
+    return server, base_url
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='로컬 FotMob 대체 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--raw-dir', default='raw_data')
+    parser.add_argument('--latency', type=float, default=0.05, help='평균 응답 지연 시간(초)')
+    parser.add_argument('--latency-dist', default='fixed', choices=FakeFotMobServer.LATENCY_DISTRIBUTIONS)
+    parser.add_argument('--latency-sigma', type=float, default=1.0, help='lognormal 분포의 sigma')
+    parser.add_argument('--valid-ratio', type=float, default=0.3, help='유효한 ID 비율 (나머지는 404)')
+    parser.add_argument('--max-rps', type=float, help='초당 최대 요청 수 (넘으면 429)')
+    parser.add_argument('--retry-after', type=int, help='429 응답의 Retry-After 헤더 값(초)')
+    parser.add_argument('--error-ratio', type=float, default=0.0, help='503을 돌려줄 요청 비율')
+    parser.add_argument('--timeout-ratio', type=float, default=0.0, help='응답하지 않을 요청 비율')
+    parser.add_argument('--timeout-delay', type=float, default=30.0, help='응답하지 않는 요청이 기다리는 시간(초)')
+    parser.add_argument('--malformed-ratio', type=float, default=0.0, help='잘린 JSON을 돌려줄 요청 비율')
+    args = parser.parse_args()
+
+    server = FakeFotMobServer((args.host, args.port), raw_dir=args.raw_dir,
+                              latency=args.latency, valid_ratio=args.valid_ratio,
+                              max_rps=args.max_rps, retry_after=args.retry_after, error_ratio=args.error_ratio,
+                              latency_dist=args.latency_dist, latency_sigma=args.latency_sigma,
+                              timeout_ratio=args.timeout_ratio, timeout_delay=args.timeout_delay,
+                              malformed_ratio=args.malformed_ratio)
+    print(f"Fake FotMob server listening on http://{args.host}:{args.port}")
+    print(f"FOTMOB_API_BASE_URL=http://{args.host}:{args.port} 로 설정하여 사용하세요")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("서버를 종료합니다.")
@@ -1,38 +1,83 @@
+import logging
 import time
-import traceback
 
-from data_processor import process_player_data, save_to_csv, load_processed_ids, save_processed_id
-from api_functions import fetch_player_data
+from adaptive_probe import AdaptiveProber
+from batch_sink import BatchSink
+from data_processor import process_player_rows, export_store_to_csv, load_processed_ids, save_processed_id
+from api_functions import fetch_player_data, set_rate_controller
+from log_utils import ProgressReporter, get_logger, log_event
+import metrics
+from pipeline import PlayerPipeline
+from rate_control import RateController
 
-def explore_player_ids(start_id, end_id, batch_size=10, delay=2, base_filename='football_players_data'):
-    """주어진 범위 내의 선수 ID를 탐색하고 유효한 ID 처리"""
-    print(f"\n{'*'*70}")
-    print(f"Starting exploration of player IDs from {start_id} to {end_id}")
-    print(f"{'*'*70}\n")
+logger = get_logger('explorer')
+
+def _make_prober(start_id, end_id, processed_ids, strategy):
+    """탐색 방식에 맞는 AdaptiveProber 생성 ('full'이면 None: 범위의 모든 ID를 순서대로 확인)"""
+    if strategy == 'full':
+        return None
+    if strategy not in ('adaptive', 'adaptive_backfill'):
+        raise ValueError(f"지원하지 않는 탐색 방식: {strategy}")
+    return AdaptiveProber(start_id, end_id, processed_ids, backfill=strategy == 'adaptive_backfill')
+
+def _skipped_summary(processed_ids, start_id, end_id):
+    """범위 안에서 이미 처리된 ID의 결과별 통계 (비트맵 인덱스에서 범위 단위로 계산)"""
+    counts = processed_ids.count_range(start_id, end_id)
+    valid = counts['valid_processed'] + counts['valid_error']
+    return {
+        'checked': sum(counts.values()),
+        'valid': valid,
+        # 이전 실행의 processing_error는 기존처럼 무효로 집계
+        'invalid': counts['invalid'] + counts['processing_error'],
+        'errors': counts['valid_error'],
+    }
+
+def _log_probe_summary(prober):
+    if prober is not None:
+        log_event(logger, logging.INFO, 'probe_summary',
+                  "적응형 탐색 요청: 본 탐색 %d회, 주변 확인 %d회, 보충 탐색 %d회 (아직 확인하지 않은 ID %d개)",
+                  prober.counts['sweep'], prober.counts['neighbor'], prober.counts['backfill'], prober.skipped_count(),
+                  **prober.counts)
+
+def explore_player_ids(start_id, end_id, batch_size=10, delay=2, base_filename='football_players_data', strategy='full'):
+    """주어진 범위 내의 선수 ID를 탐색하고 유효한 ID 처리
+
+    strategy: 'full'은 모든 ID를 순서대로, 'adaptive'는 유효 ID 밀도에 따라 건너뛰며 탐색
+    (건너뛴 ID는 나중에 'adaptive_backfill'로 실행하면 마지막에 확인함).
+    delay는 최소 요청 간격이며, 공유 속도 제어기가 429/5xx를 받으면 간격을 늘렸다가 정상 응답이 이어지면 delay까지 다시 줄임.
+    """
+    logger.info("Starting exploration of player IDs from %s to %s (탐색 방식: %s)", start_id, end_id, strategy)
     
     # 이미 처리한 ID 불러오기
     processed_ids = load_processed_ids()
-    print(f"Found {len(processed_ids)} previously processed IDs")
+    logger.info("Found %d previously processed IDs", len(processed_ids))
+    
+    # 이미 처리된 ID는 하나씩 확인하지 않고 인덱스에서 범위 단위로 건너뛰고 통계만 반영
+    skipped = _skipped_summary(processed_ids, start_id, end_id)
+    logger.info("전체 %d개 중 %d개는 이전에 처리되어 건너뜁니다", end_id - start_id + 1, skipped['checked'])
+    prober = _make_prober(start_id, end_id, processed_ids, strategy)
+    progress = ProgressReporter(logger, total=end_id - start_id + 1 - skipped['checked'] if prober is None else None)
+    
+    # 선수별 데이터프레임 대신 컬럼 버퍼에 행을 모으고, batch_size명 또는 행 수/메모리 예산을 넘으면 저장한 뒤 비움
+    sink = BatchSink(base_filename, max_players=batch_size)
+    checked_counter = skipped['checked']
+    valid_counter = skipped['valid']
+    invalid_counter = skipped['invalid']
+    error_counter = skipped['errors']
     
-    # 데이터프레임 컬렉션 초기화
-    player_dfs = []
-    matches_dfs = []
-    stats_dfs = []
-    batch_counter = 0
-    valid_counter = 0
-    invalid_counter = 0
-    error_counter = 0
+    # delay 간격(초당 1/delay)을 상한으로 요청하고, 429/5xx면 그 아래로 줄였다가 정상 응답이 이어지면 다시 올림
+    rate = 1 / delay if delay and delay > 0 else None
+    set_rate_controller(RateController(rate, max_rate=rate))
     
     try:
-        # 배치 단위로 처리
-        for current_id in range(start_id, end_id + 1):
+        # 배치 단위로 처리 (적응형이면 이미 처리한 ID는 prober가 건너뜀)
+        for current_id in (processed_ids.iter_unexplored(start_id, end_id) if prober is None else prober.iter_ids()):
+            checked_counter += 1
             try:
-                print(f"\n{'>'*30} 현재 ID: {current_id} {'<'*30}")
-                
-                # 이미 처리된 ID면 스킵
+                # 탐색 도중 다른 프로세스가 처리한 ID면 스킵
                 if current_id in processed_ids:
                     status = processed_ids[current_id]
-                    print(f"Player ID {current_id} already processed with status: {status}")
+                    logger.debug("Player ID %s already processed with status: %s", current_id, status)
                     
                     # 통계를 위해 카운터 증가
                     if status.startswith("valid"):
@@ -42,133 +87,166 @@ def explore_player_ids(start_id, end_id, batch_size=10, delay=2, base_filename='
                     else:
                         invalid_counter += 1
                     
+                    progress.update(skipped=1)
                     continue
                 
-                print(f"Exploring player ID: {current_id}")
+                logger.debug("Exploring player ID: %s", current_id)
                 
                 # 데이터 가져오기 시도
                 player_data = fetch_player_data(current_id)
                 
                 # 응답 기본 검증
                 if player_data:
-                    print(f"API 응답 성공. 응답 크기: {len(str(player_data))} 바이트")
-                    
                     # API 응답에 기본 정보가 포함되어 있는지 확인
                     if 'id' in player_data and 'name' in player_data:
-                        print(f"✅ Valid player found: ID {current_id}, Name: {player_data['name']}")
-                        
-                        # 유효한 선수 데이터 처리
-                        player_df, matches_df, stats_df = process_player_data(current_id)
+                        log_event(logger, logging.DEBUG, 'valid_player', "Valid player found: ID %s, Name: %s", current_id, player_data['name'],
+                                  player_id=current_id)
                         
-                        # 데이터프레임 컬렉션에 추가
-                        if player_df is not None:
-                            player_dfs.append(player_df)
-                            print(f"Player info added to collection")
-                        else:
-                            print(f"⚠️ 경고: 선수 정보 추출 실패")
-                            
-                        if matches_df is not None:
-                            matches_dfs.append(matches_df)
-                            print(f"Match data added to collection: {len(matches_df)} records")
+                        # 이미 받아온 데이터로 처리 (같은 선수를 다시 요청하지 않음)
+                        player_info, match_rows, stats_rows = process_player_rows(current_id, player_data)
                         
-                        if stats_df is not None:
-                            stats_dfs.append(stats_df)
-                            print(f"Stats data added to collection: {len(stats_df)} records")
+                        # 배치 버퍼에 추가 (예산을 넘으면 이번 배치만 저장소에 추가하고 메모리에서 비움)
+                        sink.add(player_info, match_rows, stats_rows)
+                        if player_info is None:
+                            log_event(logger, logging.WARNING, 'extract_failed', "선수 정보 추출 실패 (ID %s)", current_id,
+                                      player_id=current_id)
                         
                         # 처리 결과 저장
-                        status = "valid_processed" if player_df is not None else "valid_error"
+                        status = "valid_processed" if player_info is not None else "valid_error"
                         save_processed_id(current_id, status)
                         
                         # 통계 업데이트
                         valid_counter += 1
                         if status == "valid_error":
                             error_counter += 1
-                            
-                        batch_counter += 1
                     else:
-                        print(f"⚠️ 응답은 성공했지만 유효한 선수 데이터가 아닙니다")
-                        print(f"응답에 포함된 키: {list(player_data.keys())}")
-                        print(f"❌ Invalid player ID: {current_id}")
-                        save_processed_id(current_id, "invalid")
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("응답은 성공했지만 유효한 선수 데이터가 아닙니다 (ID %s). 응답에 포함된 키: %s",
+                                         current_id, list(player_data.keys()))
+                        status = "invalid"
+                        save_processed_id(current_id, status)
                         invalid_counter += 1
                 else:
-                    print(f"❌ Invalid player ID: {current_id}")
-                    save_processed_id(current_id, "invalid")
+                    logger.debug("Invalid player ID: %s", current_id)
+                    status = "invalid"
+                    save_processed_id(current_id, status)
                     invalid_counter += 1
                 
-                # 진행 상황 업데이트
-                print(f"\n진행 상황: {current_id - start_id + 1}/{end_id - start_id + 1} 완료 " + 
-                     f"({round((current_id - start_id + 1)/(end_id - start_id + 1)*100, 1)}%)")
-                print(f"유효한 선수: {valid_counter}, 유효하지 않은 ID: {invalid_counter}, 오류 발생: {error_counter}")
-                
-                # API 요청 간 지연
-                print(f"다음 요청까지 {delay}초 대기 중...")
-                time.sleep(delay)
+                if prober is not None:
+                    prober.record(current_id, status.startswith("valid"))
                 
-                # 배치 처리 완료 시 중간 결과 저장
-                if batch_counter > 0 and batch_counter % batch_size == 0:
-                    print(f"\n{'='*50}")
-                    print(f"Completed batch of {batch_size} valid players. Last processed ID: {current_id}")
-                    print(f"Saving interim results to CSV files...")
-                    save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
-                    print(f"Taking a short break before next batch...")
-                    print(f"{'='*50}")
-                    time.sleep(delay * 2)  # 배치 간 추가 지연
+                # 진행 상황 업데이트 (일정 간격으로만 요약 기록)
+                metrics.PLAYERS.labels(status=status).inc()
+                progress.update(**{status: 1})
             
             except Exception as e:
-                print(f"\n{'!'*50}")
-                print(f"ID {current_id} 처리 중 예상치 못한 오류 발생:")
-                print(f"오류 유형: {type(e).__name__}")
-                print(f"오류 내용: {str(e)}")
-                print(f"상세 오류 정보:\n{traceback.format_exc()}")
-                print(f"{'!'*50}")
+                logger.exception("ID %s 처리 중 예상치 못한 오류 발생: %s: %s", current_id, type(e).__name__, e)
                 
                 # 오류 상태 저장
                 save_processed_id(current_id, "processing_error")
                 error_counter += 1
+                if prober is not None:
+                    prober.record(current_id, None)
+                metrics.PLAYERS.labels(status='processing_error').inc()
+                progress.update(processing_error=1)
                 
                 # 짧은 지연 후 계속
                 time.sleep(1)
                 continue
         
         # 최종 결과 저장
-        if player_dfs or matches_dfs or stats_dfs:
-            print("\n최종 결과 저장 중...")
-            save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
+        progress.finish()
+        _log_probe_summary(prober)
+        logger.info("최종 결과 저장 중...")
+        if not sink.is_empty():
+            sink.flush()
+        export_store_to_csv(base_filename)
         
-        print(f"\n{'*'*70}")
-        print(f"Exploration completed for ID range {start_id} to {end_id}")
-        print(f"처리 결과 요약:")
-        print(f"- 검사한 ID 개수: {end_id - start_id + 1}")
-        print(f"- 유효한 선수 ID: {valid_counter}")
-        print(f"- 유효하지 않은 ID: {invalid_counter}")
-        print(f"- 오류 발생: {error_counter}")
-        print(f"{'*'*70}")
+        log_event(logger, logging.INFO, 'exploration_finished',
+                  "Exploration completed for ID range %s to %s - 검사 %d개, 유효 %d개, 무효 %d개, 오류 %d개",
+                  start_id, end_id, checked_counter, valid_counter, invalid_counter, error_counter,
+                  start_id=start_id, end_id=end_id, valid=valid_counter, invalid=invalid_counter, errors=error_counter)
         
     except KeyboardInterrupt:
-        print("\n\n프로그램이 사용자에 의해 중단되었습니다.")
-        print("지금까지의 결과를 저장합니다...\n")
+        logger.warning("프로그램이 사용자에 의해 중단되었습니다. 지금까지의 결과를 저장합니다...")
         
         # 중단 시점까지의 결과 저장
-        if player_dfs or matches_dfs or stats_dfs:
-            save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
+        if not sink.is_empty():
+            sink.flush()
+        export_store_to_csv(base_filename)
             
         # 요약 정보 출력
-        print(f"처리 요약:")
-        print(f"- 마지막으로 처리한 ID: {current_id}")
-        print(f"- 유효한 선수 ID: {valid_counter}")
-        print(f"- 유효하지 않은 ID: {invalid_counter}")
-        print(f"- 오류 발생: {error_counter}")
+        log_event(logger, logging.INFO, 'exploration_interrupted',
+                  "처리 요약 - 마지막으로 처리한 ID %s, 유효 %d개, 무효 %d개, 오류 %d개",
+                  current_id, valid_counter, invalid_counter, error_counter,
+                  last_id=current_id, valid=valid_counter, invalid=invalid_counter, errors=error_counter)
         
     except Exception as e:
-        print(f"\n{'!'*70}")
-        print(f"탐색 과정에서 치명적인 오류 발생:")
-        print(f"오류 유형: {type(e).__name__}")
-        print(f"오류 내용: {str(e)}")
-        print(f"상세 오류 정보:\n{traceback.format_exc()}")
-        print(f"{'!'*70}")
+        logger.exception("탐색 과정에서 치명적인 오류 발생: %s: %s", type(e).__name__, e)
         
         # 오류 발생 시점까지의 결과 저장
-        if player_dfs or matches_dfs or stats_dfs:
-            print("\n오류 발생 시점까지의 결과를 저장합니다...")
-            save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
\ No newline at end of file
+        if not sink.is_empty():
+            logger.info("오류 발생 시점까지의 결과를 저장합니다...")
+            sink.flush()
+        export_store_to_csv(base_filename)
+    
+    finally:
+        set_rate_controller(None)
+
+def explore_player_ids_concurrent(start_id, end_id, batch_size=10, concurrency=8, requests_per_second=2.0,
+                                  base_filename='football_players_data', sqlite_path=None, strategy='full'):
+    """여러 요청을 동시에 보내면서 전역 초당 요청 수 제한 안에서 선수 ID를 탐색 (strategy는 explore_player_ids와 같음)"""
+    logger.info("Starting concurrent exploration of player IDs from %s to %s (동시 요청 수: %s, 초당 최대 요청 수: %s, 탐색 방식: %s)",
+                start_id, end_id, concurrency, requests_per_second or '기본 속도에서 자동 조절', strategy)
+
+    # 이미 처리한 ID 불러오기
+    processed_ids = load_processed_ids()
+    logger.info("Found %d previously processed IDs", len(processed_ids))
+
+    # 이미 처리된 ID는 파이프라인에 넣지 않고 통계만 반영
+    total = end_id - start_id + 1
+    skipped = _skipped_summary(processed_ids, start_id, end_id)
+    logger.info("전체 %d개 중 %d개는 이전에 처리되어 건너뜁니다", total, skipped['checked'])
+
+    prober = _make_prober(start_id, end_id, processed_ids, strategy)
+    if prober is None:
+        # 진행률은 이번 실행에서 실제로 요청할 ID 수 기준
+        player_ids = processed_ids.iter_unexplored(start_id, end_id)
+        remaining = total - skipped['checked']
+        on_result = None
+    else:
+        # 적응형 탐색은 요청 수를 미리 알 수 없고, 결과를 받을 때마다 다음 탐색 위치에 반영
+        player_ids = prober.iter_ids()
+        remaining = None
+
+        def on_result(item):
+            status = item['status']
+            prober.record(item['player_id'], status.startswith('valid') if status != 'processing_error' else None)
+
+    # 탐색 단계는 동시 요청 수만큼 병렬로, 처리 결과 기록은 sink 단계에서 한 번에
+    pipeline = PlayerPipeline(
+        base_filename=base_filename,
+        fetch_workers=concurrency,
+        batch_size=batch_size,
+        record_status=True,
+        requests_per_second=requests_per_second,
+        sqlite_path=sqlite_path,
+    )
+    try:
+        summary = pipeline.run(player_ids, on_result=on_result, total=remaining)
+    finally:
+        if prober is not None:
+            prober.close()
+    _log_probe_summary(prober)
+
+    for key in ('checked', 'valid', 'invalid', 'errors'):
+        summary[key] += skipped[key]
+
+    log_event(logger, logging.INFO, 'exploration_finished',
+              "Concurrent exploration %s for ID range %s to %s - 검사 %d개, 유효 %d개, 무효 %d개, 오류 %d개",
+              'interrupted' if summary['interrupted'] else 'completed', start_id, end_id,
+              summary['checked'], summary['valid'], summary['invalid'], summary['errors'],
+              start_id=start_id, end_id=end_id, valid=summary['valid'], invalid=summary['invalid'],
+              errors=summary['errors'], interrupted=summary['interrupted'])
+
+    return summary
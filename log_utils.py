@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+
+# 모든 모듈의 로거는 이 이름 아래에 생성됨 (예: kickstats.api)
+ROOT_LOGGER_NAME = 'kickstats'
+
+# 환경 변수로 기본 설정 가능 (setup_logging 인자가 우선)
+LOG_LEVEL_ENV = 'KICKSTATS_LOG_LEVEL'
+LOG_JSON_ENV = 'KICKSTATS_LOG_JSON'
+
+_configure_lock = threading.Lock()
+_configured = False
+
+class JsonLinesFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON 이벤트로 변환
+
+    log_event로 넘긴 필드는 최상위 키로 함께 기록됨.
+    """
+
+    def format(self, record):
+        event = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'fields', None)
+        if fields:
+            event.update(fields)
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+def setup_logging(level=None, json_path=None, console=True):
+    """kickstats 로거 설정 (콘솔은 메시지만, json_path가 있으면 JSON-lines 파일에도 기록)
+
+    level/json_path를 생략하면 KICKSTATS_LOG_LEVEL(기본 INFO), KICKSTATS_LOG_JSON 환경 변수를 사용함.
+    다시 호출하면 기존 핸들러를 교체함.
+    """
+    global _configured
+
+    level = level or os.environ.get(LOG_LEVEL_ENV) or 'INFO'
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    json_path = json_path or os.environ.get(LOG_JSON_ENV)
+
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+            handler.close()
+
+        root.setLevel(level)
+        root.propagate = False
+
+        if console:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(logging.Formatter('%(message)s'))
+            root.addHandler(console_handler)
+
+        if json_path:
+            json_handler = logging.FileHandler(json_path, encoding='utf-8')
+            json_handler.setFormatter(JsonLinesFormatter())
+            root.addHandler(json_handler)
+
+        _configured = True
+
+    return root
+
+def get_logger(name):
+    """모듈용 로거 반환 (아직 설정되지 않았으면 환경 변수 기준 기본 설정 적용)"""
+    if not _configured:
+        with _configure_lock:
+            needs_setup = not _configured
+        if needs_setup:
+            setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{name}")
+
+def log_event(logger, level, event, message, *args, **fields):
+    """구조화된 이벤트 기록 (해당 레벨이 꺼져 있으면 아무것도 만들지 않음)
+
+    message는 logging과 같은 %-형식이며, fields는 JSON-lines 출력에 최상위 키로 들어감.
+    """
+    if logger.isEnabledFor(level):
+        fields['event'] = event
+        logger.log(level, message, *args, extra={'fields': fields})
+
+class ProgressReporter:
+    """진행 상황을 interval초에 한 번만 요약해서 기록하는 보고기
+
+    항목마다 update를 호출해도 실제 로그는 주기적으로만 남기 때문에 긴 탐색에서도 출력량이 일정함.
+    """
+
+    def __init__(self, logger, total=None, interval=5.0, event='progress', label='진행 상황'):
+        self.logger = logger
+        self.total = total
+        self.interval = interval
+        self.event = event
+        self.label = label
+        self.done = 0
+        self.counters = {}
+        self._started = time.monotonic()
+        self._last_report = self._started
+        self._lock = threading.Lock()
+
+    def update(self, done=1, **counters):
+        """처리 개수와 카운터(valid=1 등)를 누적하고 주기가 지났으면 요약 기록"""
+        with self._lock:
+            self.done += done
+            for key, value in counters.items():
+                self.counters[key] = self.counters.get(key, 0) + value
+
+            now = time.monotonic()
+            if now - self._last_report < self.interval:
+                return
+            self._last_report = now
+        self._report(logging.INFO)
+
+    def finish(self):
+        """마지막 요약 기록"""
+        self._report(logging.INFO, final=True)
+
+    def _report(self, level, final=False):
+        if not self.logger.isEnabledFor(level):
+            return
+
+        with self._lock:
+            done = self.done
+            counters = dict(self.counters)
+        elapsed = time.monotonic() - self._started
+        rate = done / elapsed if elapsed > 0 else 0.0
+
+        if self.total:
+            position = f"{done}/{self.total} ({done / self.total * 100:.1f}%)"
+        else:
+            position = f"{done}개"
+        details = ', '.join(f"{key} {value}" for key, value in counters.items())
+        message = f"{self.label}{' (완료)' if final else ''}: {position}, {rate:.1f}개/초"
+        if details:
+            message += f" - {details}"
+
+        log_event(self.logger, level, self.event, message,
+                  done=done, total=self.total, rate=round(rate, 3), elapsed=round(elapsed, 3), final=final, **counters)
@@ -1,20 +1,35 @@
-import time
-
-from data_processor import process_player_data, save_to_csv, get_valid_player_ids
-from id_explorer import explore_player_ids
+from data_processor import get_valid_player_ids
+from id_explorer import explore_player_ids, explore_player_ids_concurrent
+from log_utils import setup_logging
+from metrics import start_from_env
+from pipeline import PlayerPipeline
+from rebuild import rebuild_from_raw
+from refresh_scheduler import build_refresh_scheduler, record_refresh
+from sharded_explorer import explore_player_ids_sharded
 
 def main():
+    # 로그 레벨과 JSON-lines 로그 파일은 KICKSTATS_LOG_LEVEL, KICKSTATS_LOG_JSON 환경 변수로 지정
+    setup_logging()
+    # 지표 엔드포인트(localhost)와 지표 파일은 KICKSTATS_METRICS_PORT, KICKSTATS_METRICS_FILE 환경 변수로 지정
+    start_from_env()
+    # 저장하기 전 메모리에 모아 둘 행 수/메모리 예산은 KICKSTATS_BATCH_MAX_ROWS, KICKSTATS_BATCH_MAX_MB 환경 변수로 지정
+    
     # 선택할 모드
     print("선택할 모드:")
     print("1. 특정 선수 ID 목록 처리 (CSV 파일 생성)")
     print("2. 선수 ID 범위 탐색 (CSV 파일 생성)")
     print("3. 이미 찾은 유효한 선수만 처리 (CSV 파일 생성)")
+    print("4. 저장된 원본 데이터로 전체 테이블 재구축 (네트워크 사용 안 함)")
     
-    mode = input("모드 선택 (1-3): ")
+    mode = input("모드 선택 (1-4): ")
     
     # CSV 파일명 입력 받기
     base_filename = input("저장할 CSV 파일 기본 이름 입력 (기본: football_players_data): ") or "football_players_data"
     
+    # SQLite 저장 여부 (1, 3번 모드와 동시 탐색에서 사용)
+    use_sqlite = input("SQLite DB에도 저장하시겠습니까? (y/N): ").lower() == 'y'
+    sqlite_path = f"{base_filename}.db" if use_sqlite else None
+    
     if mode == "1":
         # 특정 선수 ID 목록 처리
         print("\n선수 ID 목록 입력 방법:")
@@ -40,25 +55,10 @@ def main():
             ]
             print(f"유효한 ID가 입력되지 않아 기본 ID 목록을 사용합니다: {player_ids}")
         
-        # 데이터프레임 컬렉션 초기화
-        player_dfs = []
-        matches_dfs = []
-        stats_dfs = []
-        
-        for player_id in player_ids:
-            player_df, matches_df, stats_df = process_player_data(player_id)
-            
-            if player_df is not None:
-                player_dfs.append(player_df)
-            if matches_df is not None:
-                matches_dfs.append(matches_df)
-            if stats_df is not None:
-                stats_dfs.append(stats_df)
-                
-            time.sleep(2)
-        
-        # CSV 파일 저장
-        save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
+        # 파이프라인으로 처리 후 마지막에 한 번 CSV 저장 (요청 간 2초 간격 유지)
+        pipeline = PlayerPipeline(base_filename=base_filename, batch_size=None, requests_per_second=0.5,
+                                  sqlite_path=sqlite_path)
+        pipeline.run(player_ids)
     
     elif mode == "2":
         # 선수 ID 범위 탐색
@@ -66,52 +66,66 @@ def main():
         start_id = int(input("시작 ID 입력 (기본: 212867): ") or "212867")
         end_id = int(input("종료 ID 입력 (기본: 213000): ") or "213000")
         batch_size = int(input("배치 크기 입력 (기본: 10): ") or "10")
-        delay = float(input("요청 간 지연 시간(초) 입력 (기본: 2): ") or "2")
+        concurrency = int(input("동시 요청 수 입력 (기본: 1): ") or "1")
+        workers = int(input("작업 프로세스 수 입력 (2 이상이면 구간을 나눠 임대하며 탐색, 기본: 1): ") or "1")
         
-        explore_player_ids(start_id, end_id, batch_size, delay, base_filename)
+        if workers > 1:
+            # 구간 임대 방식은 범위의 모든 ID를 확인 (다른 머신도 같은 임대 디렉터리로 sharded_explorer.py worker 실행 가능)
+            rps = float(input("전체 초당 최대 요청 수 입력 (기본: 2): ") or "2")
+            shard_size = int(input("구간 크기 입력 (기본: 1000): ") or "1000")
+            explore_player_ids_sharded(start_id, end_id, workers, batch_size, concurrency, rps, base_filename,
+                                       shard_size=shard_size)
+        else:
+            print("\n탐색 방식:")
+            print("1. 범위의 모든 ID 확인")
+            print("2. 적응형 (유효 ID가 드문 구간은 건너뛰고, 건너뛴 ID는 다음 보충 탐색에서 확인)")
+            print("3. 적응형 + 보충 탐색 (건너뛴 ID까지 마지막에 모두 확인)")
+            strategy = {"2": "adaptive", "3": "adaptive_backfill"}.get(input("탐색 방식 선택 (기본: 1): ").strip(), "full")
+            
+            if concurrency > 1:
+                rps = float(input("초당 최대 요청 수 입력 (기본: 2): ") or "2")
+                explore_player_ids_concurrent(start_id, end_id, batch_size, concurrency, rps, base_filename, sqlite_path,
+                                              strategy=strategy)
+            else:
+                delay = float(input("시작 요청 간격(초) 입력 (이후 응답 상태에 따라 자동 조절, 기본: 2): ") or "2")
+                explore_player_ids(start_id, end_id, batch_size, delay, base_filename, strategy=strategy)
     
     elif mode == "3":
-        # 유효한 선수만 처리
+        # 유효한 선수만 처리 (새 경기가 있을 가능성이 높은 선수부터)
         valid_ids = get_valid_player_ids()
         if not valid_ids:
             print("유효한 선수 ID가 없습니다. 먼저 ID 탐색을 실행하세요.")
             return
         
         print(f"\n총 {len(valid_ids)}명의 유효한 선수를 찾았습니다.")
-        if len(valid_ids) > 10:
-            print(f"유효한 선수 ID 일부: {valid_ids[:10]}... (외 {len(valid_ids)-10}개)")
-        else:
-            print(f"유효한 선수 ID: {valid_ids}")
+        budget = input("이번에 갱신할 최대 선수 수 입력 (기본: 전체): ").strip()
+        scheduler = build_refresh_scheduler(valid_ids, base_filename)
+        plan = scheduler.plan(int(budget) if budget.isdigit() else None)
+        
+        print(f"우선순위가 높은 순서로 {len(plan)}명을 갱신합니다.")
+        for entry in plan[:10]:
+            last_match = entry['last_match'].strftime('%Y-%m-%d') if entry['last_match'] else '기록 없음'
+            last_fetched = entry['last_fetched'].strftime('%Y-%m-%d') if entry['last_fetched'] else '기록 없음'
+            print(f"  ID {entry['player_id']}: 새 경기 확률 {entry['priority']:.0%}, 예상 {entry['expected_matches']:.1f}경기 "
+                  f"(마지막 경기 {last_match}, 마지막 수집 {last_fetched})")
+        if len(plan) > 10:
+            print(f"  ... (외 {len(plan)-10}명)")
         
         confirm = input("\n이 선수들의 데이터를 처리하시겠습니까? (y/n): ")
         if confirm.lower() == 'y':
-            # 데이터프레임 컬렉션 초기화
-            player_dfs = []
-            matches_dfs = []
-            stats_dfs = []
-            
-            for i, player_id in enumerate(valid_ids):
-                player_df, matches_df, stats_df = process_player_data(player_id)
-                
-                if player_df is not None:
-                    player_dfs.append(player_df)
-                if matches_df is not None:
-                    matches_dfs.append(matches_df)
-                if stats_df is not None:
-                    stats_dfs.append(stats_df)
-                
-                time.sleep(2)
-                
-                # 중간 저장 (10명마다)
-                if (i + 1) % 10 == 0:
-                    print(f"중간 결과 저장 중... ({i+1}/{len(valid_ids)})")
-                    save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
-            
-            # 최종 저장
-            save_to_csv(player_dfs, matches_dfs, stats_dfs, base_filename)
+            # 파이프라인으로 처리 (10명마다 중간 저장, 초당 0.5건 이하로 요청)
+            pipeline = PlayerPipeline(base_filename=base_filename, batch_size=10, requests_per_second=0.5,
+                                      sqlite_path=sqlite_path)
+            summary = pipeline.run([entry['player_id'] for entry in plan], on_result=record_refresh)
+            print(f"처리 완료: 유효 {summary['valid']}명, 실패 {summary['invalid'] + summary['errors']}건")
         else:
             print("처리를 취소했습니다.")
     
+    elif mode == "4":
+        # raw_data 원본만으로 재구축
+        workers = input("작업 프로세스 수 입력 (기본: CPU 코어 수): ")
+        rebuild_from_raw(base_filename, workers=int(workers) if workers.strip() else None)
+    
     else:
         print("잘못된 모드를 선택했습니다.")
     
@@ -0,0 +1,308 @@
+import atexit
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from log_utils import get_logger
+
+logger = get_logger('metrics')
+
+# 환경 변수로 지표 노출 방식 지정 (main.py에서 start_from_env 호출)
+METRICS_PORT_ENV = 'KICKSTATS_METRICS_PORT'
+METRICS_FILE_ENV = 'KICKSTATS_METRICS_FILE'
+METRICS_INTERVAL_ENV = 'KICKSTATS_METRICS_INTERVAL'
+
+# 요청/저장 소요 시간(초) 구간
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _label_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+class _Metric:
+    """레이블 값 조합마다 값을 따로 가지는 지표의 공통 부분"""
+
+    type_name = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """레이블 값에 해당하는 지표 (처음 쓰는 조합이면 새로 만듦)"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        """레이블이 없는 지표의 값"""
+        if self.labelnames:
+            raise ValueError(f"'{self.name}' 지표는 labels()로 레이블 값을 지정해야 합니다")
+        return self.labels()
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        with self._lock:
+            children = sorted(self._children.items())
+        for key, child in children:
+            lines.extend(self._render_child(key, child))
+        return lines
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value):
+        with self._lock:
+            self.value = float(value)
+
+class Counter(_Metric):
+    """계속 늘어나기만 하는 값 (처리 개수, 받은 바이트 수 등)"""
+
+    type_name = 'counter'
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount=1):
+        self._default().inc(amount)
+
+    def _render_child(self, key, child):
+        return [f"{self.name}{_label_text(self.labelnames, key)} {_format_value(child.value)}"]
+
+class Gauge(Counter):
+    """늘거나 줄어드는 현재 값 (진행 중인 작업 수 등)"""
+
+    type_name = 'gauge'
+
+    def dec(self, amount=1):
+        self._default().dec(amount)
+
+    def set(self, value):
+        self._default().set(value)
+
+class _HistogramValue:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if index < len(self.counts):
+                self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+class Histogram(_Metric):
+    """값의 분포를 구간별 개수로 기록 (Prometheus의 histogram_quantile로 백분위 계산)"""
+
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value):
+        self._default().observe(value)
+
+    def _render_child(self, key, child):
+        with child._lock:
+            counts, total, count = list(child.counts), child.sum, child.count
+        lines = []
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', _format_value(float(bound)))])} {cumulative}")
+        lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, [('le', '+Inf')])} {count}")
+        lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_format_value(total)}")
+        lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    """지표 목록 (이름이 같은 지표를 다시 등록하면 기존 지표를 돌려줌)"""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(f"'{name}' 지표가 이미 다른 종류로 등록되어 있습니다")
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus 텍스트 형식 (0.0.4)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+REGISTRY = Registry()
+
+# 수집 과정 전체에서 사용하는 지표
+STAGE_SECONDS = REGISTRY.histogram(
+    'kickstats_stage_seconds', '단계별 소요 시간(초): fetch, decode, extract, raw_save, store_save, csv_save', ['stage'])
+STAGE_IN_FLIGHT = REGISTRY.gauge('kickstats_stage_in_flight', '단계별 진행 중인 작업 수', ['stage'])
+STAGE_ERRORS = REGISTRY.counter('kickstats_stage_errors_total', '단계에서 예외가 발생한 횟수', ['stage'])
+FETCH_ATTEMPTS = REGISTRY.counter(
+    'kickstats_fetch_attempts_total',
+    'HTTP 요청 시도 결과별 횟수 (ok, not_found, http_429, http_5xx, http_error, json_error, timeout, connection_error, request_error)',
+    ['outcome'])
+FETCH_RETRIES = REGISTRY.counter('kickstats_fetch_retries_total', '재시도한 HTTP 요청 수')
+DOWNLOADED_BYTES = REGISTRY.counter('kickstats_downloaded_bytes_total', '받은 응답 본문 바이트 수')
+PLAYERS = REGISTRY.counter('kickstats_players_total', '처리한 선수 ID 수 (상태별)', ['status'])
+START_TIME = REGISTRY.gauge('kickstats_start_time_seconds', '프로세스 시작 시각 (유닉스 시간)')
+START_TIME.set(time.time())
+
+@contextmanager
+def stage(name):
+    """with 블록을 name 단계로 계측 (소요 시간, 진행 중 개수, 예외 횟수)"""
+    in_flight = STAGE_IN_FLIGHT.labels(stage=name)
+    in_flight.inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        STAGE_ERRORS.labels(stage=name).inc()
+        raise
+    finally:
+        STAGE_SECONDS.labels(stage=name).observe(time.perf_counter() - started)
+        in_flight.dec()
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # 수집기가 주기적으로 요청하므로 출력하지 않음
+        pass
+
+def start_http_server(port, host='127.0.0.1', registry=REGISTRY):
+    """백그라운드 스레드에서 /metrics 엔드포인트를 열고 서버 반환 (port가 0이면 빈 포트 사용)"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+    logger.info("지표 엔드포인트: http://%s:%s/metrics", host, server.server_address[1])
+    return server
+
+def write_metrics_file(path, registry=REGISTRY):
+    """지표를 파일에 씀 (임시 파일에 쓴 뒤 이름을 바꿔 읽는 쪽이 중간 상태를 보지 않음)"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(registry.render())
+    os.replace(temp_path, path)
+
+class MetricsFileWriter:
+    """interval초마다 지표 파일을 다시 쓰는 백그라운드 스레드 (node_exporter textfile 수집기 등에서 읽음)"""
+
+    def __init__(self, path, interval=15.0, registry=REGISTRY):
+        self.path = path
+        self.interval = interval
+        self.registry = registry
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-file', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        logger.info("지표 파일: %s (%s초마다 갱신)", self.path, self.interval)
+        return self
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self._write()
+
+    def _write(self):
+        try:
+            write_metrics_file(self.path, self.registry)
+        except OSError as e:
+            logger.warning("지표 파일을 쓰지 못했습니다 (%s): %s", self.path, e)
+
+    def stop(self):
+        """스레드를 멈추고 마지막 값을 한 번 더 씀"""
+        self._stop_event.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self._write()
+
+def start_from_env():
+    """KICKSTATS_METRICS_PORT가 있으면 엔드포인트를, KICKSTATS_METRICS_FILE이 있으면 지표 파일 갱신을 시작
+
+    (엔드포인트 서버, 파일 기록기) 반환. 지정하지 않았거나 시작하지 못한 쪽은 None (수집은 계속 진행).
+    지표 파일은 종료할 때 마지막 값으로 한 번 더 씀.
+    """
+    server = writer = None
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        try:
+            server = start_http_server(int(port))
+        except (OSError, ValueError) as e:
+            logger.warning("지표 엔드포인트를 열지 못했습니다 (%s=%s): %s", METRICS_PORT_ENV, port, e)
+    path = os.environ.get(METRICS_FILE_ENV)
+    if path:
+        writer = MetricsFileWriter(path, float(os.environ.get(METRICS_INTERVAL_ENV) or 15)).start()
+        atexit.register(writer.stop)
+    return server, writer
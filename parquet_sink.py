@@ -0,0 +1,179 @@
+import os
+import shutil
+import sys
+
+import pandas as pd
+
+from log_utils import get_logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError:  # pyarrow는 선택 의존성 (Parquet 출력을 쓸 때만 필요)
+    pa = None
+    ds = None
+
+logger = get_logger('parquet')
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Parquet 출력에는 pyarrow가 필요합니다. 'pip install pyarrow'로 설치하세요.")
+
+def _dictionary_string():
+    return pa.dictionary(pa.int32(), pa.string())
+
+def _schemas():
+    """테이블별 Arrow 스키마 (팀/리그 이름 등 반복 문자열은 사전 인코딩)"""
+    players = pa.schema([
+        ('id', pa.int64()),
+        ('name', pa.string()),
+        ('birth_date', pa.timestamp('ms', tz='UTC')),
+        ('team', _dictionary_string()),
+        ('team_id', pa.int64()),
+        ('position', _dictionary_string()),
+        ('is_captain', pa.bool_()),
+        ('country', _dictionary_string()),
+        ('height', pa.float64()),
+        ('shirt', pa.float64()),
+        ('age', pa.float64()),
+        ('preferred_foot', _dictionary_string()),
+        ('market_value', pa.float64()),
+    ])
+    matches = pa.schema([
+        ('player_id', pa.int64()),
+        ('match_id', pa.int64()),
+        ('match_date', pa.timestamp('ms', tz='UTC')),
+        ('league_id', pa.int64()),
+        ('league_name', _dictionary_string()),
+        ('season', pa.string()),
+        ('team_id', pa.int64()),
+        ('team_name', _dictionary_string()),
+        ('opponent_team_id', pa.int64()),
+        ('opponent_team_name', _dictionary_string()),
+        ('is_home', pa.bool_()),
+        ('home_score', pa.int64()),
+        ('away_score', pa.int64()),
+        ('minutes_played', pa.int64()),
+        ('goals', pa.int64()),
+        ('assists', pa.int64()),
+        ('yellow_cards', pa.int64()),
+        ('red_cards', pa.int64()),
+        ('rating', pa.float64()),
+    ])
+    stats = pa.schema([
+        ('player_id', pa.int64()),
+        ('league_id', pa.int64()),
+        ('league_name', _dictionary_string()),
+        ('season', pa.string()),
+        ('title', _dictionary_string()),
+        ('value', pa.float64()),
+    ])
+    return {'players': players, 'matches': matches, 'stats': stats}
+
+# 경기/통계 테이블은 리그와 시즌으로 분할
+PARTITION_COLUMNS = {
+    'players': None,
+    'matches': ['league_id', 'season'],
+    'stats': ['league_id', 'season'],
+}
+
+def match_seasons(match_dates):
+    """경기 날짜로 시즌 문자열 계산 (7월 시작 기준, 예: 2025-03 -> '2024/2025')
+
+    경기 데이터에는 시즌 필드가 없으므로 유럽식 시즌 경계를 사용함.
+    """
+    dates = pd.to_datetime(match_dates, utc=True, errors='coerce')
+    start_year = dates.dt.year.where(dates.dt.month >= 7, dates.dt.year - 1)
+    seasons = start_year.astype('Int64').astype(str) + '/' + (start_year + 1).astype('Int64').astype(str)
+    return seasons.where(dates.notna(), None)
+
+def _to_bool(series):
+    """CSV에서 읽은 'True'/'False' 문자열도 불리언으로 변환"""
+    mapping = {True: True, False: False, 'True': True, 'False': False, 'true': True, 'false': False}
+    return series.map(mapping)
+
+def _prepare(table, df):
+    """데이터프레임을 스키마에 맞는 타입으로 정리"""
+    df = df.copy()
+
+    if table == 'matches':
+        df['season'] = match_seasons(df['match_date'])
+        df['match_date'] = pd.to_datetime(df['match_date'], utc=True, errors='coerce')
+        df['is_home'] = _to_bool(df['is_home'])
+        df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+    elif table == 'players':
+        df['birth_date'] = pd.to_datetime(df['birth_date'], utc=True, errors='coerce')
+        df['is_captain'] = _to_bool(df['is_captain'])
+    elif table == 'stats':
+        df['value'] = pd.to_numeric(df['value'], errors='coerce')
+        df['season'] = df['season'].astype(object).where(df['season'].notna(), None)
+
+    return df
+
+def to_arrow_table(table, df):
+    """데이터프레임을 타입이 지정된 Arrow 테이블로 변환"""
+    _require_pyarrow()
+    schema = _schemas()[table]
+    df = _prepare(table, df)
+    for field in schema:
+        if field.name not in df.columns:
+            df[field.name] = None
+    return pa.Table.from_pandas(df[schema.names], schema=schema, preserve_index=False)
+
+def write_parquet_tables(players_df=None, matches_df=None, stats_df=None, output_dir='football_players_data_parquet'):
+    """세 테이블을 Parquet 데이터셋으로 저장 (테이블마다 디렉터리를 통째로 교체)"""
+    _require_pyarrow()
+    os.makedirs(output_dir, exist_ok=True)
+
+    for table, df in (('players', players_df), ('matches', matches_df), ('stats', stats_df)):
+        if df is None or df.empty:
+            continue
+
+        arrow_table = to_arrow_table(table, df)
+        target_dir = os.path.join(output_dir, table)
+        temp_dir = f"{target_dir}.tmp"
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+
+        partitions = PARTITION_COLUMNS[table]
+        ds.write_dataset(
+            arrow_table,
+            temp_dir,
+            format='parquet',
+            partitioning=partitions,
+            partitioning_flavor='hive' if partitions else None,
+            existing_data_behavior='overwrite_or_ignore',
+        )
+
+        # 새 데이터셋을 다 쓴 뒤 교체해 읽는 쪽이 반쯤 쓰인 상태를 보지 않도록 함
+        if os.path.exists(target_dir):
+            old_dir = f"{target_dir}.old"
+            os.replace(target_dir, old_dir)
+            os.replace(temp_dir, target_dir)
+            shutil.rmtree(old_dir)
+        else:
+            os.replace(temp_dir, target_dir)
+
+        logger.info("Saved %s %s records to Parquet dataset '%s'", arrow_table.num_rows, table, target_dir)
+
+def read_parquet_table(table, output_dir='football_players_data_parquet', columns=None, filter=None):
+    """Parquet 데이터셋 읽기 (필요한 열만, 조건에 맞는 파티션만)
+
+    예: read_parquet_table('matches', columns=['player_id', 'goals'],
+                           filter=(ds.field('league_id') == 47) & (ds.field('season') == '2024/2025'))
+    """
+    _require_pyarrow()
+    partitions = PARTITION_COLUMNS[table]
+    dataset = ds.dataset(
+        os.path.join(output_dir, table),
+        format='parquet',
+        partitioning='hive' if partitions else None,
+    )
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
+
+if __name__ == "__main__":
+    # 저장 엔진의 현재 데이터를 Parquet으로 내보내기
+    from data_processor import export_store_to_parquet
+
+    base_filename = sys.argv[1] if len(sys.argv) > 1 else 'football_players_data'
+    export_store_to_parquet(base_filename)
@@ -0,0 +1,334 @@
+import json
+import typing
+from dataclasses import dataclass, fields, is_dataclass
+from typing import Any, Dict, List, Optional, Union
+
+from log_utils import get_logger
+
+try:
+    import msgspec
+except ImportError:  # msgspec이 없으면 표준 json(또는 orjson)으로 읽은 뒤 필요한 필드만 골라 검증
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+logger = get_logger('schema')
+
+class _Missing:
+    """페이로드에 키 자체가 없음을 나타내는 값 (None과 구분)"""
+
+    def __repr__(self):
+        return 'MISSING'
+
+    def __bool__(self):
+        return False
+
+MISSING = _Missing()
+
+class PayloadValidationError(ValueError):
+    """페이로드의 필드 타입이 스키마와 맞지 않을 때 발생"""
+
+# 추출 함수가 사용하는 필드만 정의 (나머지 필드는 읽지 않고 건너뜀)
+
+@dataclass
+class UtcTime:
+    utcTime: Optional[str] = MISSING
+
+@dataclass
+class PrimaryTeam:
+    teamName: Optional[str] = MISSING
+    teamId: Optional[int] = MISSING
+
+@dataclass
+class PrimaryPosition:
+    label: Optional[str] = MISSING
+
+@dataclass
+class PositionDescription:
+    primaryPosition: Optional[PrimaryPosition] = MISSING
+
+@dataclass
+class InfoValue:
+    fallback: Any = None
+    numberValue: Optional[Union[int, float]] = None
+    key: Optional[str] = None
+
+@dataclass
+class PlayerInformationItem:
+    title: Optional[str] = MISSING
+    value: Optional[InfoValue] = MISSING
+
+@dataclass
+class LeagueStat:
+    title: Optional[str] = MISSING
+    value: Any = MISSING
+
+@dataclass
+class MainLeague:
+    leagueId: Optional[int] = MISSING
+    leagueName: Optional[str] = MISSING
+    # 대부분 '2024/2025' 같은 문자열이지만 단일 연도 리그는 2024처럼 숫자로 오기도 함
+    season: Optional[Union[str, int]] = MISSING
+    stats: Optional[List[LeagueStat]] = MISSING
+
+@dataclass
+class RatingProps:
+    num: Any = None
+
+@dataclass
+class RecentMatch:
+    id: Optional[int] = MISSING
+    matchDate: Optional[UtcTime] = MISSING
+    leagueId: Optional[int] = MISSING
+    leagueName: Optional[str] = MISSING
+    teamId: Optional[int] = MISSING
+    teamName: Optional[str] = MISSING
+    opponentTeamId: Optional[int] = MISSING
+    opponentTeamName: Optional[str] = MISSING
+    isHomeTeam: Optional[bool] = MISSING
+    homeScore: Optional[int] = MISSING
+    awayScore: Optional[int] = MISSING
+    minutesPlayed: Optional[int] = MISSING
+    goals: Optional[int] = MISSING
+    assists: Optional[int] = MISSING
+    yellowCards: Optional[int] = MISSING
+    redCards: Optional[int] = MISSING
+    ratingProps: Optional[RatingProps] = MISSING
+
+@dataclass
+class PlayerPayload:
+    id: Optional[int] = MISSING
+    name: Optional[str] = MISSING
+    birthDate: Optional[UtcTime] = MISSING
+    isCaptain: Optional[bool] = MISSING
+    primaryTeam: Optional[PrimaryTeam] = MISSING
+    positionDescription: Optional[PositionDescription] = MISSING
+    playerInformation: Optional[List[PlayerInformationItem]] = MISSING
+    mainLeague: Optional[MainLeague] = MISSING
+    recentMatches: Optional[List[RecentMatch]] = MISSING
+
+# 한 번에 모든 테이블을 추출할 때 추가로 읽는 구역 (경력, 시즌 목록, 특성, 트로피)
+
+@dataclass
+class CareerTeamEntry:
+    teamId: Optional[int] = MISSING
+    team: Optional[str] = MISSING
+    # 날짜는 ISO 문자열, 밀리초 타임스탬프, 빈 문자열이 섞여 있음
+    startDate: Any = MISSING
+    endDate: Any = MISSING
+    active: Optional[bool] = MISSING
+    appearances: Any = MISSING
+    goals: Any = MISSING
+    assists: Any = MISSING
+
+@dataclass
+class CareerSection:
+    teamEntries: Optional[List[CareerTeamEntry]] = MISSING
+
+@dataclass
+class CareerHistory:
+    careerItems: Optional[Dict[str, CareerSection]] = MISSING
+
+@dataclass
+class StatSeasonTournament:
+    name: Optional[str] = MISSING
+    tournamentId: Optional[int] = MISSING
+    entryId: Optional[str] = MISSING
+
+@dataclass
+class StatSeason:
+    seasonName: Optional[str] = MISSING
+    tournaments: Optional[List[StatSeasonTournament]] = MISSING
+
+@dataclass
+class TraitItem:
+    key: Optional[str] = MISSING
+    title: Optional[str] = MISSING
+    value: Optional[float] = MISSING
+
+@dataclass
+class Traits:
+    key: Optional[str] = MISSING
+    title: Optional[str] = MISSING
+    items: Optional[List[TraitItem]] = MISSING
+
+@dataclass
+class TrophyTournament:
+    ccode: Optional[str] = MISSING
+    leagueId: Optional[int] = MISSING
+    leagueName: Optional[str] = MISSING
+    seasonsWon: Optional[List[str]] = MISSING
+    seasonsRunnerUp: Optional[List[str]] = MISSING
+
+@dataclass
+class TeamTrophies:
+    ccode: Optional[str] = MISSING
+    teamId: Optional[int] = MISSING
+    teamName: Optional[str] = MISSING
+    tournaments: Optional[List[TrophyTournament]] = MISSING
+
+@dataclass
+class Trophies:
+    playerTrophies: Optional[List[TeamTrophies]] = MISSING
+
+@dataclass
+class FullPlayerPayload(PlayerPayload):
+    """PlayerPayload에 경력/시즌 목록/특성/트로피 구역을 더한 스키마 (기존 추출 함수에도 그대로 넘길 수 있음)"""
+    careerHistory: Optional[CareerHistory] = MISSING
+    statSeasons: Optional[List[StatSeason]] = MISSING
+    traits: Optional[Traits] = MISSING
+    trophies: Optional[Trophies] = MISSING
+
+def _type_name(tp):
+    return getattr(tp, '__name__', str(tp))
+
+def _compile(tp, path):
+    """타입 힌트 하나에 대한 검증/변환 함수 생성 (msgspec이 없을 때 사용)"""
+    if tp is Any:
+        return lambda value: value
+
+    origin = typing.get_origin(tp)
+
+    if origin is Union:
+        options = typing.get_args(tp)
+        allow_none = type(None) in options
+        converters = [_compile(option, path) for option in options if option is not type(None)]
+        if len(converters) == 1:
+            single = converters[0]
+
+            def convert_optional(value):
+                if value is None and allow_none:
+                    return None
+                return single(value)
+            return convert_optional
+
+        def convert_union(value):
+            if value is None and allow_none:
+                return None
+            for converter in converters:
+                try:
+                    return converter(value)
+                except PayloadValidationError:
+                    continue
+            raise PayloadValidationError(f"{path}: 지원하지 않는 값 {value!r}")
+        return convert_union
+
+    if origin in (list, List):
+        item_converter = _compile(typing.get_args(tp)[0], f"{path}[]")
+
+        def convert_list(value):
+            if not isinstance(value, list):
+                raise PayloadValidationError(f"{path}: 배열이 필요하지만 {type(value).__name__}")
+            # 형식이 맞지 않는 항목(경기 하나, 통계 하나 등)은 그 항목만 건너뜀
+            items = []
+            for i, item in enumerate(value):
+                try:
+                    items.append(item_converter(item))
+                except PayloadValidationError as e:
+                    logger.warning("데이터 형식 오류로 %s #%d 항목을 건너뜁니다: %s", path, i, e)
+            return items
+        return convert_list
+
+    if origin in (dict, Dict):
+        value_converter = _compile(typing.get_args(tp)[1], f"{path}{{}}")
+
+        def convert_dict(value):
+            if not isinstance(value, dict):
+                raise PayloadValidationError(f"{path}: 객체가 필요하지만 {type(value).__name__}")
+            items = {}
+            for key, item in value.items():
+                try:
+                    items[key] = value_converter(item)
+                except PayloadValidationError as e:
+                    logger.warning("데이터 형식 오류로 %s['%s'] 항목을 건너뜁니다: %s", path, key, e)
+            return items
+        return convert_dict
+
+    if is_dataclass(tp):
+        return _compile_dataclass(tp, path)
+
+    def convert_scalar(value):
+        # bool은 int의 하위 타입이므로 int 필드에 bool이 들어오지 않도록 따로 확인
+        if isinstance(value, tp) and not (tp is not bool and isinstance(value, bool)):
+            return value
+        if tp is float and isinstance(value, int) and not isinstance(value, bool):
+            return value
+        raise PayloadValidationError(f"{path}: {_type_name(tp)}이(가) 필요하지만 {type(value).__name__}")
+    return convert_scalar
+
+def _compile_dataclass(cls, path, isolate_fields=False):
+    """isolate_fields=True면 (페이로드 최상위) 형식이 맞지 않는 필드만 없는 것으로 두고 나머지 구역은 그대로 사용"""
+    hints = typing.get_type_hints(cls)
+    field_converters = [(f.name, _compile(hints[f.name], f"{path}.{f.name}")) for f in fields(cls)]
+
+    def convert_object(value):
+        if not isinstance(value, dict):
+            raise PayloadValidationError(f"{path}: 객체가 필요하지만 {type(value).__name__}")
+        kwargs = {}
+        for name, converter in field_converters:
+            if name in value:
+                if not isolate_fields:
+                    kwargs[name] = converter(value[name])
+                    continue
+                try:
+                    kwargs[name] = converter(value[name])
+                except PayloadValidationError as e:
+                    logger.warning("데이터 형식 오류로 '%s' 구역을 건너뜁니다: %s", name, e)
+        return cls(**kwargs)
+    return convert_object
+
+# 필드 하나의 형식 오류가 페이로드 전체를 버리지 않도록 최상위 구역과 배열 항목 단위로 검증
+_from_dict = _compile_dataclass(PlayerPayload, 'payload', isolate_fields=True)
+_msgspec_decoder = msgspec.json.Decoder(PlayerPayload) if msgspec is not None else None
+_full_from_dict = _compile_dataclass(FullPlayerPayload, 'payload', isolate_fields=True)
+_full_msgspec_decoder = msgspec.json.Decoder(FullPlayerPayload) if msgspec is not None else None
+
+def payload_from_dict(data):
+    """이미 파싱된 dict에서 필요한 필드만 골라 검증된 PlayerPayload로 변환
+
+    형식이 맞지 않는 배열 항목과 최상위 구역은 경고를 남기고 건너뜀 (페이로드가 객체가 아니면 PayloadValidationError).
+    """
+    return _from_dict(data)
+
+def _loads(raw):
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+def decode_player_payload(raw):
+    """JSON 바이트/문자열(또는 dict)을 PlayerPayload로 디코딩
+
+    msgspec이 있으면 스키마에 없는 필드는 파이썬 객체로 만들지 않고 건너뛰며 같은 단계에서 타입을 검증함.
+    형식이 맞지 않는 필드가 있으면 payload_from_dict로 다시 읽어 그 필드가 속한 항목/구역만 건너뜀.
+    """
+    if isinstance(raw, PlayerPayload):
+        return raw
+    if isinstance(raw, dict):
+        return _from_dict(raw)
+
+    if _msgspec_decoder is not None:
+        try:
+            return _msgspec_decoder.decode(raw)
+        except msgspec.ValidationError:
+            pass
+
+    return _from_dict(_loads(raw))
+
+def decode_full_payload(raw):
+    """JSON 바이트/문자열(또는 dict)을 FullPlayerPayload로 디코딩 (모든 테이블을 한 번에 추출할 때 사용)
+
+    형식 오류 처리는 decode_player_payload와 같음.
+    """
+    if isinstance(raw, FullPlayerPayload):
+        return raw
+    if isinstance(raw, dict):
+        return _full_from_dict(raw)
+
+    if _full_msgspec_decoder is not None:
+        try:
+            return _full_msgspec_decoder.decode(raw)
+        except msgspec.ValidationError:
+            pass
+
+    return _full_from_dict(_loads(raw))
@@ -0,0 +1,286 @@
+import logging
+import queue
+import threading
+import time
+
+from api_functions import fetch_player_data, save_raw_data, set_rate_controller
+from batch_sink import DEFAULT_MAX_BYTES, DEFAULT_MAX_ROWS, BatchSink
+from change_detector import extract_changed_rows
+from data_extractors import EXTRA_TABLE_EXTRACTORS, extract_all_tables, extract_extra_tables
+from data_processor import (process_player_rows, export_store_to_csv, save_processed_id,
+                            get_fingerprint_store)
+from log_utils import ProgressReporter, get_logger, log_event
+import metrics
+from rate_control import RateController
+
+logger = get_logger('pipeline')
+
+# 단계 사이에 전달되는 종료 신호
+_STOP = object()
+
+def is_player_payload(player_data):
+    """API 응답이 유효한 선수 데이터인지 확인"""
+    return isinstance(player_data, dict) and 'id' in player_data and 'name' in player_data
+
+class _Stage:
+    """입력 큐에서 항목을 꺼내 처리한 뒤 다음 큐로 넘기는 작업 스레드 묶음"""
+
+    def __init__(self, name, func, in_queue, out_queue, workers):
+        self.name = name
+        self.func = func
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.workers = max(1, workers)
+        self.next_workers = 1
+        self._remaining = self.workers
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _run(self):
+        while True:
+            item = self.in_queue.get()
+            if item is _STOP:
+                break
+
+            try:
+                self.func(item)
+            except Exception as e:
+                # 한 항목의 오류가 단계 전체를 멈추지 않도록 항목에 기록하고 계속 진행
+                item['status'] = 'processing_error'
+                item['error'] = f"{self.name}: {type(e).__name__}: {e}"
+                logger.exception("[%s] ID %s 처리 중 오류 발생: %s", self.name, item['player_id'], e)
+
+            self.out_queue.put(item)
+
+        # 마지막으로 끝나는 작업 스레드가 다음 단계의 모든 작업 스레드에 종료 신호 전달
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+        if last:
+            for _ in range(self.next_workers):
+                self.out_queue.put(_STOP)
+
+class PlayerPipeline:
+    """fetch → raw store → extract → sink 단계로 선수 데이터를 한 번만 받아 처리하는 파이프라인"""
+
+    def __init__(self, base_filename='football_players_data', fetch_workers=1, extract_workers=1,
+                 queue_size=32, batch_size=10, save_raw=True, record_status=False,
+                 requests_per_second=None, sqlite_path=None, progress_interval=5.0, export_csv=True,
+                 skip_unchanged=True, extra_tables=True, max_batch_rows=DEFAULT_MAX_ROWS,
+                 max_batch_bytes=DEFAULT_MAX_BYTES):
+        self.base_filename = base_filename
+        self.fetch_workers = fetch_workers
+        self.extract_workers = extract_workers
+        self.queue_size = queue_size
+        # 유효 선수 batch_size명마다 중간 저장 (None이면 선수 수로는 나누지 않음)
+        self.batch_size = batch_size
+        # batch_size와 상관없이 모아 둔 행 수 / 대략적인 메모리가 넘으면 저장하고 비움 (None이면 제한 없음)
+        self.max_batch_rows = max_batch_rows
+        self.max_batch_bytes = max_batch_bytes
+        self.save_raw = save_raw
+        # True이면 각 ID의 처리 결과를 processed_player_ids.csv에 기록
+        self.record_status = record_status
+        self.requests_per_second = requests_per_second
+        # 지정하면 저장할 때마다 같은 배치를 SQLite에도 upsert
+        self.sqlite_path = sqlite_path
+        # 진행 상황 요약을 남기는 최소 간격(초)
+        self.progress_interval = progress_interval
+        # False이면 마지막 CSV 내보내기를 생략 (구간마다 run을 반복하고 나중에 한 번에 내보낼 때)
+        self.export_csv = export_csv
+        # True이면 직전에 저장한 페이로드와 비교해 바뀐 구역만 추출/저장
+        # (SQLite에도 저장할 때는 SQLite에 없는 선수를 건너뛰지 않도록 사용하지 않음)
+        self.skip_unchanged = skip_unchanged and not sqlite_path
+        # True이면 경력/시즌 목록/특성/트로피 테이블도 같은 순회에서 추출해 저장소에 저장
+        self.extra_tables = extra_tables
+        self._fingerprints = None
+        self._stop_event = threading.Event()
+
+    def _fetch(self, item):
+        """1단계: API에서 선수 데이터를 한 번만 가져옴"""
+        player_data = fetch_player_data(item['player_id'])
+        if is_player_payload(player_data):
+            item['data'] = player_data
+            item['status'] = 'fetched'
+        else:
+            if player_data:
+                logger.debug("응답은 성공했지만 유효한 선수 데이터가 아닙니다 (ID %s)", item['player_id'])
+            item['status'] = 'invalid'
+
+    def _store_raw(self, item):
+        """2단계: 원본 데이터 저장"""
+        if item['status'] == 'fetched' and self.save_raw:
+            # 원본 저장에서 계산한 내용 해시를 바뀐 내용 확인에 다시 사용
+            item['payload_hash'] = save_raw_data(item['data'], item['player_id'])
+
+    def _extract(self, item):
+        """3단계: 받아 둔 데이터에서 선수/경기/통계 행 추출 (데이터프레임은 sink에서 배치 단위로 생성)"""
+        if item['status'] != 'fetched':
+            return
+
+        if self._fingerprints is not None:
+            # 직전 지문과 같으면 해시 비교만으로 끝나고, 다르면 바뀐 구역만 추출
+            player_id = item['player_id']
+            data = item.pop('data')
+            with metrics.stage('extract'):
+                result, digests = extract_changed_rows(player_id, data, self._fingerprints.get(player_id),
+                                                       item.get('payload_hash'))
+                if self.extra_tables and not result['unchanged']:
+                    # 추가 테이블은 구역별 지문이 없으므로 페이로드가 바뀌었으면 모두 다시 추출 (행 수가 적음)
+                    # 선수 정보 추출에 실패한 선수(valid_error)도 extract_all_tables/rebuild처럼 추가 테이블은 저장
+                    item['extra_rows'] = extract_extra_tables(data)
+            item['player_info'] = result['player_info']
+            item['match_rows'] = result['match_rows']
+            item['stats_rows'] = result['stats_rows']
+            item['unchanged'] = result['unchanged']
+            if result['ok']:
+                item['digests'] = digests
+            item['status'] = 'valid_processed' if result['ok'] else 'valid_error'
+            return
+
+        if self.extra_tables:
+            # 한 번 디코딩/순회해 모든 테이블을 추출
+            with metrics.stage('extract'):
+                tables = extract_all_tables(item.pop('data'))
+            player_info, match_rows, stats_rows = tables['players'], tables['matches'], tables['stats']
+            item['extra_rows'] = {table: tables[table] for table in EXTRA_TABLE_EXTRACTORS}
+        else:
+            player_info, match_rows, stats_rows = process_player_rows(item['player_id'], item.pop('data'), save_raw=False)
+        item['player_info'] = player_info
+        item['match_rows'] = match_rows
+        item['stats_rows'] = stats_rows
+        item['status'] = 'valid_processed' if player_info is not None else 'valid_error'
+
+    def _feed(self, player_ids, id_queue):
+        """ID 목록을 첫 단계 큐에 넣음 (큐가 가득 차면 대기)"""
+        try:
+            for player_id in player_ids:
+                if self._stop_event.is_set():
+                    break
+                id_queue.put({'player_id': player_id, 'status': None})
+        finally:
+            for _ in range(max(1, self.fetch_workers)):
+                id_queue.put(_STOP)
+
+    def stop(self):
+        """새 ID 투입을 중단 (이미 투입된 항목은 끝까지 처리)"""
+        self._stop_event.set()
+
+    def run(self, player_ids, on_result=None, total=None):
+        """파이프라인 실행 후 처리 결과 요약 반환
+
+        on_result가 주어지면 sink 단계에서 항목마다 호출됨 (메인 스레드).
+        total은 진행률 표시에만 사용 (생략하면 player_ids의 길이, 길이를 알 수 없으면 개수만 표시).
+        """
+        # 단계 사이의 큐 크기를 제한해 메모리 사용을 일정하게 유지
+        id_queue = queue.Queue(maxsize=self.queue_size)
+        raw_queue = queue.Queue(maxsize=self.queue_size)
+        extract_queue = queue.Queue(maxsize=self.queue_size)
+        sink_queue = queue.Queue(maxsize=self.queue_size)
+
+        fetch_stage = _Stage('fetch', self._fetch, id_queue, raw_queue, self.fetch_workers)
+        raw_stage = _Stage('raw-store', self._store_raw, raw_queue, extract_queue, 1)
+        extract_stage = _Stage('extract', self._extract, extract_queue, sink_queue, self.extract_workers)
+        fetch_stage.next_workers = raw_stage.workers
+        raw_stage.next_workers = extract_stage.workers
+
+        if self.skip_unchanged:
+            self._fingerprints = get_fingerprint_store(self.base_filename)
+
+        # requests_per_second가 없으면 전역 속도 제어기를 그대로 사용 (설정하지 않았으면 기본 속도에서 시작)
+        if self.requests_per_second:
+            # 지정한 초당 요청 수를 상한으로, 429/5xx를 받으면 그 아래로 줄였다가 다시 올림
+            set_rate_controller(RateController(self.requests_per_second, max_rate=self.requests_per_second,
+                                               burst=max(1, self.fetch_workers)))
+
+        for stage in (fetch_stage, raw_stage, extract_stage):
+            stage.start()
+
+        feeder = threading.Thread(target=self._feed, args=(player_ids, id_queue), name='feeder', daemon=True)
+        feeder.start()
+
+        # 저장을 마친 뒤 기록할 (선수 ID, 지문)
+        pending_digests = []
+
+        def record_digests(saved):
+            # 저장에 실패하면 행과 함께 지문도 남겨 두었다가 다시 저장에 성공했을 때 기록
+            if not saved:
+                return
+            if pending_digests:
+                self._fingerprints.put_many(pending_digests)
+            pending_digests.clear()
+
+        # 선수별 데이터프레임 대신 컬럼 버퍼에 행을 모으고, 예산을 넘으면 저장한 뒤 비움
+        sink = BatchSink(self.base_filename, self.sqlite_path, self.extra_tables, max_players=self.batch_size,
+                         max_rows=self.max_batch_rows, max_bytes=self.max_batch_bytes, on_flush=record_digests)
+        summary = {'checked': 0, 'valid': 0, 'invalid': 0, 'errors': 0, 'unchanged': 0, 'interrupted': False}
+        if total is None and hasattr(player_ids, '__len__'):
+            total = len(player_ids)
+        progress = ProgressReporter(logger, total=total, interval=self.progress_interval)
+        started = time.time()
+
+        try:
+            # 4단계 (sink): 메인 스레드에서 결과를 모아 저장
+            while True:
+                item = sink_queue.get()
+                if item is _STOP:
+                    break
+
+                summary['checked'] += 1
+                status = item['status']
+
+                if status in ('valid_processed', 'valid_error'):
+                    summary['valid'] += 1
+                    if status == 'valid_error':
+                        summary['errors'] += 1
+                        log_event(logger, logging.WARNING, 'extract_failed', "선수 정보 추출 실패 (ID %s)", item['player_id'],
+                                  player_id=item['player_id'])
+                    if item.get('unchanged'):
+                        # 직전에 저장한 내용과 같아 저장할 행이 없음
+                        summary['unchanged'] += 1
+                    else:
+                        if 'digests' in item:
+                            pending_digests.append((item['player_id'], item.pop('digests')))
+                        sink.add(item.get('player_info'), item.get('match_rows'), item.get('stats_rows'),
+                                 item.get('extra_rows'))
+                elif status == 'invalid':
+                    summary['invalid'] += 1
+                    logger.debug("Invalid player ID: %s", item['player_id'])
+                else:
+                    summary['errors'] += 1
+
+                if self.record_status:
+                    save_processed_id(item['player_id'], status)
+
+                metrics.PLAYERS.labels(status=status).inc()
+                progress.update(**{status: 1})
+
+                if on_result is not None:
+                    on_result(item)
+
+        except KeyboardInterrupt:
+            logger.warning("프로그램이 사용자에 의해 중단되었습니다. 지금까지의 결과를 저장합니다...")
+            self.stop()
+            summary['interrupted'] = True
+
+        finally:
+            if self.requests_per_second:
+                set_rate_controller(None)
+
+        # 남은 배치 저장 후 CSV로 한 번 내보내기
+        progress.finish()
+        logger.info("최종 결과 저장 중...")
+        if not sink.is_empty() or pending_digests:
+            sink.flush()
+        # 모든 선수가 직전과 같으면 저장소가 그대로이므로 CSV도 다시 쓰지 않음
+        all_unchanged = summary['unchanged'] and summary['unchanged'] == summary['valid']
+        if self.export_csv and not all_unchanged:
+            export_store_to_csv(self.base_filename)
+
+        summary['elapsed'] = time.time() - started
+        return summary
@@ -1,9 +1,12 @@
-import requests
 import json
 import csv
 import time
 import os
 
+from adaptive_probe import AdaptiveProber
+from api_functions import DEFAULT_MAX_REQUESTS_PER_SECOND, fetch_json, set_rate_controller
+from rate_control import RateController
+
 def is_valid_player(data):
     """playerData에 선수 핵심 정보가 있는지 확인"""
     return (
@@ -17,12 +20,20 @@ def fetch_player(player_id):
     headers = {
         'User-Agent': 'Mozilla/5.0',
     }
-    try:
-        res = requests.get(url, headers=headers, timeout=10)
-        res.raise_for_status()
-        return res.json()
-    except:
-        return None
+    # 공유 속도 제어기가 요청 간격, 429/5xx 백오프, Retry-After를 처리
+    return fetch_json(url, headers, player_id, timeout=10)
+
+def save_results(found_players, not_found_ids):
+    """모아 둔 결과를 output 파일에 덧붙이고 비움"""
+    with open("output/players_found.csv", "a", newline='', encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "team", "team_id", "position", "country"])
+        if f.tell() == 0: writer.writeheader()
+        writer.writerows(found_players)
+    with open("output/not_found_ids.txt", "a", encoding="utf-8") as f:
+        for nf in not_found_ids:
+            f.write(f"{nf}\n")
+    found_players.clear()
+    not_found_ids.clear()
 
 def main():
     start_id = 212866
@@ -34,10 +45,20 @@ def main():
     found_players = []
     not_found_ids = []
 
-    for pid in range(start_id, end_id + 1):
+    # 1.5초 간격으로 시작해 응답 상태에 따라 요청 간격 조절 (차단 방지, 기본 상한까지만 올림)
+    set_rate_controller(RateController(1 / 1.5, max_rate=DEFAULT_MAX_REQUESTS_PER_SECOND))
+
+    # 유효 ID가 드문 구간은 건너뛰며 탐색 (건너뛴 ID는 범위 끝에서 마지막으로 확인)
+    prober = AdaptiveProber(start_id, end_id, backfill=True)
+
+    count = 0
+    saved_found = 0
+    for count, pid in enumerate(prober.iter_ids(), 1):
         data = fetch_player(pid)
+        valid = bool(data and is_valid_player(data))
+        prober.record(pid, valid)
 
-        if data and is_valid_player(data):
+        if valid:
             info = {
                 "id": data.get("id"),
                 "name": data.get("name"),
@@ -56,22 +77,17 @@ def main():
             not_found_ids.append(pid)
             print(f"❌ Not found: {pid}")
 
-        # 저장 주기
-        if pid % save_interval == 0:
-            with open("output/players_found.csv", "a", newline='', encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=["id", "name", "team", "team_id", "position", "country"])
-                if f.tell() == 0: writer.writeheader()
-                writer.writerows(found_players)
-            with open("output/not_found_ids.txt", "a", encoding="utf-8") as f:
-                for nf in not_found_ids:
-                    f.write(f"{nf}\n")
-            found_players.clear()
-            not_found_ids.clear()
-            print(f"💾 Saved up to ID {pid}")
-
-        time.sleep(1.5)  # 차단 방지용 딜레이
+        # 저장 주기 (적응형 탐색은 ID 순서대로 요청하지 않으므로 마지막 ID 대신 확인한 수를 표시)
+        if count % save_interval == 0:
+            saved_found += len(found_players)
+            save_results(found_players, not_found_ids)
+            print(f"💾 Saved {count} checked IDs ({saved_found} players found)")
 
-    print("🎉 Done!")
+    # 마지막 저장 주기 이후에 모인 결과도 저장
+    if found_players or not_found_ids:
+        saved_found += len(found_players)
+        save_results(found_players, not_found_ids)
+    print(f"🎉 Done! {count} IDs checked, {saved_found} players saved")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
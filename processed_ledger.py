@@ -0,0 +1,296 @@
+import csv
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from status_index import STATUSES, StatusIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경에서는 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+class ProcessedLedger:
+    """처리한 선수 ID를 추가 전용 저널에 기록하는 장부
+
+    - ID -> 결과 조회는 결과별 비트맵 인덱스(.index 디렉터리, 메모리 매핑)로 처리
+    - 인덱스가 반영한 스냅샷/저널 위치를 기록해 두므로 시작 시에는 저널 뒷부분만 읽음
+      (인덱스가 없거나 스냅샷이 바뀌었으면 스냅샷 + 저널 전체로 다시 만듦)
+    - 기록은 저널 끝에 한 줄씩 추가하고 fsync는 일정 개수/시간마다 묶어서 수행
+    - 저널이 길어지면 스냅샷으로 합치고 저널을 비움
+    - 여러 프로세스가 같은 파일에 쓸 때는 잠금 파일(flock)로 순서를 보장
+    """
+
+    def __init__(self, snapshot_path='processed_player_ids.csv', fsync_every=100, fsync_interval=1.0,
+                 compact_every=50000, index_dir=None):
+        # 작업 디렉터리가 바뀌어도 같은 파일을 쓰도록 절대 경로로 고정 (비트맵 인덱스는 열린 채로 유지되므로)
+        snapshot_path = os.path.abspath(snapshot_path)
+        base, _ = os.path.splitext(snapshot_path)
+        self.snapshot_path = snapshot_path
+        self.journal_path = f"{base}.journal"
+        self.lock_path = f"{base}.lock"
+        self.index_dir = index_dir or f"{base}.index"
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_every = compact_every
+
+        # player_id -> status (타임스탬프는 스냅샷/저널에만 있고 메모리에는 두지 않음)
+        self.statuses = StatusIndex(self.index_dir)
+
+        self._thread_lock = threading.RLock()
+        self._journal = None
+        self._journal_inode = None
+        self._journal_pos = 0
+        self._journal_entries = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        with self._file_lock():
+            self._reload()
+
+    @contextmanager
+    def _file_lock(self):
+        """스레드 잠금 + 프로세스 간 배타적 파일 잠금"""
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _apply(self, player_id, status):
+        # 알 수 없는 결과가 적힌 줄은 깨진 줄처럼 건너뜀
+        if status in STATUSES:
+            self.statuses.set(player_id, status)
+
+    def _snapshot_signature(self):
+        try:
+            stat = os.stat(self.snapshot_path)
+        except FileNotFoundError:
+            return None
+        return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+    def _save_index_meta(self):
+        """인덱스가 현재 스냅샷과 저널의 어느 위치까지 반영했는지 기록"""
+        self.statuses.write_meta({
+            'snapshot': self._snapshot_signature(),
+            'journal_inode': self._journal_inode,
+            'journal_pos': self._journal_pos,
+            'journal_entries': self._journal_entries,
+        })
+
+    def _index_is_current(self, meta):
+        return (
+            meta is not None
+            and meta.get('snapshot') == self._snapshot_signature()
+            and meta.get('journal_inode') == self._journal_inode
+            and meta.get('journal_pos', 0) <= os.path.getsize(self.journal_path)
+        )
+
+    def _reload(self):
+        """인덱스를 스냅샷과 저널에 맞춤 (저장된 인덱스가 유효하면 저널 뒷부분만 반영)"""
+        self._open_journal()
+        self.statuses.refresh()
+        meta = self.statuses.read_meta()
+        if self._index_is_current(meta):
+            # 저널 재적용은 결과가 같으므로 메타데이터가 비트맵보다 뒤처져 있어도 됨
+            self._journal_pos = meta['journal_pos']
+            self._journal_entries = meta.get('journal_entries', 0)
+            self._read_journal_tail()
+            self._save_index_meta()
+            return
+
+        # load_processed_ids가 돌려준 인덱스가 계속 최신 상태를 보도록 새로 만들지 않고 비움
+        # (다시 만드는 도중에 중단되면 다음 시작 때 처음부터 다시 만들도록 메타데이터를 먼저 지움)
+        self.statuses.write_meta(None)
+        self.statuses.clear()
+
+        if os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, 'r', encoding='utf-8', newline='') as f:
+                reader = csv.reader(f)
+                next(reader, None)  # 헤더
+                for row in reader:
+                    if len(row) >= 2 and row[0].isdigit():
+                        self._apply(int(row[0]), row[1])
+
+        self._journal_pos = 0
+        self._journal_entries = 0
+        self._read_journal_tail()
+        self._save_index_meta()
+
+    def _open_journal(self):
+        if self._journal is not None:
+            self._journal.close()
+        self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal_inode = os.fstat(self._journal.fileno()).st_ino
+
+    def _read_journal_tail(self):
+        """마지막으로 읽은 위치 이후에 추가된 저널 줄을 반영"""
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            f.seek(self._journal_pos)
+            while True:
+                line = f.readline()
+                if not line.endswith('\n'):
+                    # 다른 프로세스가 아직 쓰는 중인 마지막 줄은 다음에 읽음
+                    break
+                self._journal_pos = f.tell()
+                parts = line.rstrip('\n').split(',', 2)
+                if len(parts) == 3 and parts[0].isdigit():
+                    self._apply(int(parts[0]), parts[1])
+                    self._journal_entries += 1
+
+    def _sync_journal_file(self):
+        """다른 프로세스가 저널을 압축해 파일이 바뀌었으면 다시 열고 인덱스를 맞춤"""
+        try:
+            current_inode = os.stat(self.journal_path).st_ino
+        except FileNotFoundError:
+            current_inode = None
+
+        if current_inode != self._journal_inode or os.path.getsize(self.journal_path) < self._journal_pos:
+            self._reload()
+        else:
+            self.statuses.refresh()
+            self._read_journal_tail()
+
+    def refresh(self):
+        """다른 프로세스가 기록한 내용을 인덱스에 반영"""
+        with self._file_lock():
+            self._sync_journal_file()
+
+    def record(self, player_id, status, timestamp=None):
+        """ID 처리 결과를 저널에 추가하고 인덱스 갱신"""
+        timestamp = timestamp or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        player_id = int(player_id)
+        if status not in STATUSES:
+            raise ValueError(f"알 수 없는 처리 결과: {status}")
+
+        with self._file_lock():
+            self._sync_journal_file()
+
+            self._journal.write(f"{player_id},{status},{timestamp}\n")
+            self._journal.flush()
+            self._journal_pos = self._journal.tell()
+            self._journal_entries += 1
+            self._apply(player_id, status)
+
+            # fsync는 일정 개수 또는 일정 시간마다 묶어서 수행 (인덱스 메타데이터도 함께 갱신)
+            self._unsynced += 1
+            if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._fsync()
+                self._save_index_meta()
+
+            if self._journal_entries >= self.compact_every:
+                self._compact_locked()
+
+    def _fsync(self):
+        os.fsync(self._journal.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def flush(self):
+        """아직 fsync하지 않은 기록을 디스크에 반영"""
+        with self._thread_lock:
+            if self._journal is not None and self._unsynced:
+                self._journal.flush()
+                self._fsync()
+
+    def compact(self):
+        """저널을 스냅샷에 합치고 저널을 비움"""
+        with self._file_lock():
+            self._sync_journal_file()
+            self._compact_locked()
+
+    def _read_journal_timestamps(self):
+        """저널에 기록된 ID -> 마지막 타임스탬프 (저널은 compact_every줄 이하라서 메모리에 올려도 작음)"""
+        timestamps = {}
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                parts = line.rstrip('\n').split(',', 2)
+                if len(parts) == 3 and parts[0].isdigit():
+                    timestamps[int(parts[0])] = parts[2]
+        return timestamps
+
+    def _compact_locked(self):
+        # 기존 스냅샷을 한 줄씩 옮겨 쓰고, 저널에 기록된 ID만 인덱스의 최신 결과와 저널 타임스탬프로 바꿈
+        journal_timestamps = self._read_journal_timestamps()
+        rewritten = set()
+        temp_path = f"{self.snapshot_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['player_id', 'status', 'timestamp'])
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, 'r', encoding='utf-8', newline='') as snapshot:
+                    reader = csv.reader(snapshot)
+                    next(reader, None)  # 헤더
+                    for row in reader:
+                        if len(row) >= 2 and row[0].isdigit():
+                            player_id = int(row[0])
+                            if player_id in journal_timestamps:
+                                writer.writerow([player_id, self.statuses.get(player_id), journal_timestamps[player_id]])
+                                rewritten.add(player_id)
+                            else:
+                                writer.writerow([player_id, row[1], row[2] if len(row) > 2 else ''])
+            # 저널에만 있는 ID는 뒤에 추가
+            for player_id, timestamp in journal_timestamps.items():
+                status = self.statuses.get(player_id)
+                if player_id not in rewritten and status is not None:
+                    writer.writerow([player_id, status, timestamp])
+            f.flush()
+            os.fsync(f.fileno())
+        # 스냅샷을 먼저 교체하고 저널을 비움 (중간에 중단되어도 저널 재적용은 결과가 같음)
+        os.replace(temp_path, self.snapshot_path)
+
+        empty_path = f"{self.journal_path}.tmp"
+        open(empty_path, 'w').close()
+        os.replace(empty_path, self.journal_path)
+
+        self._open_journal()
+        self._journal_pos = 0
+        self._journal_entries = 0
+        self._unsynced = 0
+        self._save_index_meta()
+
+    def close(self):
+        with self._file_lock():
+            if self._journal is not None:
+                self.flush()
+                # 다른 프로세스가 압축했을 수 있으므로 맞춘 뒤 메타데이터 기록
+                self._sync_journal_file()
+                self._save_index_meta()
+                self._journal.close()
+                self._journal = None
+                self.statuses.close()
+
+    def records(self):
+        """스냅샷과 저널의 (ID, 결과, 타임스탬프)를 기록된 순서대로 반환 (같은 ID는 나중 기록이 최신)"""
+        with self._file_lock():
+            self._sync_journal_file()
+            for path, parse in ((self.snapshot_path, csv.reader), (self.journal_path, None)):
+                if not os.path.exists(path):
+                    continue
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    if parse is not None:
+                        rows = parse(f)
+                        next(rows, None)  # 헤더
+                    else:
+                        rows = (line.rstrip('\n').split(',', 2) for line in f if line.endswith('\n'))
+                    for row in rows:
+                        if len(row) >= 2 and row[0].isdigit() and row[1] in STATUSES:
+                            yield int(row[0]), row[1], row[2] if len(row) > 2 else ''
+
+    def get(self, player_id, default=None):
+        return self.statuses.get(player_id, default)
+
+    def __contains__(self, player_id):
+        return player_id in self.statuses
+
+    def __len__(self):
+        return len(self.statuses)
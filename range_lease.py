@@ -0,0 +1,341 @@
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from log_utils import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경에서는 파일 이름 변경만으로 경쟁을 줄임
+    fcntl = None
+
+logger = get_logger('lease')
+
+class LeaseLostError(RuntimeError):
+    """임대 기간이 지나 다른 작업자가 구간을 가져간 경우"""
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except ValueError:
+        # 다른 작업자가 아직 쓰는 중인 파일
+        return {}
+
+def _write_json_atomic(path, record):
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def _create_exclusive(path, record):
+    """path가 없을 때만 만들고 내용을 씀 (이미 있으면 FileExistsError)"""
+    fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(record, f)
+        f.flush()
+        os.fsync(f.fileno())
+
+def default_worker_id():
+    """호스트 이름과 PID로 만든 작업자 ID (여러 머신에서 실행해도 겹치지 않음)"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+def active_leases(lease_dir):
+    """lease_dir에서 아직 만료되지 않은 임대 파일 이름 목록 (실행 중인 작업자 확인용)"""
+    active = []
+    for name in sorted(os.listdir(lease_dir)) if os.path.isdir(lease_dir) else []:
+        if name.endswith('.lease'):
+            record = _read_json(os.path.join(lease_dir, name))
+            # 아직 쓰는 중이라 읽을 수 없는 임대도 실행 중으로 봄
+            if record is not None and (not record or record.get('expires_at', 0) >= time.time()):
+                active.append(name)
+    return active
+
+class RangeLease:
+    """작업자가 임대한 ID 구간 하나 (next_id부터 end_id까지가 남은 작업)"""
+
+    def __init__(self, key, start_id, end_id, next_id, token, expires_at):
+        self.key = key
+        self.start_id = start_id
+        self.end_id = end_id
+        self.next_id = next_id
+        self.token = token
+        self.expires_at = expires_at
+        self.lost = False
+
+    def __repr__(self):
+        return f"RangeLease({self.start_id}-{self.end_id}, next_id={self.next_id})"
+
+class LeaseManager:
+    """큰 ID 범위를 shard_size 구간으로 나누고 구간마다 임대 파일로 작업자 한 명에게만 배정
+
+    구간 경계는 shard_size의 배수로 고정되어 있어 범위가 겹치는 실행끼리도 같은 임대 파일을 사용함.
+    lease_dir 안의 파일 (여러 머신이 같은 파일 시스템을 공유하면 머신 간에도 동작):
+    - shard-<start>-<end>.lease    : 현재 임대한 작업자와 만료 시각 (O_EXCL로 만들어 한 명만 성공)
+    - shard-<start>-<end>.progress : 진행 중인 범위와 처리를 마친 위치 (임대가 바뀌어도 이어서 진행)
+    - shard-<start>-<end>.done     : 이 구간 안에서 처리를 마친 범위 목록
+    - shard-<start>-<end>.lock     : 임대 확인과 갱신/회수/해제를 한 번에 하도록 잡는 잠금 파일 (flock)
+
+    임대는 ttl초마다 갱신해야 하며, 갱신이 끊긴 임대(작업자 비정상 종료)는 만료 후 다른 작업자가 가져감.
+    만료 판단은 각 머신의 시계를 사용하므로 머신 간 시계 차이는 ttl보다 충분히 작아야 함.
+    """
+
+    def __init__(self, lease_dir, start_id, end_id, shard_size=1000, ttl=300.0, worker_id=None):
+        self.lease_dir = lease_dir
+        self.start_id = start_id
+        self.end_id = end_id
+        self.shard_size = shard_size
+        self.ttl = ttl
+        self.worker_id = worker_id or default_worker_id()
+        os.makedirs(lease_dir, exist_ok=True)
+        self._check_layout()
+
+    def _check_layout(self):
+        """같은 lease_dir을 쓰는 실행은 구간 크기가 같아야 함 (다르면 구간이 어긋나 같은 ID를 중복 탐색)"""
+        config_path = os.path.join(self.lease_dir, 'shards.json')
+        try:
+            _create_exclusive(config_path, {'shard_size': self.shard_size})
+        except FileExistsError:
+            config = _read_json(config_path)
+            if config and config.get('shard_size') != self.shard_size:
+                raise ValueError(f"'{self.lease_dir}'는 구간 크기 {config.get('shard_size')}로 만들어졌습니다 "
+                                 f"(요청한 구간 크기: {self.shard_size})")
+
+    def shards(self):
+        """(구간 이름, 이번 실행에서 처리할 시작 ID, 끝 ID) 목록"""
+        first = self.start_id // self.shard_size
+        last = self.end_id // self.shard_size
+        shards = []
+        for shard in range(first, last + 1):
+            shard_start, shard_end = shard * self.shard_size, (shard + 1) * self.shard_size - 1
+            shards.append((f"shard-{shard_start}-{shard_end}", max(self.start_id, shard_start), min(self.end_id, shard_end)))
+        return shards
+
+    def _path(self, key, kind):
+        return os.path.join(self.lease_dir, f"{key}.{kind}")
+
+    @contextmanager
+    def _shard_lock(self, key):
+        """구간 하나의 프로세스 간 배타적 파일 잠금
+
+        임대 주인 확인과 임대 파일 쓰기 사이에 다른 작업자가 만료된 임대를 회수하면
+        갱신이 새 주인의 임대를 덮어써 두 작업자가 같은 구간을 처리하게 되므로, 확인과 쓰기를 이 잠금 안에서 함.
+        """
+        if fcntl is None:
+            yield
+            return
+        with open(self._path(key, 'lock'), 'a') as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _lease_record(self, token):
+        return {
+            'worker_id': self.worker_id,
+            'host': socket.gethostname(),
+            'pid': os.getpid(),
+            'token': token,
+            'expires_at': time.time() + self.ttl,
+        }
+
+    def _is_expired(self, path, record):
+        if record:
+            return record.get('expires_at', 0) < time.time()
+        # 내용을 읽을 수 없는 임대는 파일 수정 시각 기준으로 판단
+        try:
+            return os.path.getmtime(path) + self.ttl < time.time()
+        except FileNotFoundError:
+            return True
+
+    def _reclaim(self, path):
+        """만료된 임대 파일을 치움 (다른 작업자가 먼저 치웠거나 그 사이 갱신되었으면 False)"""
+        private_path = f"{path}.{uuid.uuid4().hex}.stale"
+        try:
+            os.rename(path, private_path)
+        except FileNotFoundError:
+            return False
+
+        record = _read_json(private_path)
+        if not self._is_expired(private_path, record):
+            # 확인한 뒤 다른 작업자가 갱신한 임대를 가져왔으면 되돌림
+            try:
+                os.link(private_path, path)
+            except FileExistsError:
+                pass
+            os.remove(private_path)
+            return False
+
+        os.remove(private_path)
+        logger.warning("만료된 임대를 회수합니다: %s (작업자 %s)", os.path.basename(path),
+                       (record or {}).get('worker_id', '알 수 없음'))
+        return True
+
+    def _done_ranges(self, key):
+        return (_read_json(self._path(key, 'done')) or {}).get('ranges', [])
+
+    def _first_unfinished(self, key, start_id, end_id):
+        """start_id부터 처리를 마친 범위(완료 목록, 진행 위치)를 건너뛴 첫 ID (모두 끝났으면 end_id + 1)"""
+        finished = [tuple(r) for r in self._done_ranges(key)]
+        progress = _read_json(self._path(key, 'progress'))
+        if progress and progress.get('next_id', 0) > progress.get('start_id', 0):
+            finished.append((progress['start_id'], progress['next_id'] - 1))
+
+        next_id = start_id
+        advanced = True
+        while advanced and next_id <= end_id:
+            advanced = False
+            for low, high in finished:
+                if low <= next_id <= high:
+                    next_id = high + 1
+                    advanced = True
+        return next_id
+
+    def acquire(self):
+        """아직 끝나지 않았고 다른 작업자가 임대하지 않은 첫 구간을 임대 (없으면 None)"""
+        for key, start_id, end_id in self.shards():
+            if self._first_unfinished(key, start_id, end_id) > end_id:
+                continue
+
+            lease_path = self._path(key, 'lease')
+            token = uuid.uuid4().hex
+            record = self._lease_record(token)
+            try:
+                _create_exclusive(lease_path, record)
+            except FileExistsError:
+                # 만료 확인부터 새 임대를 만들 때까지 잠금을 잡아 그 사이의 갱신과 겹치지 않게 함
+                with self._shard_lock(key):
+                    if not self._is_expired(lease_path, _read_json(lease_path)) or not self._reclaim(lease_path):
+                        continue
+                    try:
+                        _create_exclusive(lease_path, record)
+                    except FileExistsError:
+                        continue
+
+            # 임대를 만드는 사이 다른 작업자가 끝낸 구간이면 임대를 돌려놓음
+            next_id = self._first_unfinished(key, start_id, end_id)
+            if next_id > end_id:
+                os.remove(lease_path)
+                continue
+
+            logger.info("구간 %s~%s 임대 (작업자 %s, %s부터 시작)", start_id, end_id, self.worker_id, next_id)
+            return RangeLease(key, start_id, end_id, next_id, token, record['expires_at'])
+        return None
+
+    def _check_owner(self, lease):
+        record = _read_json(self._path(lease.key, 'lease'))
+        if not record or record.get('token') != lease.token:
+            lease.lost = True
+            raise LeaseLostError(f"구간 {lease.start_id}~{lease.end_id} 임대를 잃었습니다")
+
+    def renew(self, lease, next_id=None):
+        """임대 기간을 연장하고 진행 위치 기록 (임대를 잃었으면 LeaseLostError)"""
+        with self._shard_lock(lease.key):
+            self._renew_locked(lease, next_id)
+
+    def _renew_locked(self, lease, next_id):
+        self._check_owner(lease)
+        if next_id is not None and next_id != lease.next_id:
+            lease.next_id = next_id
+            _write_json_atomic(self._path(lease.key, 'progress'), {
+                'start_id': lease.start_id, 'next_id': next_id, 'worker_id': self.worker_id, 'updated_at': time.time(),
+            })
+        record = self._lease_record(lease.token)
+        lease_path = self._path(lease.key, 'lease')
+        # 새 내용을 임시 파일에 써 두고, 바꾸기 직전에 주인을 다시 확인 (잠금이 없는 환경에서도 덮어쓸 틈을 줄임)
+        temp_path = f"{lease_path}.{uuid.uuid4().hex}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(record, f)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            self._check_owner(lease)
+            os.replace(temp_path, lease_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        lease.expires_at = record['expires_at']
+
+    def complete(self, lease, summary=None):
+        """구간 완료 표시 후 임대 해제 (완료 목록은 임대를 가진 작업자만 고치므로 읽고 다시 써도 안전)"""
+        with self._shard_lock(lease.key):
+            self._check_owner(lease)
+            ranges = self._done_ranges(lease.key) + [[lease.start_id, lease.end_id]]
+            _write_json_atomic(self._path(lease.key, 'done'), {
+                'ranges': ranges, 'worker_id': self.worker_id, 'finished_at': time.time(), 'summary': summary or {},
+            })
+            try:
+                os.remove(self._path(lease.key, 'progress'))
+            except FileNotFoundError:
+                pass
+            self._remove_lease(lease)
+
+    def release(self, lease, next_id=None):
+        """구간을 끝내지 못하고 임대 해제 (진행 위치는 남겨 다음 작업자가 이어서 처리)"""
+        with self._shard_lock(lease.key):
+            try:
+                self._renew_locked(lease, next_id)
+            except LeaseLostError:
+                return
+            self._remove_lease(lease)
+
+    def _remove_lease(self, lease):
+        try:
+            os.remove(self._path(lease.key, 'lease'))
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def hold(self, lease, progress=None, on_lost=None):
+        """with 블록 동안 백그라운드 스레드가 ttl/3마다 임대를 갱신
+
+        progress는 현재 진행 위치(next_id)를 돌려주는 함수, on_lost는 임대를 잃었을 때 호출할 함수.
+        """
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.ttl / 3):
+                try:
+                    self.renew(lease, progress() if progress else None)
+                except LeaseLostError as e:
+                    logger.error("%s", e)
+                    if on_lost is not None:
+                        on_lost()
+                    return
+                except OSError as e:
+                    # 공유 파일 시스템의 일시적인 오류는 다음 주기에 다시 시도
+                    logger.warning("임대 갱신 실패 (%s~%s): %s", lease.start_id, lease.end_id, e)
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{lease.start_id}", daemon=True)
+        thread.start()
+        try:
+            yield lease
+        finally:
+            stop.set()
+            thread.join()
+
+    def status(self):
+        """구간 상태별 개수 (done, leased, expired, pending)"""
+        counts = {'done': 0, 'leased': 0, 'expired': 0, 'pending': 0}
+        for key, start_id, end_id in self.shards():
+            if self._first_unfinished(key, start_id, end_id) > end_id:
+                counts['done'] += 1
+                continue
+            lease_path = self._path(key, 'lease')
+            record = _read_json(lease_path)
+            if record is None:
+                counts['pending'] += 1
+            elif self._is_expired(lease_path, record):
+                counts['expired'] += 1
+            else:
+                counts['leased'] += 1
+        return counts
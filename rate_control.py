@@ -0,0 +1,194 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from log_utils import get_logger, log_event
+from rate_limiter import RateLimiter
+
+logger = get_logger('rate')
+
+def parse_retry_after(value, max_delay=600.0):
+    """Retry-After 헤더 값(초 또는 HTTP 날짜)을 대기 시간(초)으로 변환 (없거나 잘못된 값이면 None)"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        delay = float(value)
+    except ValueError:
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        delay = (retry_at - datetime.now(timezone.utc)).total_seconds()
+    return min(max(0.0, delay), max_delay)
+
+class RateController(RateLimiter):
+    """응답 상태에 따라 초당 요청 수를 조절하는 공유 속도 제어기 (AIMD + 서킷 브레이커)
+
+    - 정상 응답이 이어지면 초당 additive_increase씩 요청 수를 늘림 (max_rate까지)
+    - 429/5xx를 받으면 decrease_factor를 곱해 줄이고 (min_rate까지), Retry-After가 있으면 그때까지 모든 요청을 멈춤
+    - 실패(429/5xx/네트워크 오류)가 failure_threshold번 연속되면 서킷을 열어 open_seconds 동안 전체 탐색을 멈춤.
+      이후 요청 하나로 상태를 확인해 성공하면 닫고, 실패하면 대기 시간을 두 배로 늘려 다시 엶
+    - rate가 None이면 처음에는 제한 없이 보내다가 첫 429/5xx부터 최근 요청 속도를 기준으로 조절함
+    - adaptive=False이면 요청 수는 고정하고 Retry-After, 백오프, 서킷 브레이커만 적용함
+
+    acquire/record_*는 여러 스레드에서 호출해도 됨.
+    """
+
+    def __init__(self, initial_rate=None, min_rate=0.2, max_rate=None, additive_increase=1.0, decrease_factor=0.5,
+                 burst=1, adaptive=True, backoff_base=1.0, backoff_max=60.0, failure_threshold=8,
+                 open_seconds=30.0, max_open_seconds=300.0, seed=None):
+        super().__init__(initial_rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate and max_rate > 0 else None
+        if self.rate is not None and self.max_rate is not None:
+            self.rate = min(self.rate, self.max_rate)
+        self.additive_increase = additive_increase
+        self.decrease_factor = decrease_factor
+        self.adaptive = adaptive
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failure_threshold = failure_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+
+        self.state = 'closed'
+        self.stats = {'requests': 0, 'successes': 0, 'throttled': 0, 'failures': 0, 'decreases': 0, 'circuit_opens': 0}
+        self._random = random.Random(seed)
+        self._paused_until = 0.0
+        self._open_until = 0.0
+        self._current_open_seconds = open_seconds
+        self._probe_in_flight = False
+        self._consecutive_failures = 0
+        self._last_decrease = 0.0
+        # 제한 없이 보낼 때 최근 요청 속도를 추정하기 위한 요청 시각
+        self._recent = deque(maxlen=64)
+
+    def acquire(self):
+        """요청 1건을 보낼 수 있을 때까지 대기 (서킷이 열려 있거나 Retry-After 동안은 모든 스레드가 대기)"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait_time = self._wait_time_locked(now)
+                if wait_time <= 0:
+                    self.stats['requests'] += 1
+                    self._recent.append(now)
+                    return
+            # 잠금을 놓은 상태에서 대기해야 다른 스레드가 막히지 않음
+            time.sleep(min(wait_time, 1.0))
+
+    def _wait_time_locked(self, now):
+        if self.state == 'open':
+            if now < self._open_until:
+                return self._open_until - now
+            # 대기가 끝나면 요청 하나만 보내 상태 확인
+            self.state = 'half_open'
+            self._probe_in_flight = False
+
+        if self.state == 'half_open':
+            if self._probe_in_flight:
+                return 0.1
+            self._probe_in_flight = True
+            return 0.0
+
+        if now < self._paused_until:
+            return self._paused_until - now
+
+        if self.rate is None:
+            return 0.0
+
+        # 토큰 버킷 (RateLimiter와 같은 방식)
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        if self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def _observed_rate(self, now):
+        if len(self._recent) < 2 or now <= self._recent[0]:
+            return None
+        return len(self._recent) / (now - self._recent[0])
+
+    def record_success(self):
+        """정상 응답 (404처럼 서버가 정상적으로 답한 경우 포함)"""
+        with self._lock:
+            self.stats['successes'] += 1
+            self._consecutive_failures = 0
+            if self.state != 'closed':
+                self.state = 'closed'
+                self._current_open_seconds = self.open_seconds
+                log_event(logger, logging.INFO, 'circuit_closed', "응답이 정상으로 돌아와 요청을 다시 시작합니다",
+                          rate=self.rate)
+            if self.adaptive and self.rate is not None:
+                # 초당 요청 수만큼 성공하면 additive_increase만큼 증가 (초당 additive_increase씩)
+                self.rate += self.additive_increase / self.rate
+                if self.max_rate is not None:
+                    self.rate = min(self.rate, self.max_rate)
+
+    def record_throttle(self, retry_after=None, status_code=429):
+        """429/5xx 응답: 요청 수를 줄이고 Retry-After가 있으면 그동안 모든 요청을 멈춤"""
+        with self._lock:
+            now = time.monotonic()
+            self.stats['throttled'] += 1
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+            # 동시에 보낸 요청들이 한꺼번에 429를 받아도 한 번만 줄임
+            if self.adaptive and now - self._last_decrease >= 1.0:
+                current = self.rate if self.rate is not None else self._observed_rate(now)
+                if current is not None:
+                    self.rate = max(self.min_rate, current * self.decrease_factor)
+                    self._tokens = min(self._tokens, 0.0)
+                    self._last_decrease = now
+                    self.stats['decreases'] += 1
+                    log_event(logger, logging.INFO, 'rate_decreased',
+                              "응답 상태 %s: 초당 요청 수를 %.2f로 줄입니다%s", status_code, self.rate,
+                              f" (Retry-After {retry_after:.1f}초)" if retry_after else '',
+                              rate=round(self.rate, 3), status_code=status_code, retry_after=retry_after)
+            self._register_failure_locked(now)
+
+    def record_failure(self):
+        """타임아웃, 연결 오류 등: 요청 수는 그대로 두고 서킷 브레이커에만 반영"""
+        with self._lock:
+            self._register_failure_locked(time.monotonic())
+
+    def _register_failure_locked(self, now):
+        self.stats['failures'] += 1
+        self._consecutive_failures += 1
+        if self.state == 'half_open':
+            # 상태 확인 요청이 실패하면 더 오래 멈춤
+            self._current_open_seconds = min(self.max_open_seconds, self._current_open_seconds * 2)
+            self._open_locked(now)
+        elif self.state == 'closed' and self._consecutive_failures >= self.failure_threshold:
+            self._open_locked(now)
+
+    def _open_locked(self, now):
+        self.state = 'open'
+        self._open_until = now + self._current_open_seconds
+        self.stats['circuit_opens'] += 1
+        log_event(logger, logging.WARNING, 'circuit_open',
+                  "실패가 %d번 연속되어 %.0f초 동안 모든 요청을 멈춥니다",
+                  self._consecutive_failures, self._current_open_seconds,
+                  consecutive_failures=self._consecutive_failures, pause=self._current_open_seconds)
+
+    def backoff_delay(self, attempt, retry_after=None):
+        """재시도 전 대기 시간: Retry-After가 있으면 그 값, 없으면 지수 백오프에 지터를 더한 값
+
+        지터는 절반은 고정, 절반은 무작위 (여러 스레드가 같은 순간에 다시 몰리지 않도록).
+        """
+        if retry_after is not None:
+            return retry_after
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay / 2 + self._random.uniform(0, delay / 2)
+
+    def snapshot(self):
+        """현재 요청 수와 누적 통계"""
+        with self._lock:
+            return dict(self.stats, rate=self.rate, state=self.state)
@@ -0,0 +1,34 @@
+import threading
+import time
+
+class RateLimiter:
+    """여러 스레드가 공유하는 전역 초당 요청 수 제한기 (토큰 버킷 방식)"""
+
+    def __init__(self, requests_per_second, burst=1):
+        # requests_per_second가 None이거나 0 이하이면 제한 없음
+        self.rate = requests_per_second if requests_per_second and requests_per_second > 0 else None
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """요청 1건을 보낼 수 있을 때까지 대기"""
+        if self.rate is None:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                # 경과 시간만큼 토큰 보충
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait_time = (1 - self._tokens) / self.rate
+
+            # 잠금을 놓은 상태에서 대기해야 다른 스레드가 막히지 않음
+            time.sleep(wait_time)
@@ -0,0 +1,224 @@
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:  # zstandard가 없으면 gzip 사용
+    zstandard = None
+
+_PLAYER_FILE_PATTERN = re.compile(r'player_(\d+)\.json$')
+
+def canonical_bytes(data):
+    """같은 내용이면 항상 같은 바이트가 되도록 키 정렬 + 공백 없는 JSON으로 직렬화"""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'), sort_keys=True).encode('utf-8')
+
+def payload_hash(data):
+    """원본 데이터의 내용 해시 (저장소의 객체 이름과 같은 값)"""
+    return hashlib.sha256(canonical_bytes(data)).hexdigest()
+
+def _compress(raw):
+    if zstandard is not None:
+        return zstandard.ZstdCompressor(level=10).compress(raw), 'zst'
+    return gzip.compress(raw, compresslevel=6), 'gz'
+
+def _decompress(blob, codec):
+    if codec == 'zst':
+        if zstandard is None:
+            raise ImportError("zstd로 압축된 원본 데이터를 읽으려면 zstandard가 필요합니다. 'pip install zstandard'로 설치하세요.")
+        return zstandard.ZstdDecompressor().decompress(blob)
+    return gzip.decompress(blob)
+
+def _atomic_write(path, content, mode='wb'):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, mode) as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+class RawStore:
+    """원본 API 응답을 압축해 내용 해시로 저장하고 선수별 스냅샷 목록(manifest)을 관리
+
+    - raw_data/objects/ab/<sha256>.json.gz : 압축된 원본 (같은 내용은 한 번만 저장)
+    - raw_data/manifests/player_<id>.json : 선수별 스냅샷 목록 (해시, 수집 시각, 크기)
+    - 직전 스냅샷과 내용이 같으면 해시 계산 한 번으로 끝나고 파일을 쓰지 않음
+    - 선수별 직전 해시는 최근에 저장한 latest_hash_cache_size명만 메모리에 두고, 나머지는 manifest에서 다시 읽음
+    """
+
+    def __init__(self, root='raw_data', latest_hash_cache_size=100_000):
+        self.root = root
+        self.objects_dir = os.path.join(root, 'objects')
+        self.manifests_dir = os.path.join(root, 'manifests')
+        self.latest_hash_cache_size = max(1, latest_hash_cache_size)
+        self._latest_hash = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _object_path(self, content_hash, codec):
+        return os.path.join(self.objects_dir, content_hash[:2], f"{content_hash}.json.{codec}")
+
+    def _find_object(self, content_hash):
+        for codec in ('zst', 'gz'):
+            path = self._object_path(content_hash, codec)
+            if os.path.exists(path):
+                return path, codec
+        return None, None
+
+    def _manifest_path(self, player_id):
+        return os.path.join(self.manifests_dir, f"player_{player_id}.json")
+
+    def _legacy_path(self, player_id):
+        return os.path.join(self.root, f"player_{player_id}.json")
+
+    def load_manifest(self, player_id):
+        path = self._manifest_path(player_id)
+        if not os.path.exists(path):
+            return {'player_id': player_id, 'snapshots': []}
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def put(self, player_id, data, fetched_at=None):
+        """원본 데이터 저장. 새 스냅샷이 추가되면 True, 직전과 같아 건너뛰면 False"""
+        return self.put_with_hash(player_id, data, fetched_at)[1]
+
+    def put_with_hash(self, player_id, data, fetched_at=None):
+        """원본 데이터를 저장하고 (내용 해시, 새 스냅샷 추가 여부) 반환"""
+        raw = canonical_bytes(data)
+        content_hash = hashlib.sha256(raw).hexdigest()
+
+        with self._lock:
+            if player_id in self._latest_hash:
+                self._latest_hash.move_to_end(player_id)
+            else:
+                snapshots = self.load_manifest(player_id)['snapshots']
+                self._remember_hash(player_id, snapshots[-1]['hash'] if snapshots else None)
+
+            if self._latest_hash[player_id] == content_hash:
+                return content_hash, False
+
+            # 다른 스냅샷과 내용이 같으면 객체는 다시 쓰지 않음
+            object_path, codec = self._find_object(content_hash)
+            if object_path is None:
+                blob, codec = _compress(raw)
+                object_path = self._object_path(content_hash, codec)
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                _atomic_write(object_path, blob)
+
+            manifest = self.load_manifest(player_id)
+            manifest['snapshots'].append({
+                'hash': content_hash,
+                'codec': codec,
+                'size': len(raw),
+                'fetched_at': fetched_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            })
+            os.makedirs(self.manifests_dir, exist_ok=True)
+            _atomic_write(self._manifest_path(player_id), json.dumps(manifest, ensure_ascii=False), mode='w')
+            self._remember_hash(player_id, content_hash)
+            return content_hash, True
+
+    def _remember_hash(self, player_id, content_hash):
+        # 오래 저장하지 않은 선수부터 잊음 (self._lock 안에서 호출)
+        self._latest_hash[player_id] = content_hash
+        self._latest_hash.move_to_end(player_id)
+        while len(self._latest_hash) > self.latest_hash_cache_size:
+            self._latest_hash.popitem(last=False)
+
+    def latest_hash(self, player_id):
+        snapshots = self.load_manifest(player_id)['snapshots']
+        return snapshots[-1]['hash'] if snapshots else None
+
+    def get(self, player_id, snapshot=-1):
+        """선수의 스냅샷 하나를 읽어 반환 (기본은 최신, 저장소에 없으면 예전 형식 파일에서 읽음)"""
+        snapshots = self.load_manifest(player_id)['snapshots']
+        if snapshots:
+            return self.get_object(snapshots[snapshot]['hash'])
+
+        legacy_path = self._legacy_path(player_id)
+        if os.path.exists(legacy_path):
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return None
+
+    def get_bytes(self, player_id, snapshot=-1):
+        """스냅샷 하나의 JSON 바이트 반환 (파이썬 객체로 바꾸지 않아 타입 디코더에 바로 넘길 수 있음)"""
+        snapshots = self.load_manifest(player_id)['snapshots']
+        if snapshots:
+            object_path, codec = self._find_object(snapshots[snapshot]['hash'])
+            if object_path is None:
+                raise FileNotFoundError(f"원본 데이터 객체를 찾을 수 없습니다: {snapshots[snapshot]['hash']}")
+            with open(object_path, 'rb') as f:
+                return _decompress(f.read(), codec)
+
+        legacy_path = self._legacy_path(player_id)
+        if os.path.exists(legacy_path):
+            with open(legacy_path, 'rb') as f:
+                return f.read()
+        return None
+
+    def iter_bytes(self, player_id):
+        """선수의 모든 스냅샷 JSON 바이트를 오래된 것부터 차례로 돌려줌 (저장소에 없으면 예전 형식 파일 하나)
+
+        최신 스냅샷에서 빠진 경기나 예전 시즌 통계는 이전 스냅샷에만 남아 있으므로 전체 재구축에 사용.
+        """
+        snapshots = self.load_manifest(player_id)['snapshots']
+        if not snapshots:
+            raw = self.get_bytes(player_id)
+            if raw is not None:
+                yield raw
+            return
+        for snapshot in snapshots:
+            object_path, codec = self._find_object(snapshot['hash'])
+            if object_path is None:
+                raise FileNotFoundError(f"원본 데이터 객체를 찾을 수 없습니다: {snapshot['hash']}")
+            with open(object_path, 'rb') as f:
+                yield _decompress(f.read(), codec)
+
+    def get_object(self, content_hash):
+        object_path, codec = self._find_object(content_hash)
+        if object_path is None:
+            raise FileNotFoundError(f"원본 데이터 객체를 찾을 수 없습니다: {content_hash}")
+        with open(object_path, 'rb') as f:
+            return json.loads(_decompress(f.read(), codec))
+
+    def snapshots(self, player_id):
+        return self.load_manifest(player_id)['snapshots']
+
+    def player_ids(self):
+        """저장소(manifest)와 예전 형식 파일에 있는 모든 선수 ID"""
+        ids = set()
+        for path in glob.glob(os.path.join(self.manifests_dir, 'player_*.json')):
+            match = _PLAYER_FILE_PATTERN.search(path)
+            if match:
+                ids.add(int(match.group(1)))
+        for path in glob.glob(os.path.join(self.root, 'player_*.json')):
+            match = _PLAYER_FILE_PATTERN.search(path)
+            if match:
+                ids.add(int(match.group(1)))
+        return sorted(ids)
+
+    def migrate_legacy(self, remove=False):
+        """raw_data/player_<id>.json 형식의 예전 파일을 저장소로 옮김"""
+        migrated = 0
+        for path in sorted(glob.glob(os.path.join(self.root, 'player_*.json'))):
+            match = _PLAYER_FILE_PATTERN.search(path)
+            if not match:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            fetched_at = datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')
+            self.put(int(match.group(1)), data, fetched_at=fetched_at)
+            migrated += 1
+            if remove:
+                os.remove(path)
+        return migrated
+
+if __name__ == "__main__":
+    # 예전 형식의 원본 파일을 저장소로 옮기기 (--remove를 주면 원본 파일 삭제)
+    store = RawStore()
+    count = store.migrate_legacy(remove='--remove' in sys.argv)
+    print(f"{count}개의 원본 파일을 '{store.root}' 저장소로 옮겼습니다.")
@@ -0,0 +1,129 @@
+import argparse
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from data_extractors import EXTRA_TABLE_EXTRACTORS, extract_all_tables
+from data_processor import get_storage_engine, replace_store_contents
+from log_utils import ROOT_LOGGER_NAME, ProgressReporter, get_logger, log_event, setup_logging
+from raw_store import RawStore
+
+logger = get_logger('rebuild')
+
+def _init_worker():
+    """작업 프로세스에서는 선수별 추출 경고를 남기지 않음 (실패한 ID는 결과로 따로 모음)"""
+    logging.getLogger(ROOT_LOGGER_NAME).setLevel(logging.ERROR)
+
+def _extract_chunk(args):
+    """작업 프로세스: 선수 ID 묶음의 모든 스냅샷을 오래된 것부터 읽어 모든 테이블의 행 목록으로 추출
+
+    최신 스냅샷의 recentMatches에서 빠진 경기와 예전 mainLeague 시즌 통계는 이전 스냅샷에만 있으므로
+    스냅샷을 모두 차례로 추출하고, 같은 키는 저장소가 나중 행(최신 스냅샷)을 남김.
+    """
+    raw_root, player_ids = args
+    store = RawStore(raw_root)
+    players, matches, stats = [], [], []
+    extras = {table: [] for table in EXTRA_TABLE_EXTRACTORS}
+    failed = []
+    snapshots = 0
+
+    for player_id in player_ids:
+        try:
+            found = False
+            for raw in store.iter_bytes(player_id):
+                found = True
+                snapshots += 1
+                # 필요한 필드만 한 번 디코딩하고 한 번 순회해 모든 테이블 추출
+                tables = extract_all_tables(raw)
+                if tables['players']:
+                    players.append(tables['players'])
+                matches.extend(tables['matches'])
+                stats.extend(tables['stats'])
+                for table, rows in extras.items():
+                    rows.extend(tables[table])
+            if not found:
+                failed.append(player_id)
+        except Exception:
+            failed.append(player_id)
+
+    return players, matches, stats, extras, failed, snapshots
+
+def rebuild_from_raw(base_filename='football_players_data', raw_root='raw_data', workers=None, chunk_size=200):
+    """네트워크 없이 원본 저장소만으로 모든 테이블을 다시 만듦"""
+    started = time.time()
+    store = RawStore(raw_root)
+    player_ids = store.player_ids()
+    if not player_ids:
+        logger.warning("'%s'에 원본 데이터가 없습니다.", raw_root)
+        return None
+
+    workers = workers or os.cpu_count() or 1
+    chunks = [(raw_root, player_ids[i:i + chunk_size]) for i in range(0, len(player_ids), chunk_size)]
+    logger.info("%d명의 원본 데이터를 %d개 프로세스로 다시 추출합니다 (%d개 묶음)", len(player_ids), workers, len(chunks))
+    progress = ProgressReporter(logger, total=len(chunks), label='묶음 진행 상황')
+
+    players, matches, stats, failed = [], [], [], []
+    extras = {table: [] for table in EXTRA_TABLE_EXTRACTORS}
+    snapshots = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        for chunk_players, chunk_matches, chunk_stats, chunk_extras, chunk_failed, chunk_snapshots in executor.map(
+                _extract_chunk, chunks):
+            snapshots += chunk_snapshots
+            players.extend(chunk_players)
+            matches.extend(chunk_matches)
+            stats.extend(chunk_stats)
+            for table, rows in chunk_extras.items():
+                extras[table].extend(rows)
+            failed.extend(chunk_failed)
+            progress.update(players=len(chunk_players), failed=len(chunk_failed))
+    progress.finish()
+
+    extracted = time.time()
+
+    # 모든 테이블을 한 번에 만들어 저장소를 교체하고 CSV로 내보냄
+    replace_store_contents(
+        pd.DataFrame(players) if players else None,
+        pd.DataFrame(matches) if matches else None,
+        pd.DataFrame(stats) if stats else None,
+        base_filename,
+        {table: pd.DataFrame(rows) if rows else None for table, rows in extras.items()},
+    )
+
+    finished = time.time()
+    # 스냅샷마다 추출한 행이므로 같은 키가 여러 번 들어 있음 (저장소에 남은 행 수로 보고)
+    engine = get_storage_engine(base_filename)
+    players_count, matches_count, stats_count = (engine.row_count(table) for table in ('players', 'matches', 'stats'))
+    log_event(logger, logging.INFO, 'rebuild_finished',
+              "재구축 완료: 스냅샷 %d개에서 선수 %d명, 경기 %d개, 통계 %d개, 실패 %d건 (추출 %.1f초 + 저장 %.1f초)",
+              snapshots, players_count, matches_count, stats_count, len(failed), extracted - started,
+              finished - extracted, snapshots=snapshots, players=players_count, matches=matches_count,
+              stats=stats_count, failed=len(failed),
+              extract_seconds=round(extracted - started, 3), save_seconds=round(finished - extracted, 3))
+    if failed:
+        logger.warning("원본을 읽지 못한 선수 ID 일부: %s", failed[:10])
+
+    return {
+        'snapshots': snapshots,
+        'players': players_count,
+        'matches': matches_count,
+        'stats': stats_count,
+        'failed': failed,
+        'elapsed': finished - started,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='raw_data 원본만으로 CSV 테이블 재구축 (네트워크 사용 안 함)')
+    parser.add_argument('--base-filename', default='football_players_data')
+    parser.add_argument('--raw-root', default='raw_data')
+    parser.add_argument('--workers', type=int, default=None, help='작업 프로세스 수 (기본: CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=200)
+    parser.add_argument('--log-level', default=None, help='로그 레벨 (기본: KICKSTATS_LOG_LEVEL 또는 INFO)')
+    parser.add_argument('--log-json', default=None, help='JSON-lines 로그 파일 경로')
+    args = parser.parse_args()
+
+    setup_logging(args.log_level, args.log_json)
+
+    rebuild_from_raw(args.base_filename, args.raw_root, args.workers, args.chunk_size)
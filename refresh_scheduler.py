@@ -0,0 +1,148 @@
+import heapq
+import math
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from data_processor import get_processed_ledger, get_storage_engine, save_processed_id
+from log_utils import get_logger
+from status_index import VALID_STATUSES
+
+logger = get_logger('refresh')
+
+_DAY_SECONDS = 86400.0
+
+def _to_utc(value):
+    """문자열/datetime을 UTC datetime으로 변환 (빈 값이나 잘못된 값이면 None)"""
+    if value is None or value == '' or (isinstance(value, float) and math.isnan(value)):
+        return None
+    try:
+        timestamp = pd.Timestamp(value)
+    except (TypeError, ValueError):
+        return None
+    if pd.isna(timestamp):
+        return None
+    if timestamp.tzinfo is None:
+        # 장부 타임스탬프는 현지 시각으로 기록됨
+        timestamp = timestamp.tz_localize(datetime.now().astimezone().tzinfo)
+    return timestamp.tz_convert(timezone.utc).to_pydatetime()
+
+class RefreshScheduler:
+    """이미 찾은 선수 중 새 경기가 있을 가능성이 높은 선수부터 꺼내는 우선순위 큐
+
+    선수마다 새 경기 수의 기댓값을 (최근 경기 빈도 × 쉬고 있던 기간에 따른 감쇠 × 마지막 수집 이후 일수)로 추정하고,
+    새 경기가 하나 이상 있을 확률(1 - e^-기댓값)을 우선순위로 사용함.
+    - 경기 빈도: 마지막 경기 전 activity_window_days 동안의 경기 수 / 기간 (경기 기록이 없으면 base_rate)
+    - 감쇠: 마지막 경기부터 마지막 수집까지 inactive_half_life_days가 지날 때마다 절반
+      (수집 시점에 이미 오래 쉬고 있던 은퇴, 장기 부상 선수는 뒤로 밀림. 수집 이후 기간은 알 수 없으므로 감쇠에 넣지 않음)
+    - 수집 시각이 기록되지 않은 선수는 max_staleness_days만큼 지난 것으로 봄
+    """
+
+    def __init__(self, now=None, activity_window_days=180.0, inactive_half_life_days=60.0, base_rate=1 / 120,
+                 max_staleness_days=365.0):
+        self.now = now or datetime.now(timezone.utc)
+        self.activity_window_days = activity_window_days
+        self.inactive_half_life_days = inactive_half_life_days
+        self.base_rate = base_rate
+        self.max_staleness_days = max_staleness_days
+        self._heap = []
+
+    def estimate(self, recent_matches=0, last_match=None, last_fetched=None):
+        """(우선순위, 새 경기 수 기댓값) 반환"""
+        rate = recent_matches / self.activity_window_days if recent_matches else self.base_rate
+
+        if last_match is not None and last_fetched is not None and last_fetched > last_match:
+            idle_days = (last_fetched - last_match).total_seconds() / _DAY_SECONDS
+            rate *= 0.5 ** (idle_days / self.inactive_half_life_days)
+
+        if last_fetched is None:
+            stale_days = self.max_staleness_days
+        else:
+            stale_days = min(self.max_staleness_days, max(0.0, (self.now - last_fetched).total_seconds() / _DAY_SECONDS))
+
+        expected = rate * stale_days
+        return 1.0 - math.exp(-expected), expected
+
+    def add(self, player_id, recent_matches=0, last_match=None, last_fetched=None):
+        """선수를 큐에 추가"""
+        priority, expected = self.estimate(recent_matches, last_match, last_fetched)
+        entry = {
+            'player_id': player_id,
+            'priority': priority,
+            'expected_matches': expected,
+            'recent_matches': recent_matches,
+            'last_match': last_match,
+            'last_fetched': last_fetched,
+        }
+        # 확률은 1에 가까워지면 구분이 안 되므로 기댓값으로 정렬 (같으면 수집한 지 오래된 선수, 그다음 ID 순)
+        stale_key = last_fetched.timestamp() if last_fetched is not None else float('-inf')
+        heapq.heappush(self._heap, (-expected, stale_key, player_id, entry))
+
+    def __len__(self):
+        return len(self._heap)
+
+    def pop(self):
+        """우선순위가 가장 높은 선수의 정보 (비어 있으면 None)"""
+        if not self._heap:
+            return None
+        return heapq.heappop(self._heap)[-1]
+
+    def plan(self, budget=None):
+        """요청 예산(budget명, None이면 전체) 안에서 갱신할 선수 정보 목록을 우선순위 순으로 반환"""
+        count = len(self._heap) if budget is None else min(budget, len(self._heap))
+        return [self.pop() for _ in range(count)]
+
+def load_match_activity(base_filename='football_players_data', activity_window_days=180.0):
+    """저장소의 경기 기록에서 선수별 (마지막 경기 시각, 마지막 경기 전 activity_window_days 동안의 경기 수)"""
+    try:
+        matches = get_storage_engine(base_filename).read_table('matches', columns=['player_id', 'match_date'])
+    except (KeyError, ValueError) as e:
+        logger.warning("경기 기록을 읽을 수 없어 수집 시각만으로 우선순위를 정합니다: %s", e)
+        return {}
+    if matches.empty:
+        return {}
+
+    dates = pd.to_datetime(matches['match_date'], utc=True, errors='coerce')
+    matches = pd.DataFrame({'player_id': matches['player_id'], 'match_date': dates}).dropna()
+    last_match = matches.groupby('player_id')['match_date'].transform('max')
+    window = pd.Timedelta(days=activity_window_days)
+    recent_counts = matches[matches['match_date'] > last_match - window].groupby('player_id').size()
+    last_by_player = matches.groupby('player_id')['match_date'].max()
+
+    return {
+        int(player_id): (last.to_pydatetime(), int(recent_counts.get(player_id, 0)))
+        for player_id, last in last_by_player.items()
+    }
+
+def load_last_fetched(player_ids=None):
+    """장부에 기록된 선수별 마지막 수집 시각 (유효한 결과로 기록된 것만)"""
+    wanted = set(player_ids) if player_ids is not None else None
+    last_fetched = {}
+    for player_id, status, timestamp in get_processed_ledger().records():
+        if status in VALID_STATUSES and (wanted is None or player_id in wanted):
+            # 같은 ID는 나중 기록이 최신
+            last_fetched[player_id] = timestamp
+    return {player_id: _to_utc(timestamp) for player_id, timestamp in last_fetched.items()}
+
+def record_refresh(item):
+    """PlayerPipeline.run의 on_result로 넘겨 받아 온 선수의 수집 시각을 장부에 기록
+
+    유효한 데이터를 받은 경우만 기록함 (일시적인 오류로 이미 찾은 선수가 무효로 바뀌지 않도록).
+    """
+    if item['status'] in VALID_STATUSES:
+        save_processed_id(item['player_id'], item['status'])
+
+def build_refresh_scheduler(player_ids, base_filename='football_players_data', now=None, **options):
+    """선수 ID 목록과 저장된 경기 기록, 장부의 수집 시각으로 RefreshScheduler를 만듦"""
+    scheduler = RefreshScheduler(now=now, **options)
+    activity = load_match_activity(base_filename, scheduler.activity_window_days)
+    last_fetched = load_last_fetched(player_ids)
+
+    for player_id in player_ids:
+        last_match, recent_matches = activity.get(player_id, (None, 0))
+        scheduler.add(player_id, recent_matches, last_match, last_fetched.get(player_id))
+
+    logger.info("갱신 후보 %d명 (경기 기록 있음 %d명, 수집 시각 있음 %d명)", len(scheduler),
+                sum(1 for player_id in player_ids if player_id in activity),
+                sum(1 for player_id in player_ids if last_fetched.get(player_id) is not None))
+    return scheduler
@@ -0,0 +1,256 @@
+import argparse
+import glob
+import logging
+import os
+import shutil
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from data_extractors import EXTRA_TABLE_EXTRACTORS
+from data_processor import configure_processed_ledger, export_store_to_csv, get_processed_ledger, save_to_store
+from log_utils import get_logger, log_event, setup_logging
+from metrics import start_from_env
+from pipeline import PlayerPipeline
+from processed_ledger import ProcessedLedger
+from range_lease import LeaseLostError, LeaseManager, active_leases, default_worker_id
+from status_index import StatusIndex
+from storage_engine import StorageEngine
+
+logger = get_logger('shard')
+
+class _ShardProgress:
+    """순서대로 투입한 ID 중 아직 결과가 오지 않은 가장 앞 ID를 추적 (임대의 진행 위치로 기록)
+
+    동시 요청으로 결과가 순서 없이 도착해도, 이 위치 앞의 ID는 모두 처리가 끝났음을 보장함.
+    """
+
+    def __init__(self, next_id):
+        self._next_id = next_id
+        self._pending = deque()
+        self._done = set()
+        self._lock = threading.Lock()
+
+    def issue(self, player_ids):
+        for player_id in player_ids:
+            with self._lock:
+                self._pending.append(player_id)
+                self._next_id = self._pending[0]
+            yield player_id
+
+    def complete(self, player_id):
+        with self._lock:
+            self._done.add(player_id)
+            while self._pending and self._pending[0] in self._done:
+                finished = self._pending.popleft()
+                self._done.discard(finished)
+                self._next_id = self._pending[0] if self._pending else finished + 1
+
+    def next_id(self):
+        with self._lock:
+            return self._next_id
+
+def _worker_base(lease_dir, worker_id):
+    return os.path.join(lease_dir, f"worker-{worker_id}")
+
+def run_shard_worker(start_id, end_id, lease_dir, worker_id=None, shard_size=1000, ttl=300.0, concurrency=1,
+                     requests_per_second=2.0, batch_size=10, known_index_dir='processed_player_ids.index'):
+    """구간을 하나씩 임대해 탐색하는 작업자 (임대할 구간이 없으면 종료)
+
+    처리 결과와 수집 데이터는 lease_dir 안의 작업자 전용 장부/저장소에 기록하고 merge_shard_results로 합침.
+    이전 실행에서 처리한 ID는 주 장부의 인덱스(known_index_dir)를 읽기 전용으로 참조해 건너뜀.
+    """
+    worker_id = worker_id or default_worker_id()
+    worker_base = _worker_base(lease_dir, worker_id)
+    configure_processed_ledger(f"{worker_base}_processed.csv")
+    known = StatusIndex(known_index_dir, readonly=True) if known_index_dir and os.path.isdir(known_index_dir) else StatusIndex()
+    manager = LeaseManager(lease_dir, start_id, end_id, shard_size=shard_size, ttl=ttl, worker_id=worker_id)
+
+    totals = {'shards': 0, 'checked': 0, 'valid': 0, 'invalid': 0, 'errors': 0, 'interrupted': False}
+    try:
+        while True:
+            lease = manager.acquire()
+            if lease is None:
+                break
+
+            progress = _ShardProgress(lease.next_id)
+            # 구간마다 CSV로 내보내지 않고 병합할 때 한 번만 내보냄
+            pipeline = PlayerPipeline(
+                base_filename=worker_base,
+                fetch_workers=concurrency,
+                batch_size=batch_size,
+                record_status=True,
+                requests_per_second=requests_per_second,
+                export_csv=False,
+            )
+            with manager.hold(lease, progress.next_id, on_lost=pipeline.stop):
+                summary = pipeline.run(
+                    progress.issue(known.iter_unexplored(lease.next_id, lease.end_id)),
+                    on_result=lambda item: progress.complete(item['player_id']),
+                )
+
+            for key in ('checked', 'valid', 'invalid', 'errors'):
+                totals[key] += summary[key]
+
+            if summary['interrupted']:
+                manager.release(lease, progress.next_id())
+                totals['interrupted'] = True
+                break
+            if lease.lost:
+                # 임대가 만료되어 다른 작업자가 이어받은 구간은 완료로 표시하지 않음
+                continue
+
+            try:
+                manager.complete(lease, {key: summary[key] for key in ('checked', 'valid', 'invalid', 'errors')})
+                totals['shards'] += 1
+            except LeaseLostError as e:
+                logger.warning("%s", e)
+    finally:
+        get_processed_ledger().flush()
+        known.close()
+
+    log_event(logger, logging.INFO, 'shard_worker_finished',
+              "작업자 %s 종료 - 구간 %d개, 검사 %d개, 유효 %d개, 무효 %d개, 오류 %d개",
+              worker_id, totals['shards'], totals['checked'], totals['valid'], totals['invalid'], totals['errors'],
+              worker_id=worker_id, **totals)
+    return totals
+
+def merge_shard_results(base_filename='football_players_data', lease_dir=None, force=False):
+    """작업자 전용 장부와 저장소를 주 장부(processed_player_ids.csv)와 저장소로 합친 뒤 CSV로 내보내기
+
+    아직 유효한 임대가 남아 있으면 (작업자가 실행 중) force=True가 아닌 한 합치지 않음.
+    """
+    lease_dir = lease_dir or f"{base_filename}_shards"
+    active = active_leases(lease_dir)
+    if active and not force:
+        logger.warning("아직 실행 중인 작업자가 있어 병합하지 않습니다 (임대 %d개: %s)", len(active), ', '.join(active[:5]))
+        return False
+
+    ledger = get_processed_ledger()
+    merged_ids = 0
+    for journal_path in sorted(glob.glob(os.path.join(lease_dir, 'worker-*_processed.journal'))):
+        snapshot_path = journal_path[:-len('.journal')] + '.csv'
+        worker_ledger = ProcessedLedger(snapshot_path)
+        try:
+            for player_id, status, timestamp in worker_ledger.records():
+                ledger.record(player_id, status, timestamp)
+                merged_ids += 1
+        finally:
+            worker_ledger.close()
+        base = snapshot_path[:-len('.csv')]
+        for path in (snapshot_path, journal_path, f"{base}.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(worker_ledger.index_dir, ignore_errors=True)
+    ledger.flush()
+
+    merged_workers = 0
+    for store_root in sorted(glob.glob(os.path.join(lease_dir, 'worker-*_store'))):
+        worker_base = store_root[:-len('_store')]
+        engine = StorageEngine(worker_base, background_compaction=False, import_csv=False)
+        tables = [engine.read_table(table) for table in ('players', 'matches', 'stats')]
+        extra_dfs = {table: [engine.read_table(table)] for table in EXTRA_TABLE_EXTRACTORS}
+        if not save_to_store([tables[0]], [tables[1]], [tables[2]], base_filename, extra_dfs):
+            logger.error("'%s' 병합 실패, 작업자 저장소를 남겨 둡니다", store_root)
+            continue
+        shutil.rmtree(store_root)
+        merged_workers += 1
+
+    export_store_to_csv(base_filename)
+    log_event(logger, logging.INFO, 'shards_merged', "작업자 %d명의 결과와 처리 기록 %d개를 병합했습니다",
+              merged_workers, merged_ids, workers=merged_workers, records=merged_ids)
+    return True
+
+def explore_player_ids_sharded(start_id, end_id, workers=4, batch_size=10, concurrency=1, requests_per_second=2.0,
+                               base_filename='football_players_data', lease_dir=None, shard_size=1000, ttl=300.0):
+    """ID 범위를 구간으로 나눠 여러 작업 프로세스가 임대하며 탐색한 뒤 결과를 병합
+
+    requests_per_second는 전체 기준이며 작업 프로세스 수로 나눠 각 프로세스에 배정함.
+    다른 머신에서도 같은 lease_dir로 `python sharded_explorer.py worker ...`를 실행하면 함께 탐색함.
+    """
+    lease_dir = lease_dir or f"{base_filename}_shards"
+    # 작업 프로세스가 읽을 주 장부 인덱스를 최신 상태로 맞춤
+    ledger = get_processed_ledger()
+    ledger.refresh()
+    ledger.flush()
+
+    per_worker_rps = requests_per_second / workers if requests_per_second else requests_per_second
+    logger.info("ID %s~%s를 %d개 구간 단위로 작업 프로세스 %d개가 탐색합니다 (임대 디렉터리: %s, 프로세스당 초당 최대 요청 수: %s)",
+                start_id, end_id, shard_size, workers, lease_dir, per_worker_rps or '기본 속도에서 자동 조절')
+
+    totals = {'shards': 0, 'checked': 0, 'valid': 0, 'invalid': 0, 'errors': 0, 'interrupted': False}
+    prefix = default_worker_id()
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_shard_worker, start_id, end_id, lease_dir, f"{prefix}-{i}", shard_size, ttl,
+                                concurrency, per_worker_rps, batch_size, ledger.index_dir)
+                for i in range(workers)
+            ]
+            for future in futures:
+                result = future.result()
+                for key in ('shards', 'checked', 'valid', 'invalid', 'errors'):
+                    totals[key] += result[key]
+                totals['interrupted'] = totals['interrupted'] or result['interrupted']
+    except KeyboardInterrupt:
+        # 작업 프로세스는 각자 임대를 진행 위치와 함께 돌려놓고 종료함
+        logger.warning("프로그램이 사용자에 의해 중단되었습니다. 지금까지의 결과를 병합합니다...")
+        totals['interrupted'] = True
+
+    merge_shard_results(base_filename, lease_dir, force=totals['interrupted'])
+    status = LeaseManager(lease_dir, start_id, end_id, shard_size=shard_size).status()
+    remaining = sum(status.values()) - status['done']
+
+    log_event(logger, logging.INFO, 'exploration_finished',
+              "Sharded exploration %s for ID range %s to %s - 이번 실행에서 구간 %d개 완료 (남은 구간 %d개), "
+              "검사 %d개, 유효 %d개, 무효 %d개, 오류 %d개",
+              'interrupted' if totals['interrupted'] else 'completed', start_id, end_id, totals['shards'], remaining,
+              totals['checked'], totals['valid'], totals['invalid'], totals['errors'],
+              start_id=start_id, end_id=end_id, remaining_shards=remaining, **totals)
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description='임대 파일로 ID 범위를 나눠 여러 프로세스/머신에서 탐색')
+    parser.add_argument('command', choices=['run', 'worker', 'merge', 'status'],
+                        help='run: 이 머신에서 작업 프로세스 여러 개 실행 후 병합, worker: 작업자 하나 실행, '
+                             'merge: 작업자 결과 병합, status: 구간 진행 상황')
+    parser.add_argument('--start-id', type=int)
+    parser.add_argument('--end-id', type=int)
+    parser.add_argument('--base-filename', default='football_players_data')
+    parser.add_argument('--lease-dir', help='임대 디렉터리 (기본: <base-filename>_shards)')
+    parser.add_argument('--shard-size', type=int, default=1000)
+    parser.add_argument('--ttl', type=float, default=300.0, help='임대 만료 시간(초)')
+    parser.add_argument('--workers', type=int, default=4, help='run에서 실행할 작업 프로세스 수')
+    parser.add_argument('--worker-id', help='worker의 작업자 ID (기본: 호스트 이름-PID)')
+    parser.add_argument('--concurrency', type=int, default=1, help='작업자당 동시 요청 수')
+    parser.add_argument('--rps', type=float, default=2.0, help='초당 최대 요청 수 (run은 전체, worker는 작업자 하나 기준)')
+    parser.add_argument('--batch-size', type=int, default=10)
+    parser.add_argument('--known-index', default='processed_player_ids.index', help='건너뛸 ID를 읽을 주 장부 인덱스')
+    parser.add_argument('--force', action='store_true', help='merge: 실행 중인 임대가 있어도 병합')
+    parser.add_argument('--log-level', help='로그 레벨 (기본: KICKSTATS_LOG_LEVEL 또는 INFO)')
+    parser.add_argument('--log-json', help='JSON-lines 로그 파일 경로')
+    args = parser.parse_args()
+
+    setup_logging(args.log_level, args.log_json)
+    lease_dir = args.lease_dir or f"{args.base_filename}_shards"
+
+    if args.command != 'merge' and (args.start_id is None or args.end_id is None):
+        parser.error(f"{args.command}에는 --start-id와 --end-id가 필요합니다")
+
+    if args.command == 'run':
+        explore_player_ids_sharded(args.start_id, args.end_id, args.workers, args.batch_size, args.concurrency, args.rps,
+                                   args.base_filename, lease_dir, args.shard_size, args.ttl)
+    elif args.command == 'worker':
+        # 작업자마다 지표를 따로 노출 (같은 머신의 작업자끼리는 KICKSTATS_METRICS_PORT/FILE을 다르게 지정)
+        start_from_env()
+        run_shard_worker(args.start_id, args.end_id, lease_dir, args.worker_id, args.shard_size, args.ttl,
+                         args.concurrency, args.rps, args.batch_size, args.known_index)
+    elif args.command == 'merge':
+        merge_shard_results(args.base_filename, lease_dir, args.force)
+    else:
+        status = LeaseManager(lease_dir, args.start_id, args.end_id, shard_size=args.shard_size).status()
+        print(f"구간 {sum(status.values())}개: 완료 {status['done']}, 진행 중 {status['leased']}, "
+              f"만료 {status['expired']}, 대기 {status['pending']}")
+
+if __name__ == "__main__":
+    main()
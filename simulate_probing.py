@@ -0,0 +1,107 @@
+import argparse
+import random
+
+from adaptive_probe import AdaptiveProber
+from processed_ledger import ProcessedLedger
+
+def load_truth_from_ledger(snapshot_path):
+    """처리 장부에서 ID -> 유효 여부 (장부에 없는 범위 안의 ID는 무효로 간주)"""
+    ledger = ProcessedLedger(snapshot_path)
+    try:
+        truth = {player_id: status.startswith('valid') for player_id, status in ledger.statuses.items()}
+    finally:
+        ledger.close()
+    return truth
+
+def synthetic_truth(start_id, count, clusters, cluster_size, cluster_density, background_density, seed):
+    """유효 ID가 몇몇 구간에 몰려 있는 가상의 ID 공간 생성"""
+    rng = random.Random(seed)
+    truth = {}
+    for _ in range(clusters):
+        center = rng.randrange(start_id, start_id + count)
+        for player_id in range(center, min(start_id + count, center + cluster_size)):
+            if rng.random() < cluster_density:
+                truth[player_id] = True
+    for player_id in range(start_id, start_id + count):
+        if player_id not in truth and rng.random() < background_density:
+            truth[player_id] = True
+    return truth
+
+def simulate(truth, start_id, end_id, **prober_options):
+    """장부 없이 시작해 응답을 truth로 대신하면서 AdaptiveProber를 실행
+
+    반환: (요청한 ID 수, 찾은 유효 ID 수, 유효 ID를 찾은 시점의 요청 수 목록, 단계별 요청 수)
+    """
+    prober = AdaptiveProber(start_id, end_id, statuses={}, **prober_options)
+    requests = 0
+    found = 0
+    found_at = []
+    for player_id in prober.iter_ids():
+        requests += 1
+        valid = truth.get(player_id, False)
+        if valid:
+            found += 1
+            found_at.append(requests)
+        prober.record(player_id, valid)
+    return requests, found, found_at, dict(prober.counts)
+
+def _requests_to_reach(found_at, total_valid, ratio):
+    needed = int(total_valid * ratio + 0.999999)
+    if needed == 0:
+        return 0
+    if len(found_at) < needed:
+        return None
+    return found_at[needed - 1]
+
+def main():
+    parser = argparse.ArgumentParser(description='처리 장부(또는 가상 ID 공간)를 재생해 적응형 탐색의 요청 절감량 측정')
+    parser.add_argument('--ledger', default='processed_player_ids.csv', help='재생할 처리 장부 스냅샷 경로')
+    parser.add_argument('--synthetic', action='store_true', help='장부 대신 가상의 희소 ID 공간 사용')
+    parser.add_argument('--start-id', type=int, default=1_000_000)
+    parser.add_argument('--count', type=int, default=200_000, help='가상 ID 공간 크기')
+    parser.add_argument('--clusters', type=int, default=40)
+    parser.add_argument('--cluster-size', type=int, default=300)
+    parser.add_argument('--cluster-density', type=float, default=0.6)
+    parser.add_argument('--background-density', type=float, default=0.002)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--bucket-size', type=int, default=1000)
+    parser.add_argument('--max-stride', type=int, default=32)
+    parser.add_argument('--stride-factor', type=float, default=0.5)
+    parser.add_argument('--neighborhood', type=int, default=5)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        start_id, end_id = args.start_id, args.start_id + args.count - 1
+        truth = synthetic_truth(start_id, args.count, args.clusters, args.cluster_size,
+                                args.cluster_density, args.background_density, args.seed)
+        source = f"가상 ID 공간 (군집 {args.clusters}개)"
+    else:
+        truth = load_truth_from_ledger(args.ledger)
+        if not truth:
+            print(f"'{args.ledger}'에 기록이 없습니다. --synthetic으로 가상 ID 공간을 사용하세요.")
+            return
+        start_id, end_id = min(truth), max(truth)
+        source = f"처리 장부 '{args.ledger}'"
+
+    total_ids = end_id - start_id + 1
+    total_valid = sum(1 for player_id, valid in truth.items() if valid and start_id <= player_id <= end_id)
+    options = dict(bucket_size=args.bucket_size, max_stride=args.max_stride,
+                   stride_factor=args.stride_factor, neighborhood=args.neighborhood)
+
+    requests, found, found_at, counts = simulate(truth, start_id, end_id, **options)
+
+    print(f"{source}: ID {start_id}~{end_id} ({total_ids}개), 유효 ID {total_valid}개")
+    print(f"전체 순차 탐색: 요청 {total_ids}회")
+    print(f"적응형 탐색:   요청 {requests}회 (본 탐색 {counts['sweep']}, 주변 확인 {counts['neighbor']}), "
+          f"유효 ID {found}/{total_valid}개 발견 ({found / total_valid * 100 if total_valid else 100:.1f}%)")
+    print(f"요청 절감: {(1 - requests / total_ids) * 100:.1f}%, 보충 탐색 대상: {total_ids - requests}개")
+
+    # 보충 탐색까지 이어서 했을 때 유효 ID 비율별로 필요한 요청 수
+    _, _, backfill_found_at, _ = simulate(truth, start_id, end_id, backfill=True, **options)
+    for ratio in (0.5, 0.9, 0.99, 1.0):
+        needed = _requests_to_reach(backfill_found_at, total_valid, ratio)
+        if needed is not None:
+            print(f"유효 ID {ratio * 100:.0f}% 발견까지: 요청 {needed}회 (전체의 {needed / total_ids * 100:.1f}%)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+import sqlite3
+import sys
+import threading
+
+import pandas as pd
+
+# 기본키는 save_to_csv의 중복 제거 기준과 동일
+# (SQLite에서는 NULL이 기본키 충돌로 잡히지 않으므로 season은 빈 문자열로 저장)
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    birth_date TEXT,
+    team TEXT,
+    team_id INTEGER,
+    position TEXT,
+    is_captain INTEGER,
+    country TEXT,
+    height REAL,
+    shirt REAL,
+    age INTEGER,
+    preferred_foot TEXT,
+    market_value REAL
+);
+CREATE TABLE IF NOT EXISTS matches (
+    player_id INTEGER NOT NULL,
+    match_id INTEGER NOT NULL,
+    match_date TEXT,
+    league_id INTEGER,
+    league_name TEXT,
+    team_id INTEGER,
+    team_name TEXT,
+    opponent_team_id INTEGER,
+    opponent_team_name TEXT,
+    is_home INTEGER,
+    home_score INTEGER,
+    away_score INTEGER,
+    minutes_played INTEGER,
+    goals INTEGER,
+    assists INTEGER,
+    yellow_cards INTEGER,
+    red_cards INTEGER,
+    rating REAL,
+    PRIMARY KEY (player_id, match_id)
+);
+CREATE TABLE IF NOT EXISTS stats (
+    player_id INTEGER NOT NULL,
+    league_id INTEGER,
+    league_name TEXT,
+    season TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (player_id, season, title)
+);
+CREATE INDEX IF NOT EXISTS idx_players_team_id ON players (team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_team_id ON matches (team_id);
+CREATE INDEX IF NOT EXISTS idx_matches_league_id ON matches (league_id, match_date);
+CREATE INDEX IF NOT EXISTS idx_matches_match_date ON matches (match_date);
+CREATE INDEX IF NOT EXISTS idx_matches_opponent_team_id ON matches (opponent_team_id);
+CREATE INDEX IF NOT EXISTS idx_stats_league_id ON stats (league_id, season);
+"""
+
+TABLE_COLUMNS = {
+    'players': ['id', 'name', 'birth_date', 'team', 'team_id', 'position', 'is_captain', 'country',
+                'height', 'shirt', 'age', 'preferred_foot', 'market_value'],
+    'matches': ['player_id', 'match_id', 'match_date', 'league_id', 'league_name', 'team_id', 'team_name',
+                'opponent_team_id', 'opponent_team_name', 'is_home', 'home_score', 'away_score',
+                'minutes_played', 'goals', 'assists', 'yellow_cards', 'red_cards', 'rating'],
+    'stats': ['player_id', 'league_id', 'league_name', 'season', 'title', 'value'],
+}
+
+TABLE_KEYS = {
+    'players': ['id'],
+    'matches': ['player_id', 'match_id'],
+    'stats': ['player_id', 'season', 'title'],
+}
+
+def _upsert_sql(table):
+    columns = TABLE_COLUMNS[table]
+    keys = TABLE_KEYS[table]
+    updates = ', '.join(f"{col} = excluded.{col}" for col in columns if col not in keys)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}")
+
+def _to_bool_int(value):
+    if value in (True, 'True', 'true', 1):
+        return 1
+    if value in (False, 'False', 'false', 0):
+        return 0
+    return None
+
+def _rows(table, df):
+    """데이터프레임을 sqlite3에 바인딩할 수 있는 파이썬 값 튜플 목록으로 변환"""
+    df = df.reindex(columns=TABLE_COLUMNS[table])
+    if table == 'matches':
+        df['is_home'] = df['is_home'].map(_to_bool_int)
+        df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+        df = df[df['player_id'].notna() & df['match_id'].notna()]
+    elif table == 'players':
+        df['is_captain'] = df['is_captain'].map(_to_bool_int)
+        df = df[df['id'].notna()]
+    elif table == 'stats':
+        df['season'] = df['season'].fillna('')
+        df = df[df['player_id'].notna() & df['title'].notna()]
+
+    # numpy 타입과 NaN을 파이썬 값과 None으로 변환
+    df = df.astype(object).where(df.notna(), None)
+    return [tuple(row) for row in df.itertuples(index=False, name=None)]
+
+class SQLiteStore:
+    """선수/경기/통계 데이터를 인덱스가 있는 SQLite 파일에 저장하는 백엔드"""
+
+    def __init__(self, db_path='football_players_data.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        # WAL 모드: 쓰는 동안에도 대시보드/분석 쪽에서 읽기 가능
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+
+    def upsert(self, table, df):
+        """배치 하나를 하나의 트랜잭션으로 upsert"""
+        if df is None or df.empty:
+            return 0
+        rows = _rows(table, df)
+        with self._lock, self.conn:
+            self.conn.executemany(_upsert_sql(table), rows)
+        return len(rows)
+
+    def save(self, player_dfs=None, matches_dfs=None, stats_dfs=None):
+        """save_to_csv와 같은 입력을 받아 세 테이블을 한 트랜잭션으로 upsert"""
+        batches = []
+        for table, dfs in (('players', player_dfs), ('matches', matches_dfs), ('stats', stats_dfs)):
+            dfs = [df for df in (dfs or []) if df is not None and not df.empty]
+            if dfs:
+                batches.append((table, _rows(table, pd.concat(dfs, ignore_index=True))))
+
+        counts = {}
+        with self._lock, self.conn:
+            for table, rows in batches:
+                self.conn.executemany(_upsert_sql(table), rows)
+                counts[table] = len(rows)
+        return counts
+
+    def query(self, sql, params=()):
+        """임의의 조회 결과를 데이터프레임으로 반환"""
+        with self._lock:
+            return pd.read_sql_query(sql, self.conn, params=params)
+
+    def get_player(self, player_id):
+        return self.query("SELECT * FROM players WHERE id = ?", (player_id,))
+
+    def get_player_matches(self, player_id):
+        return self.query("SELECT * FROM matches WHERE player_id = ? ORDER BY match_date DESC", (player_id,))
+
+    def get_player_stats(self, player_id):
+        return self.query("SELECT * FROM stats WHERE player_id = ?", (player_id,))
+
+    def get_team_players(self, team_id):
+        return self.query("SELECT * FROM players WHERE team_id = ?", (team_id,))
+
+    def get_team_matches(self, team_id, since=None):
+        """팀이 뛴 경기 (상대 팀으로 나온 경기 포함)"""
+        sql = "SELECT * FROM matches WHERE (team_id = ? OR opponent_team_id = ?)"
+        params = [team_id, team_id]
+        if since:
+            sql += " AND match_date >= ?"
+            params.append(since)
+        return self.query(sql + " ORDER BY match_date DESC", params)
+
+    def get_league_matches(self, league_id, since=None):
+        sql = "SELECT * FROM matches WHERE league_id = ?"
+        params = [league_id]
+        if since:
+            sql += " AND match_date >= ?"
+            params.append(since)
+        return self.query(sql + " ORDER BY match_date DESC", params)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+if __name__ == "__main__":
+    # 기존 CSV 파일을 SQLite로 가져오기
+    base_filename = sys.argv[1] if len(sys.argv) > 1 else 'football_players_data'
+    store = SQLiteStore(f"{base_filename}.db")
+    for table in ('players', 'matches', 'stats'):
+        try:
+            count = store.upsert(table, pd.read_csv(f"{base_filename}_{table}.csv"))
+            print(f"{table}: {count}개 행을 '{store.db_path}'에 저장했습니다.")
+        except FileNotFoundError:
+            print(f"{base_filename}_{table}.csv 파일이 없어 건너뜁니다.")
+    store.close()
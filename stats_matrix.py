@@ -0,0 +1,251 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from log_utils import get_logger
+from storage_engine import normalize_key_value
+
+logger = get_logger('matrix')
+
+MINUTES_TITLE = 'Minutes played'
+# 출전 시간으로 나누면 의미가 없는 항목 (비율, 평점, 출전 수 자체)
+NON_COUNT_TITLES = ('Minutes played', 'Rating', 'Matches', 'Started')
+
+# 파일 형식이 바뀌면 올려서 예전 파일을 다시 만들게 함 (2: 시즌 값 정규화)
+_MATRIX_FORMAT = 2
+_MISSING_ID = -1
+_MISSING_TEXT = ''
+
+class StatTitles:
+    """통계 항목 이름 -> 컬럼 번호 (한 번 붙인 번호는 바뀌지 않음)"""
+
+    def __init__(self, titles=()):
+        self.names = []
+        self._ids = {}
+        for title in titles:
+            self.intern(title)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, title):
+        return title in self._ids
+
+    def intern(self, title):
+        """항목 번호 반환 (처음 보는 항목이면 새 번호를 붙임)"""
+        column = self._ids.get(title)
+        if column is None:
+            column = self._ids[title] = len(self.names)
+            self.names.append(title)
+        return column
+
+    def get(self, title):
+        return self._ids.get(title)
+
+class StatsMatrix:
+    """(선수, 시즌) 행 x 통계 항목 컬럼의 float 행렬
+
+    긴 형식의 통계 행(player_id, league_id, league_name, season, title, value)을 저장할 때 바로 넓은 형식으로 옮겨 둠.
+    - values: 값 행렬 (숫자가 아니거나 없는 값은 NaN)
+    - present: 저장소에 행이 있는 칸 (값이 숫자가 아니어도 True. 저장소 통계 행 수와 비교하는 데 사용)
+    - 같은 (선수, 시즌, 항목)이 다시 들어오면 나중 값으로 덮어씀 (저장 엔진과 같은 last-writer-wins)
+    행과 컬럼은 용량을 두 배씩 늘려 배치마다 행렬 전체를 다시 만들지 않음.
+    """
+
+    def __init__(self, titles=None):
+        self.titles = StatTitles(titles or ())
+        self._rows = {}
+        self._lock = threading.RLock()
+        self._size = 0
+        self._allocate(16, max(16, len(self.titles)))
+
+    def _allocate(self, row_capacity, column_capacity):
+        """행렬 용량을 늘림 (기존 값은 그대로 복사)"""
+        values = np.full((row_capacity, column_capacity), np.nan)
+        present = np.zeros((row_capacity, column_capacity), dtype=bool)
+        player_ids = np.full(row_capacity, _MISSING_ID, dtype=np.int64)
+        league_ids = np.full(row_capacity, _MISSING_ID, dtype=np.int64)
+        seasons = np.full(row_capacity, _MISSING_TEXT, dtype=object)
+        league_names = np.full(row_capacity, _MISSING_TEXT, dtype=object)
+
+        if hasattr(self, '_values'):
+            rows, columns = self._values.shape
+            values[:rows, :columns] = self._values
+            present[:rows, :columns] = self._present
+            player_ids[:rows] = self._player_ids
+            league_ids[:rows] = self._league_ids
+            seasons[:rows] = self._seasons
+            league_names[:rows] = self._league_names
+
+        self._values, self._present = values, present
+        self._player_ids, self._league_ids = player_ids, league_ids
+        self._seasons, self._league_names = seasons, league_names
+
+    def _ensure_capacity(self, rows, columns):
+        row_capacity, column_capacity = self._values.shape
+        if rows <= row_capacity and columns <= column_capacity:
+            return
+        while row_capacity < rows:
+            row_capacity *= 2
+        while column_capacity < columns:
+            column_capacity *= 2
+        self._allocate(row_capacity, column_capacity)
+
+    def __len__(self):
+        return self._size
+
+    def cell_count(self):
+        """값이 들어 있는 칸 수 (저장소의 통계 행 수와 같아야 함)"""
+        with self._lock:
+            return int(self._present[:self._size].sum())
+
+    def apply(self, df):
+        """긴 형식의 통계 데이터프레임을 행렬에 반영하고 반영한 행 수 반환"""
+        if df is None or df.empty:
+            return 0
+
+        player_ids = pd.to_numeric(df['player_id'], errors='coerce').fillna(_MISSING_ID).to_numpy(np.int64)
+        # 시즌은 저장 엔진의 키와 같은 방식으로 정규화 (CSV에서 읽은 2023.0과 새로 추출한 2023이 같은 행이 되도록)
+        season_codes, unique_seasons = pd.factorize(df['season'].map(normalize_key_value))
+        title_codes, unique_titles = pd.factorize(df['title'].astype(object).where(df['title'].notna(), _MISSING_TEXT))
+        # (선수, 시즌)을 정수 하나로 합쳐 factorize (MultiIndex보다 훨씬 빠름)
+        pair_codes, unique_pairs = pd.factorize(player_ids * len(unique_seasons) + season_codes)
+
+        # 같은 (선수, 시즌, 항목)이 배치 안에 여러 번 있으면 마지막 행만 사용
+        cells = pair_codes.astype(np.int64) * len(unique_titles) + title_codes
+        _, last_from_end = np.unique(cells[::-1], return_index=True)
+        keep = np.sort(len(cells) - 1 - last_from_end)
+        values = pd.to_numeric(df['value'], errors='coerce').to_numpy(np.float64)[keep]
+        league_ids = pd.to_numeric(df['league_id'], errors='coerce').fillna(_MISSING_ID).to_numpy(np.int64)[keep]
+        league_names = df['league_name'].astype(object).where(df['league_name'].notna(), _MISSING_TEXT).to_numpy()[keep]
+
+        with self._lock:
+            # 항목 이름과 (선수, 시즌)은 고유값마다 한 번씩만 사전을 조회하고 배열로 펼침
+            title_columns = np.array([self.titles.intern(str(title)) for title in unique_titles], dtype=np.int64)
+
+            pair_rows = np.empty(len(unique_pairs), dtype=np.int64)
+            new_pairs = []
+            for i, (player_id, season_code) in enumerate(zip(*np.divmod(unique_pairs, len(unique_seasons)))):
+                key = (int(player_id), unique_seasons[season_code])
+                row = self._rows.get(key)
+                if row is None:
+                    row = self._rows[key] = self._size + len(new_pairs)
+                    new_pairs.append(key)
+                pair_rows[i] = row
+
+            self._ensure_capacity(self._size + len(new_pairs), len(self.titles))
+            if new_pairs:
+                start = self._size
+                self._player_ids[start:start + len(new_pairs)] = [player_id for player_id, _ in new_pairs]
+                self._seasons[start:start + len(new_pairs)] = [season for _, season in new_pairs]
+                self._size += len(new_pairs)
+
+            rows = pair_rows[pair_codes[keep]]
+            columns = title_columns[title_codes[keep]]
+            self._values[rows, columns] = values
+            self._present[rows, columns] = True
+            # 리그는 (선수, 시즌)마다 하나 (mainLeague)
+            self._league_ids[rows] = league_ids
+            self._league_names[rows] = league_names
+        return len(keep)
+
+    def column(self, title):
+        """항목 하나의 값 배열 (행 순서, 없는 항목이면 NaN 배열)"""
+        with self._lock:
+            column = self.titles.get(title)
+            if column is None:
+                return np.full(self._size, np.nan)
+            return self._values[:self._size, column].copy()
+
+    def per90(self, titles=None, min_minutes=0.0):
+        """항목별 90분당 값 행렬 (행 순서, 컬럼은 titles 순서)
+
+        titles가 없으면 NON_COUNT_TITLES를 뺀 모든 항목. 출전 시간이 없거나 min_minutes 미만인 행은 NaN.
+        """
+        with self._lock:
+            titles = list(titles) if titles is not None else [
+                title for title in self.titles.names if title not in NON_COUNT_TITLES]
+            minutes = self.column(MINUTES_TITLE)
+            values = np.column_stack([self.column(title) for title in titles]) if titles else np.empty((self._size, 0))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rates = values * (90.0 / minutes)[:, None]
+        rates[~(minutes > max(min_minutes, 0.0))] = np.nan
+        return titles, rates
+
+    def _keys_frame(self):
+        frame = pd.DataFrame({
+            'player_id': self._player_ids[:self._size],
+            'league_id': self._league_ids[:self._size],
+            'league_name': self._league_names[:self._size],
+            'season': self._seasons[:self._size],
+        })
+        # 저장할 때 바꾼 빈 값을 다시 None으로
+        frame['league_id'] = frame['league_id'].astype(object).where(frame['league_id'] != _MISSING_ID, None)
+        for column in ('league_name', 'season'):
+            frame[column] = frame[column].where(frame[column] != _MISSING_TEXT, None)
+        return frame
+
+    def to_frame(self, player_id=None, per90=False, min_minutes=0.0):
+        """넓은 형식 데이터프레임 (player_id, league_id, league_name, season + 항목 컬럼)
+
+        per90=True면 '<항목> per 90' 컬럼을 덧붙임. player_id를 주면 그 선수의 행만 반환.
+        """
+        with self._lock:
+            frame = self._keys_frame()
+            titles = list(self.titles.names)
+            values = pd.DataFrame(self._values[:self._size, :len(titles)], columns=titles)
+            parts = [frame, values]
+            if per90:
+                rate_titles, rates = self.per90(min_minutes=min_minutes)
+                parts.append(pd.DataFrame(rates, columns=[f"{title} per 90" for title in rate_titles]))
+
+        wide = pd.concat(parts, axis=1)
+        if player_id is not None:
+            wide = wide[wide['player_id'] == int(player_id)].reset_index(drop=True)
+        return wide
+
+    def save(self, path):
+        """행렬을 npz 파일로 저장 (임시 파일에 쓴 뒤 이름을 바꿈)"""
+        with self._lock:
+            size, columns = self._size, len(self.titles)
+            arrays = {
+                'format': np.array(_MATRIX_FORMAT),
+                'titles': np.array(self.titles.names, dtype=str),
+                'values': self._values[:size, :columns],
+                'present': self._present[:size, :columns],
+                'player_ids': self._player_ids[:size],
+                'league_ids': self._league_ids[:size],
+                'seasons': self._seasons[:size].astype(str),
+                'league_names': self._league_names[:size].astype(str),
+            }
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        """save로 저장한 파일 읽기 (파일이 없거나 형식이 다르면 None)"""
+        try:
+            with np.load(path, allow_pickle=False) as saved:
+                if int(saved['format']) != _MATRIX_FORMAT:
+                    return None
+                arrays = {name: saved[name] for name in saved.files}
+        except (FileNotFoundError, ValueError, KeyError, OSError):
+            return None
+
+        matrix = cls(arrays['titles'].tolist())
+        size, columns = arrays['values'].shape
+        matrix._ensure_capacity(size, columns)
+        matrix._values[:size, :columns] = arrays['values']
+        matrix._present[:size, :columns] = arrays['present']
+        matrix._player_ids[:size] = arrays['player_ids']
+        matrix._league_ids[:size] = arrays['league_ids']
+        matrix._seasons[:size] = arrays['seasons'].astype(object)
+        matrix._league_names[:size] = arrays['league_names'].astype(object)
+        matrix._size = size
+        matrix._rows = {key: row for row, key in enumerate(zip(arrays['player_ids'].tolist(), arrays['seasons'].tolist()))}
+        return matrix
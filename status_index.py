@@ -0,0 +1,325 @@
+import json
+import mmap
+import os
+import threading
+
+import numpy as np
+
+# 처리 장부에 기록되는 결과 (결과마다 비트맵 하나, 한 ID는 최대 한 비트맵에만 있음)
+STATUSES = ('valid_processed', 'valid_error', 'invalid', 'processing_error')
+VALID_STATUSES = ('valid_processed', 'valid_error')
+
+# 비트맵 파일은 이 크기 단위로 늘어남 (64KB = ID 524,288개)
+CHUNK_BYTES = 64 * 1024
+CHUNK_IDS = CHUNK_BYTES * 8
+
+# 바이트 값별 1인 비트 수
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+
+class StatusBitmap:
+    """ID 하나당 1비트를 쓰는 크기 가변 비트맵 (path가 있으면 파일을 메모리 매핑, 없으면 메모리에만 둠)
+
+    읽기는 잠금 없이 하고 쓰기와 크기 변경만 잠금 안에서 수행함.
+    크기를 늘릴 때 이전 매핑은 닫지 않고 교체만 하므로 동시에 읽던 스레드도 안전함.
+    파일은 다른 프로세스도 매핑하고 있을 수 있으므로 줄이지 않음.
+    readonly=True이면 파일을 읽기 전용으로 매핑함 (파일이 없으면 빈 비트맵).
+    """
+
+    def __init__(self, path=None, readonly=False):
+        self.path = path
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._fd = None
+        if path is None or (readonly and not os.path.exists(path)):
+            self._mm = mmap.mmap(-1, CHUNK_BYTES)
+        elif readonly:
+            self._fd = os.open(path, os.O_RDONLY)
+            self._mm = self._map(os.fstat(self._fd).st_size)
+        else:
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            size = os.fstat(self._fd).st_size
+            if size < CHUNK_BYTES:
+                os.ftruncate(self._fd, CHUNK_BYTES)
+                size = CHUNK_BYTES
+            self._mm = mmap.mmap(self._fd, size)
+
+    def _grow(self, min_bytes):
+        size = (min_bytes + CHUNK_BYTES - 1) // CHUNK_BYTES * CHUNK_BYTES
+        if self._fd is None:
+            grown = mmap.mmap(-1, size)
+            grown[:len(self._mm)] = self._mm[:]
+        else:
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            grown = mmap.mmap(self._fd, max(size, os.fstat(self._fd).st_size))
+        self._mm = grown
+
+    def _map(self, size):
+        if self.readonly:
+            return mmap.mmap(self._fd, size, access=mmap.ACCESS_READ) if size else mmap.mmap(-1, CHUNK_BYTES)
+        return mmap.mmap(self._fd, size)
+
+    def refresh(self):
+        """다른 프로세스가 파일을 늘렸으면 다시 매핑"""
+        if self._fd is not None:
+            with self._lock:
+                size = os.fstat(self._fd).st_size
+                if size > len(self._mm):
+                    self._mm = self._map(size)
+
+    def __contains__(self, player_id):
+        mm = self._mm
+        index = player_id >> 3
+        return 0 <= index < len(mm) and (mm[index] >> (player_id & 7)) & 1 == 1
+
+    def add(self, player_id):
+        index = player_id >> 3
+        with self._lock:
+            if index >= len(self._mm):
+                self._grow(index + 1)
+            self._mm[index] |= 1 << (player_id & 7)
+
+    def discard(self, player_id):
+        index = player_id >> 3
+        with self._lock:
+            if index < len(self._mm):
+                self._mm[index] &= ~(1 << (player_id & 7)) & 0xFF
+
+    def clear(self):
+        with self._lock:
+            self._mm[:] = bytes(len(self._mm))
+
+    def view(self):
+        """비트맵 전체를 복사 없이 numpy 배열로 반환 (바이트 i의 비트 j = ID i*8+j)"""
+        return np.frombuffer(self._mm, dtype=np.uint8)
+
+    def flush(self):
+        if self._fd is not None:
+            self._mm.flush()
+
+    def close(self):
+        try:
+            self._mm.close()
+        except BufferError:
+            # 아직 numpy 배열이 참조 중이면 가비지 컬렉션 때 닫힘
+            pass
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+class StatusIndex:
+    """처리 결과별 비트맵으로 만든 ID -> 결과 인덱스
+
+    ID 1,000만 개도 결과마다 약 1.2MB라서 사전보다 훨씬 작고, 디렉터리를 주면 파일을 메모리 매핑하므로
+    시작할 때 전체를 읽지 않아도 됨. 조회(in, get, [])는 O(1)이고
+    next_unexplored/iter_unexplored/count_range 같은 범위 조회는 numpy로 바이트 단위로 훑음.
+    사전과 같은 방식(in, get, items, len)으로도 쓸 수 있음.
+    readonly=True이면 다른 프로세스가 관리하는 인덱스를 읽기만 함 (기록하면 TypeError).
+    """
+
+    META_FILENAME = 'meta.json'
+
+    def __init__(self, directory=None, readonly=False):
+        self.directory = directory
+        if directory is not None and not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self._bitmaps = {
+            status: StatusBitmap(os.path.join(directory, f"{status}.bits") if directory is not None else None, readonly)
+            for status in STATUSES
+        }
+
+    # 조회
+
+    def get(self, player_id, default=None):
+        for status, bitmap in self._bitmaps.items():
+            if player_id in bitmap:
+                return status
+        return default
+
+    def __getitem__(self, player_id):
+        status = self.get(player_id)
+        if status is None:
+            raise KeyError(player_id)
+        return status
+
+    def __contains__(self, player_id):
+        return any(player_id in bitmap for bitmap in self._bitmaps.values())
+
+    def __len__(self):
+        return sum(self.counts().values())
+
+    def __iter__(self):
+        for player_id, _ in self.items():
+            yield player_id
+
+    def keys(self):
+        return iter(self)
+
+    def counts(self):
+        """결과별 ID 수"""
+        return {status: int(_POPCOUNT[bitmap.view()].sum(dtype=np.int64)) for status, bitmap in self._bitmaps.items()}
+
+    # 기록
+
+    def set(self, player_id, status):
+        """player_id의 결과를 status로 기록 (이전 결과는 지움)"""
+        if status not in self._bitmaps:
+            raise ValueError(f"알 수 없는 처리 결과: {status}")
+        for other, bitmap in self._bitmaps.items():
+            if other != status and player_id in bitmap:
+                bitmap.discard(player_id)
+        self._bitmaps[status].add(player_id)
+
+    def __setitem__(self, player_id, status):
+        self.set(player_id, status)
+
+    def clear(self):
+        for bitmap in self._bitmaps.values():
+            bitmap.clear()
+
+    # 범위 조회
+
+    def _capacity(self):
+        """비트맵에 자리가 있는 ID 수 (이보다 큰 ID는 모두 미탐색)"""
+        return max(len(bitmap.view()) for bitmap in self._bitmaps.values()) * 8
+
+    def _bits(self, start, end, statuses=STATUSES):
+        """start~end(포함) ID마다 statuses 중 하나로 기록되어 있으면 1인 배열"""
+        first_byte, last_byte = start >> 3, (end >> 3) + 1
+        merged = np.zeros(last_byte - first_byte, dtype=np.uint8)
+        for status in statuses:
+            part = self._bitmaps[status].view()[first_byte:last_byte]
+            merged[:len(part)] |= part
+        offset = start - first_byte * 8
+        return np.unpackbits(merged, bitorder='little')[offset:offset + end - start + 1]
+
+    def _chunks(self, start, end):
+        """start~end를 CHUNK_IDS 크기 구간으로 나눔 (한 번에 만드는 배열 크기를 제한)"""
+        while start <= end:
+            chunk_end = min(end, (start // CHUNK_IDS + 1) * CHUNK_IDS - 1)
+            yield start, chunk_end
+            start = chunk_end + 1
+
+    def _find(self, start, end, explored):
+        """start~end에서 처음으로 기록 여부가 explored와 같은 ID (end가 None이면 끝까지, 없으면 None)
+
+        대부분 가까운 곳에서 찾으므로 작은 구간부터 훑고 못 찾으면 구간을 두 배씩 늘림.
+        """
+        start = max(start, 0)
+        capacity = self._capacity()
+        scan_end = capacity - 1 if end is None else min(end, capacity - 1)
+        window = 4096
+        position = start
+        while position <= scan_end:
+            window_end = min(scan_end, position + window - 1)
+            bits = self._bits(position, window_end)
+            found = int(np.argmax(bits) if explored else np.argmin(bits))
+            if bits[found] == explored:
+                return position + found
+            position = window_end + 1
+            window = min(window * 2, CHUNK_IDS)
+        # 비트맵 밖은 모두 미탐색
+        if not explored:
+            candidate = max(start, capacity)
+            if end is None or candidate <= end:
+                return candidate
+        return None
+
+    def next_unexplored(self, after, end=None):
+        """after보다 큰 ID 중 아직 기록이 없는 첫 ID (end까지 없으면 None)"""
+        return self._find(after + 1, end, explored=False)
+
+    def next_explored(self, after, end=None):
+        """after보다 큰 ID 중 기록이 있는 첫 ID (end까지 없으면 None)"""
+        return self._find(after + 1, end, explored=True)
+
+    def iter_unexplored(self, start, end):
+        """start~end에서 기록이 없는 ID를 차례로 반환
+
+        CHUNK_IDS 구간마다 비트맵을 한 번만 훑어 미탐색 ID를 골라내므로 기록된 ID가 많아도 빠름.
+        """
+        start = max(start, 0)
+        capacity = self._capacity()
+        for chunk_start, chunk_end in self._chunks(start, min(end, capacity - 1)):
+            bits = self._bits(chunk_start, chunk_end)
+            for position in np.flatnonzero(bits == 0).tolist():
+                yield chunk_start + position
+        # 비트맵 밖은 모두 미탐색
+        yield from range(max(start, capacity), end + 1)
+
+    def count_range(self, start, end):
+        """start~end에 기록된 결과별 ID 수"""
+        counts = dict.fromkeys(STATUSES, 0)
+        for chunk_start, chunk_end in self._chunks(start, end):
+            for status in STATUSES:
+                counts[status] += int(self._bits(chunk_start, chunk_end, (status,)).sum(dtype=np.int64))
+        return counts
+
+    def ids(self, *statuses):
+        """statuses(생략하면 전체)로 기록된 ID 목록 (오름차순)"""
+        statuses = statuses or STATUSES
+        result = []
+        for chunk_start, chunk_end in self._chunks(0, self._capacity() - 1):
+            bits = self._bits(chunk_start, chunk_end, statuses)
+            result.extend((np.flatnonzero(bits) + chunk_start).tolist())
+        return result
+
+    def items(self):
+        """(ID, 결과)를 ID 오름차순으로 반환"""
+        for chunk_start, chunk_end in self._chunks(0, self._capacity() - 1):
+            codes = np.zeros(chunk_end - chunk_start + 1, dtype=np.uint8)
+            for code, status in enumerate(STATUSES, 1):
+                codes[self._bits(chunk_start, chunk_end, (status,)).astype(bool)] = code
+            for position in np.flatnonzero(codes).tolist():
+                yield chunk_start + position, STATUSES[codes[position] - 1]
+
+    def bucket_counts(self, bucket_size):
+        """bucket_size 구간별 [기록된 ID 수, 유효 ID 수] (AdaptiveProber의 밀도 학습용)"""
+        buckets = {}
+        for chunk_start, chunk_end in self._chunks(0, self._capacity() - 1):
+            for slot, statuses in ((0, STATUSES), (1, VALID_STATUSES)):
+                player_ids = np.flatnonzero(self._bits(chunk_start, chunk_end, statuses)) + chunk_start
+                bucket_ids, counts = np.unique(player_ids // bucket_size, return_counts=True)
+                for bucket, count in zip(bucket_ids.tolist(), counts.tolist()):
+                    buckets.setdefault(bucket, [0, 0])[slot] += count
+        return buckets
+
+    # 파일 관리
+
+    def refresh(self):
+        """다른 프로세스가 늘린 비트맵 파일을 다시 매핑"""
+        for bitmap in self._bitmaps.values():
+            bitmap.refresh()
+
+    def read_meta(self):
+        """인덱스가 어느 장부 상태까지 반영했는지 기록한 메타데이터 (없거나 읽을 수 없으면 None)"""
+        if self.directory is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, self.META_FILENAME), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write_meta(self, meta):
+        """비트맵을 디스크에 반영한 뒤 메타데이터 교체 (None이면 삭제해 인덱스를 무효로 표시)"""
+        if self.directory is None:
+            return
+        meta_path = os.path.join(self.directory, self.META_FILENAME)
+        if meta is None:
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+            return
+        self.flush()
+        temp_path = f"{meta_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temp_path, meta_path)
+
+    def flush(self):
+        for bitmap in self._bitmaps.values():
+            bitmap.flush()
+
+    def close(self):
+        for bitmap in self._bitmaps.values():
+            bitmap.close()
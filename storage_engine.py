@@ -0,0 +1,536 @@
+import glob
+import json
+import math
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from log_utils import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 등 fcntl이 없는 환경에서는 프로세스 간 잠금 없이 동작
+    fcntl = None
+
+logger = get_logger('storage')
+
+# 테이블별 기본키 (save_to_csv의 중복 제거 기준과 동일)
+TABLE_KEYS = {
+    'players': ['id'],
+    'matches': ['player_id', 'match_id'],
+    'stats': ['player_id', 'season', 'title'],
+    # extract_all_tables가 만드는 추가 테이블
+    'career': ['player_id', 'career_type', 'team_id', 'start_date'],
+    'seasons': ['player_id', 'season', 'tournament_id'],
+    'traits': ['player_id', 'key'],
+    # 많은 대회의 league_id가 -1이므로 league_name까지 키에 포함 (같은 시즌 리그/컵 우승이 합쳐지지 않도록)
+    'trophies': ['player_id', 'team_id', 'league_id', 'league_name', 'season', 'result'],
+}
+
+_SEGMENT_PATTERN = re.compile(r'seg_(\d+)\.csv$')
+# 세그먼트 번호를 쓰고 있는 파일 (압축 중인 파일 포함)
+_SEGMENT_FILE_PATTERN = re.compile(r'seg_(\d+)\.csv')
+# 압축 결과를 index.log에 반영하기 전까지 쓰는 파일 (다른 프로세스가 열 때 정리하지 않음)
+_COMPACTING_SUFFIX = '.compacting'
+
+# 내보내기/압축에서 한 번에 읽는 행 수 (테이블 전체를 메모리에 올리지 않음)
+CHUNK_ROWS = 50_000
+
+def normalize_key_value(value):
+    """키 값 정규화 (CSV에서 읽은 값과 새 데이터의 타입 차이를 흡수: 2023, 2023.0, '2023' -> '2023', 빈 값 -> '')"""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if math.isnan(value):
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+def _row_keys(df, key_columns):
+    """데이터프레임 각 행의 기본키 문자열 목록"""
+    columns = [df[col].tolist() if col in df.columns else [None] * len(df) for col in key_columns]
+    return ['\x1f'.join(normalize_key_value(v) for v in values) for values in zip(*columns)]
+
+def atomic_write_csv(df, path):
+    """임시 파일에 쓴 뒤 이름을 바꿔 중간에 중단되어도 파일이 깨지지 않도록 저장"""
+    temp_path = f"{path}.tmp"
+    df.to_csv(temp_path, index=False)
+    os.replace(temp_path, path)
+
+def atomic_write_csv_chunks(frames, path, columns):
+    """데이터프레임 조각을 차례로 이어 써서 CSV 하나로 저장하고 행 수 반환 (atomic_write_csv처럼 임시 파일 사용)
+
+    조각마다 columns 순서로 맞추고 없는 컬럼은 빈 값으로 씀. 한 번에 조각 하나만 메모리에 있음.
+    """
+    temp_path = f"{path}.tmp"
+    rows = 0
+    with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+        header = True
+        for frame in frames:
+            frame.reindex(columns=columns, fill_value='').to_csv(f, index=False, header=header)
+            header = False
+            rows += len(frame)
+        if header:
+            pd.DataFrame(columns=columns).to_csv(f, index=False)
+    os.replace(temp_path, path)
+    return rows
+
+def _segment_columns(paths):
+    """세그먼트 파일들의 컬럼 합집합 (처음 나온 순서, pd.concat과 같음)"""
+    columns = []
+    for path in paths:
+        for column in pd.read_csv(path, nrows=0).columns:
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+def _iter_segment_rows(path, rows, columns=None, chunk_rows=CHUNK_ROWS):
+    """세그먼트 파일에서 rows(오름차순 행 번호)에 해당하는 행만 chunk_rows개씩 읽어 돌려줌
+
+    값은 문자열 그대로 읽어 다시 쓸 때 타입 추론으로 바뀌지 않도록 함 (빈 값은 빈 문자열).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    start = 0
+    with pd.read_csv(path, usecols=columns, dtype=str, keep_default_na=False, chunksize=chunk_rows) as reader:
+        for chunk in reader:
+            end = start + len(chunk)
+            low, high = np.searchsorted(rows, (start, end))
+            if high > low:
+                yield chunk.iloc[rows[low:high] - start]
+            if high == len(rows):
+                break
+            start = end
+
+class StorageEngine:
+    """세그먼트 파일 추가와 기본키 인덱스로 증분 저장하는 엔진
+
+    - upsert: 새 배치를 세그먼트 파일 하나로 추가하고 index.log에 키 위치를 덧붙임 (배치 크기에 비례)
+    - 같은 키가 다시 들어오면 나중에 쓴 행이 우선 (last-writer-wins)
+    - 세그먼트가 많아지면 백그라운드 스레드가 살아있는 행만 모아 하나로 압축
+    - export_csv: 기존 CSV 형식(_players/_matches/_stats/_player_ids)으로 내보내기
+    - 여러 프로세스가 같은 저장소를 써도 되도록 테이블마다 lock 파일을 flock으로 잠근 채 세그먼트 번호 할당,
+      세그먼트/index.log/세대 기록을 하고, 잠근 뒤에는 다른 프로세스가 덧붙인 index.log부터 반영함
+
+    기본키 인덱스(키 -> 세그먼트/행)는 전부 메모리에 두므로 저장된 키 수에 비례해 커짐.
+    키 하나당 약 180바이트로, 선수 1명이 평균 15개 키라 10만 명이면 약 260MB
+    ('python bench_suite.py --only index'로 측정).
+    """
+
+    def __init__(self, base_filename='football_players_data', compact_threshold=16, background_compaction=True,
+                 import_csv=True):
+        self.base_filename = base_filename
+        self.root = f"{base_filename}_store"
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+        self._lock = threading.RLock()
+        self._compaction_threads = {}
+        # 같은 프로세스 안에서 한 테이블을 동시에 압축하지 않도록 (프로세스 간에는 compact.lock 파일)
+        self._compaction_guards = {table: threading.Lock() for table in TABLE_KEYS}
+
+        is_new = not os.path.exists(self.root)
+        self._tables = {}
+        for table in TABLE_KEYS:
+            os.makedirs(self._table_dir(table), exist_ok=True)
+            with self._file_lock(table):
+                self._tables[table] = self._open_table(table)
+
+        # 저장소가 처음 만들어질 때 기존 CSV 파일이 있으면 첫 세그먼트로 가져옴
+        if is_new and import_csv:
+            self._import_existing_csv()
+
+    def _table_dir(self, table):
+        return os.path.join(self.root, table)
+
+    def _segment_path(self, table, seg):
+        return os.path.join(self._table_dir(table), f"seg_{seg:06d}.csv")
+
+    def _index_path(self, table):
+        return os.path.join(self._table_dir(table), 'index.log')
+
+    def _generation_path(self, table):
+        return os.path.join(self._table_dir(table), 'generation')
+
+    def _lock_path(self, table):
+        return os.path.join(self._table_dir(table), 'lock')
+
+    @contextmanager
+    def _file_lock(self, table):
+        """스레드 잠금 + 테이블의 lock 파일에 대한 프로세스 간 배타적 잠금 (중첩해서 잡지 않음)"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path(table), 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @contextmanager
+    def _compaction_lock(self, table):
+        """테이블을 압축하는 곳이 프로세스 전체에서 하나뿐이면 True (이미 압축 중이면 기다리지 않고 False)"""
+        guard = self._compaction_guards[table]
+        if not guard.acquire(blocking=False):
+            yield False
+            return
+        try:
+            if fcntl is None:
+                yield True
+                return
+            with open(os.path.join(self._table_dir(table), 'compact.lock'), 'a') as lock_file:
+                try:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    yield False
+                    return
+                try:
+                    yield True
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+        finally:
+            guard.release()
+
+    def _read_index_log(self, table, index, offset=0):
+        """index.log의 offset 바이트부터 읽어 index에 반영하고 (파일 inode, 읽은 끝 위치) 반환"""
+        index_path = self._index_path(table)
+        if not os.path.exists(index_path):
+            return None, 0
+        with open(index_path, 'rb') as f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                offset += len(line)
+                parts = line.decode('utf-8', errors='replace').rstrip('\n').split('\t', 2)
+                if len(parts) != 3:
+                    # 기록 도중 중단된 마지막 줄은 무시
+                    continue
+                try:
+                    index[json.loads(parts[2])] = (int(parts[0]), int(parts[1]))
+                except ValueError:
+                    continue
+        return inode, offset
+
+    def _read_generation(self, table):
+        if not os.path.exists(self._generation_path(table)):
+            return 0
+        with open(self._generation_path(table), 'r', encoding='utf-8') as f:
+            try:
+                return int(f.read().strip() or 0)
+            except ValueError:
+                # 알 수 없는 값이면 이전에 기록한 어떤 세대와도 다르게 만들어 파생 데이터를 다시 만들게 함
+                return -1
+
+    def _segment_numbers(self, table, pattern=_SEGMENT_PATTERN):
+        numbers = []
+        for path in glob.glob(os.path.join(self._table_dir(table), 'seg_*')):
+            match = pattern.search(path)
+            if match:
+                numbers.append(int(match.group(1)))
+        return numbers
+
+    def _open_table(self, table):
+        """디스크의 index.log를 읽어 메모리 인덱스 복원 (_file_lock을 잡은 상태에서 호출)"""
+        index = {}
+        index_inode, index_offset = self._read_index_log(table, index)
+        existing = self._segment_numbers(table)
+
+        # 기본키 컬럼이 바뀐 뒤 처음 여는 테이블은 세그먼트에서 인덱스를 다시 만듦
+        key_width = len(TABLE_KEYS[table])
+        if any(key.count('\x1f') + 1 != key_width for key in index):
+            index = self._rebuild_index(table, sorted(existing))
+            index_inode, index_offset = self._read_index_log(table, {})
+
+        # 살아있는 행이 하나도 없는 세그먼트(압축 후 남은 파일, 인덱스 기록 전 중단된 파일)는 정리
+        live_segments = {seg for seg, _ in index.values()}
+        for seg in existing:
+            if seg not in live_segments:
+                os.remove(self._segment_path(table, seg))
+
+        # 다른 프로세스가 압축 중인 파일은 그 프로세스가 정리함
+        for temp_path in glob.glob(os.path.join(self._table_dir(table), '*.tmp')):
+            if not temp_path.endswith(f"{_COMPACTING_SUFFIX}.tmp"):
+                os.remove(temp_path)
+
+        return {
+            'index': index,
+            'segments': sorted(live_segments),
+            'next_seg': max(existing, default=0) + 1,
+            'generation': self._read_generation(table),
+            'index_inode': index_inode,
+            'index_offset': index_offset,
+        }
+
+    def _sync_table(self, table):
+        """다른 프로세스가 기록한 내용을 메모리 상태에 반영 (_file_lock을 잡은 상태에서 호출)
+
+        index.log가 새 파일로 바뀌었으면(다른 프로세스의 압축) 다시 읽고, 아니면 덧붙은 줄만 읽음.
+        """
+        if fcntl is None:
+            return
+        state = self._tables[table]
+        try:
+            stat = os.stat(self._index_path(table))
+        except FileNotFoundError:
+            stat = None
+        if stat is not None and (stat.st_ino != state['index_inode'] or stat.st_size < state['index_offset']):
+            reloaded = self._open_table(table)
+            reloaded['next_seg'] = max(reloaded['next_seg'], state['next_seg'])
+            self._tables[table] = reloaded
+            return
+
+        if stat is not None and stat.st_size > state['index_offset']:
+            appended = {}
+            _, state['index_offset'] = self._read_index_log(table, appended, state['index_offset'])
+            state['index'].update(appended)
+            known = set(state['segments'])
+            state['segments'].extend(sorted({seg for seg, _ in appended.values()} - known))
+        state['generation'] = self._read_generation(table)
+
+    def _allocate_segment(self, table):
+        """새 세그먼트 번호 (_file_lock을 잡은 상태에서 호출, 다른 프로세스가 쓰는 번호와 겹치지 않음)"""
+        state = self._tables[table]
+        seg = max([state['next_seg']] + [number + 1 for number in
+                                         self._segment_numbers(table, _SEGMENT_FILE_PATTERN)])
+        state['next_seg'] = seg + 1
+        return seg
+
+    def _write_index_log(self, table, index):
+        """index.log를 index 내용으로 새로 씀 (_file_lock을 잡은 상태에서 호출)"""
+        index_path = self._index_path(table)
+        with open(f"{index_path}.tmp", 'w', encoding='utf-8') as f:
+            for key, (seg, row) in sorted(index.items(), key=lambda item: item[1]):
+                f.write(f"{seg}\t{row}\t{json.dumps(key)}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{index_path}.tmp", index_path)
+
+    def _rebuild_index(self, table, segments):
+        """세그먼트를 순서대로 읽어 현재 기본키로 인덱스를 다시 만들고 index.log를 새로 씀
+
+        이전 키로는 덮어써졌지만 아직 세그먼트에 남아 있는 행도 새 키가 다르면 되살아남.
+        """
+        index = {}
+        key_columns = TABLE_KEYS[table]
+        for seg in segments:
+            path = self._segment_path(table, seg)
+            header = pd.read_csv(path, nrows=0).columns
+            columns = [col for col in key_columns if col in header]
+            row = 0
+            # upsert와 같은 키가 나오도록 타입 추론을 거친 값으로 키 계산
+            with pd.read_csv(path, usecols=columns, chunksize=CHUNK_ROWS) as reader:
+                for chunk in reader:
+                    for key in _row_keys(chunk, key_columns):
+                        index[key] = (seg, row)
+                        row += 1
+
+        self._write_index_log(table, index)
+        logger.info("'%s' 테이블의 인덱스를 현재 기본키로 다시 만들었습니다 (%s개 키)", table, len(index))
+        return index
+
+    def _import_existing_csv(self):
+        for table in TABLE_KEYS:
+            csv_path = f"{self.base_filename}_{table}.csv"
+            if os.path.exists(csv_path):
+                try:
+                    df = pd.read_csv(csv_path)
+                    self.upsert(table, df)
+                    logger.info("기존 '%s' 파일의 %s개 행을 저장소로 가져왔습니다.", csv_path, len(df))
+                except pd.errors.EmptyDataError:
+                    pass
+
+    def upsert(self, table, df):
+        """배치 하나를 새 세그먼트로 추가하고 인덱스 갱신 (같은 키는 새 행으로 대체)"""
+        if df is None or df.empty:
+            return 0
+
+        df = df.reset_index(drop=True)
+        keys = _row_keys(df, TABLE_KEYS[table])
+
+        with self._file_lock(table):
+            self._sync_table(table)
+            state = self._tables[table]
+            seg = self._allocate_segment(table)
+
+            # 세대를 데이터보다 먼저 올려 둠 (중단되어도 집계 등 파생 데이터가 예전 세대로 남아 다시 만들어짐)
+            state['generation'] += 1
+            generation_path = self._generation_path(table)
+            with open(f"{generation_path}.tmp", 'w', encoding='utf-8') as f:
+                f.write(str(state['generation']))
+            os.replace(f"{generation_path}.tmp", generation_path)
+
+            # 세그먼트를 먼저 쓰고 인덱스를 나중에 기록 (중단 시 세그먼트만 고아로 남음)
+            atomic_write_csv(df, self._segment_path(table, seg))
+
+            lines = ''.join(f"{seg}\t{row}\t{json.dumps(key)}\n" for row, key in enumerate(keys)).encode('utf-8')
+            with open(self._index_path(table), 'ab') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+                state['index_inode'] = os.fstat(f.fileno()).st_ino
+                state['index_offset'] = f.tell()
+
+            index = state['index']
+            for row, key in enumerate(keys):
+                index[key] = (seg, row)
+            state['segments'].append(seg)
+
+            needs_compaction = len(state['segments']) > self.compact_threshold
+
+        if needs_compaction:
+            if self.background_compaction:
+                self._start_background_compaction(table)
+            else:
+                self.compact(table)
+
+        return len(df)
+
+    def row_count(self, table):
+        with self._file_lock(table):
+            self._sync_table(table)
+            return len(self._tables[table]['index'])
+
+    def generation(self, table):
+        """테이블에 upsert할 때마다 1씩 늘어나는 쓰기 세대 (같은 키를 덮어써 행 수가 그대로여도 바뀜, 압축으로는 바뀌지 않음)"""
+        with self._file_lock(table):
+            self._sync_table(table)
+            return self._tables[table]['generation']
+
+    def _live_rows(self, table):
+        """세그먼트 번호 -> 살아있는 행 번호 목록 (오름차순). 잠금을 잡은 상태에서 호출"""
+        rows_by_segment = {}
+        for seg, row in self._tables[table]['index'].values():
+            rows_by_segment.setdefault(seg, []).append(row)
+        return {seg: sorted(rows) for seg, rows in sorted(rows_by_segment.items())}
+
+    def _iter_live_rows(self, table, rows_by_segment, columns=None):
+        for seg, rows in rows_by_segment.items():
+            yield from _iter_segment_rows(self._segment_path(table, seg), rows, columns)
+
+    def read_table(self, table, columns=None):
+        """살아있는 행만 모아 하나의 데이터프레임으로 반환 (columns를 주면 그 컬럼만 읽음)"""
+        with self._file_lock(table):
+            self._sync_table(table)
+            rows_by_segment = {}
+            for seg, row in self._tables[table]['index'].values():
+                rows_by_segment.setdefault(seg, []).append(row)
+
+            frames = []
+            for seg in sorted(rows_by_segment):
+                segment_df = pd.read_csv(self._segment_path(table, seg), usecols=columns)
+                frames.append(segment_df.iloc[sorted(rows_by_segment[seg])])
+
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    def export_csv(self, base_filename=None):
+        """현재 데이터를 기존 CSV 레이아웃으로 내보내기
+
+        테이블 전체를 데이터프레임 하나로 합치지 않고 세그먼트를 CHUNK_ROWS행씩 읽어 이어 쓰므로
+        메모리 사용량이 테이블 크기와 상관없이 일정함.
+        """
+        base_filename = base_filename or self.base_filename
+
+        for table in TABLE_KEYS:
+            # 내보내는 동안 압축이 세그먼트를 지우지 않도록 잠금 유지
+            with self._file_lock(table):
+                self._sync_table(table)
+                rows_by_segment = self._live_rows(table)
+                if not rows_by_segment:
+                    continue
+
+                path = f"{base_filename}_{table}.csv"
+                segment_paths = [self._segment_path(table, seg) for seg in rows_by_segment]
+                count = atomic_write_csv_chunks(self._iter_live_rows(table, rows_by_segment), path,
+                                                _segment_columns(segment_paths))
+                logger.info("Exported %s %s records to '%s'", count, table, path)
+
+                if table == 'players':
+                    id_name_file = f"{base_filename}_player_ids.csv"
+                    id_columns = ['id', 'name', 'team']
+                    atomic_write_csv_chunks(self._iter_live_rows(table, rows_by_segment, id_columns), id_name_file,
+                                            id_columns)
+                    logger.info("Updated player ID list in '%s'", id_name_file)
+
+    def _start_background_compaction(self, table):
+        with self._lock:
+            thread = self._compaction_threads.get(table)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=self._compact_safely, args=(table,), name=f"compact-{table}", daemon=True)
+            self._compaction_threads[table] = thread
+            thread.start()
+
+    def _compact_safely(self, table):
+        try:
+            self.compact(table)
+        except Exception as e:
+            logger.exception("세그먼트 압축 중 오류 발생 (%s): %s", table, e)
+
+    def compact(self, table):
+        """여러 세그먼트의 살아있는 행을 하나의 세그먼트로 합치고 인덱스를 다시 씀
+
+        다른 스레드나 프로세스가 같은 테이블을 압축하고 있으면 기다리지 않고 건너뜀.
+        """
+        with self._compaction_lock(table) as acquired:
+            if acquired:
+                self._compact_locked(table)
+
+    def _compact_locked(self, table):
+        with self._file_lock(table):
+            self._sync_table(table)
+            state = self._tables[table]
+            old_segments = list(state['segments'])
+            if len(old_segments) <= 1:
+                return
+            # 압축 잠금을 잡았으므로 남아 있는 압축 파일은 중단된 이전 압축의 것
+            for path in glob.glob(os.path.join(self._table_dir(table), f"seg_*{_COMPACTING_SUFFIX}*")):
+                os.remove(path)
+            old_set = set(old_segments)
+            snapshot = sorted(state['index'].items(), key=lambda item: item[1])
+            new_seg = self._allocate_segment(table)
+            compacting_path = f"{self._segment_path(table, new_seg)}{_COMPACTING_SUFFIX}"
+            # 잠금을 놓기 전에 파일을 만들어 다른 프로세스가 같은 번호를 할당하지 않게 함
+            open(f"{compacting_path}.tmp", 'w').close()
+
+        # 세그먼트 파일은 변경되지 않으므로 잠금 없이 읽고 합침 (그동안 upsert 계속 가능)
+        # snapshot이 (세그먼트, 행) 순서이므로 세그먼트별 행 번호도 오름차순
+        rows_by_segment = {}
+        for _, (seg, row) in snapshot:
+            rows_by_segment.setdefault(seg, []).append(row)
+        segment_paths = [self._segment_path(table, seg) for seg in rows_by_segment]
+        merged_rows = atomic_write_csv_chunks(self._iter_live_rows(table, rows_by_segment), compacting_path,
+                                              _segment_columns(segment_paths))
+
+        with self._file_lock(table):
+            self._sync_table(table)
+            state = self._tables[table]
+            os.replace(compacting_path, self._segment_path(table, new_seg))
+
+            index = state['index']
+            # 압축 중에 새 값으로 바뀐 키는 그대로 두고, 그대로인 키만 새 세그먼트로 이동
+            for new_row, (key, pointer) in enumerate(snapshot):
+                if index.get(key) == pointer:
+                    index[key] = (new_seg, new_row)
+
+            state['segments'] = [new_seg] + [seg for seg in state['segments'] if seg not in old_set]
+
+            self._write_index_log(table, index)
+            index_stat = os.stat(self._index_path(table))
+            state['index_inode'], state['index_offset'] = index_stat.st_ino, index_stat.st_size
+
+            for seg in old_segments:
+                os.remove(self._segment_path(table, seg))
+
+        logger.info("%s 세그먼트 %s개를 1개로 압축했습니다 (%s개 행)", table, len(old_segments), merged_rows)
+
+    def close(self):
+        """진행 중인 백그라운드 압축이 끝날 때까지 대기"""
+        for thread in list(self._compaction_threads.values()):
+            thread.join()
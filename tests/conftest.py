@@ -0,0 +1,21 @@
+import json
+import os
+import sys
+
+import pytest
+
+# 저장소 최상위의 모듈을 그대로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+RAW_DIR = os.path.join(ROOT, 'raw_data')
+
+def load_payload(player_id):
+    """raw_data에 들어 있는 실제 API 응답 하나"""
+    with open(os.path.join(RAW_DIR, f'player_{player_id}.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@pytest.fixture
+def payload():
+    """경기, 통계, 특성, 트로피가 모두 있는 선수 (212875)"""
+    return load_payload(212875)
@@ -0,0 +1,13 @@
+from adaptive_probe import AdaptiveProber
+
+def test_prober_visits_each_id_once_without_issued_set():
+    """backfill까지 범위의 모든 ID를 한 번씩만 요청하고, 요청 중인 ID만 따로 들고 있음"""
+    prober = AdaptiveProber(1000, 4999, statuses={}, backfill=True)
+    seen = []
+    for player_id in prober.iter_ids():
+        seen.append(player_id)
+        assert prober._in_flight == {player_id}
+        prober.record(player_id, player_id % 97 == 0)
+    assert sorted(seen) == list(range(1000, 5000))
+    assert not prober._in_flight
+    assert prober.skipped_count() == 0
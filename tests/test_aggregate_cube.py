@@ -0,0 +1,29 @@
+import pandas as pd
+
+from aggregate_cube import AggregateCube
+from storage_engine import StorageEngine
+
+def _stats(rows):
+    return pd.DataFrame([{'player_id': 1, 'league_id': 47, 'league_name': 'Premier League', 'title': 'Goals', **row}
+                         for row in rows])
+
+def test_rebuild_then_upsert_retracts_same_season(tmp_path):
+    """저장소에서 float로 읽힌 시즌(2024.0)으로 다시 만든 집계에 같은 키를 다시 저장해도 그룹이 나뉘지 않음"""
+    engine = StorageEngine(str(tmp_path / 'x'), import_csv=False)
+    # 시즌이 빈 행이 섞여 있으면 CSV에서 시즌 컬럼을 float로 읽음
+    engine.upsert('stats', _stats([{'season': 2024, 'value': 3}, {'season': None, 'title': 'Assists', 'value': 1}]))
+    stored = engine.read_table('stats')
+    assert stored['season'].dtype == float
+
+    cube = AggregateCube(str(tmp_path / 'aggregates.db'))
+    try:
+        cube.rebuild(None, stored)
+        cube.apply('stats', _stats([{'season': 2024, 'value': 5}]))
+
+        goals = cube.stat_summary()
+        goals = goals[goals['title'] == 'Goals']
+        assert goals['season'].tolist() == ['2024']
+        assert goals['value_sum'].tolist() == [5]
+        assert goals['players'].tolist() == [1]
+    finally:
+        cube.close()
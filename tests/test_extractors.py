@@ -0,0 +1,76 @@
+import copy
+import json
+
+import pytest
+
+from data_extractors import extract_all_tables, extract_match_data, extract_player_info, extract_stats_data
+
+# dict는 파이썬 검증 경로, 바이트는 msgspec 디코더(있으면) 경로를 거침
+ENCODINGS = [pytest.param(lambda data: data, id='dict'),
+             pytest.param(lambda data: json.dumps(data).encode('utf-8'), id='bytes')]
+
+@pytest.mark.parametrize('encode', ENCODINGS)
+def test_int_main_league_season_keeps_player_and_stats(payload, encode):
+    data = copy.deepcopy(payload)
+    data['mainLeague']['season'] = 2024
+
+    assert extract_player_info(encode(data)) is not None
+    stats = extract_stats_data(encode(data))
+    assert len(stats) == len(payload['mainLeague']['stats'])
+    assert {row['season'] for row in stats} == {2024}
+
+@pytest.mark.parametrize('encode', ENCODINGS)
+def test_bad_match_field_drops_only_that_match(payload, encode):
+    data = copy.deepcopy(payload)
+    data['recentMatches'][1]['homeScore'] = 'three'
+
+    assert extract_player_info(encode(data)) is not None
+    matches = extract_match_data(encode(data))
+    assert len(matches) == len(payload['recentMatches']) - 1
+    assert payload['recentMatches'][1]['id'] not in {row['match_id'] for row in matches}
+    assert len(extract_stats_data(encode(data))) == len(payload['mainLeague']['stats'])
+
+@pytest.mark.parametrize('encode', ENCODINGS)
+def test_bad_trait_value_drops_only_that_trait(payload, encode):
+    data = copy.deepcopy(payload)
+    data['traits']['items'][0]['value'] = 'high'
+
+    tables = extract_all_tables(encode(data))
+    assert tables['players'] is not None
+    assert len(tables['matches']) == len(payload['recentMatches'])
+    assert len(tables['stats']) == len(payload['mainLeague']['stats'])
+    assert len(tables['traits']) == len(payload['traits']['items']) - 1
+    assert tables['trophies'] and tables['career']
+
+@pytest.mark.parametrize('encode', ENCODINGS)
+@pytest.mark.parametrize('section, bad_value', [
+    ('traits', 'not-an-object'),
+    ('traits', {'items': 5}),
+    ('trophies', [1, 2]),
+    ('trophies', {'playerTrophies': [{'tournaments': 'x'}]}),
+    ('careerHistory', 7),
+    ('careerHistory', {'careerItems': []}),
+])
+def test_bad_extra_section_keeps_core_tables(payload, encode, section, bad_value):
+    data = copy.deepcopy(payload)
+    data[section] = bad_value
+
+    tables = extract_all_tables(encode(data))
+    assert tables['players'] is not None
+    assert len(tables['matches']) == len(payload['recentMatches'])
+    assert len(tables['stats']) == len(payload['mainLeague']['stats'])
+    broken = {'traits': 'traits', 'trophies': 'trophies', 'careerHistory': 'career'}[section]
+    assert tables[broken] == []
+    assert all(tables[table] for table in ('career', 'seasons', 'traits', 'trophies') if table != broken)
+
+def test_extra_extractor_error_keeps_core_tables(payload, monkeypatch):
+    import data_extractors
+
+    def broken(payload):
+        raise RuntimeError('boom')
+
+    monkeypatch.setitem(data_extractors.EXTRA_TABLE_EXTRACTORS, 'trophies', broken)
+    tables = extract_all_tables(payload)
+    assert tables['players'] is not None
+    assert tables['matches'] and tables['stats'] and tables['traits']
+    assert tables['trophies'] == []
@@ -0,0 +1,20 @@
+import player
+from adaptive_probe import AdaptiveProber
+
+def test_main_saves_rows_after_last_save_interval(tmp_path, monkeypatch):
+    """확인한 ID 수가 저장 주기의 배수가 아니어도 마지막에 모인 결과까지 저장함"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(player, 'AdaptiveProber',
+                        lambda start_id, end_id, **kwargs: AdaptiveProber(1, 150, statuses={}, **kwargs))
+    monkeypatch.setattr(player, 'fetch_player', lambda pid: {
+        'id': pid, 'name': f"player {pid}", 'primaryTeam': {'teamName': 'team', 'teamId': 1},
+    } if pid % 10 == 0 else None)
+
+    player.main()
+
+    with open(tmp_path / 'output' / 'players_found.csv', encoding='utf-8') as f:
+        found = f.read().splitlines()[1:]
+    with open(tmp_path / 'output' / 'not_found_ids.txt', encoding='utf-8') as f:
+        not_found = f.read().splitlines()
+    assert len(found) == 15
+    assert len(found) + len(not_found) == 150
@@ -0,0 +1,17 @@
+import api_functions
+from rate_control import RateController
+
+def test_record_success_stops_at_max_rate():
+    controller = RateController(1.0, max_rate=2.0)
+    for _ in range(1000):
+        controller.record_success()
+    assert controller.rate == 2.0
+
+def test_default_controller_is_capped(monkeypatch):
+    """기본 제어기는 정상 응답이 계속 이어져도 DEFAULT_MAX_REQUESTS_PER_SECOND를 넘지 않음"""
+    monkeypatch.setattr(api_functions, '_rate_controller', None)
+    controller = api_functions.get_rate_controller()
+    assert controller.max_rate == api_functions.DEFAULT_MAX_REQUESTS_PER_SECOND
+    for _ in range(1000):
+        controller.record_success()
+    assert controller.rate <= api_functions.DEFAULT_MAX_REQUESTS_PER_SECOND
@@ -0,0 +1,13 @@
+from raw_store import RawStore
+
+def test_latest_hash_cache_is_bounded(tmp_path):
+    """직전 해시 캐시는 최근 선수 latest_hash_cache_size명만 두고, 잊은 선수도 manifest로 중복을 걸러냄"""
+    store = RawStore(str(tmp_path), latest_hash_cache_size=2)
+    for player_id in range(5):
+        assert store.put(player_id, {'id': player_id})
+    assert list(store._latest_hash) == [3, 4]
+
+    assert not store.put(0, {'id': 0})
+    assert store.put(0, {'id': 0, 'name': 'changed'})
+    assert len(store.load_manifest(0)['snapshots']) == 2
+    assert len(store._latest_hash) == 2
@@ -0,0 +1,33 @@
+import copy
+
+import pandas as pd
+
+from raw_store import RawStore
+from rebuild import rebuild_from_raw
+
+def test_rebuild_replays_older_snapshots(tmp_path, payload):
+    """최신 스냅샷의 recentMatches에서 빠진 경기와 예전 시즌 통계도 재구축 결과에 남음"""
+    first = copy.deepcopy(payload)
+    second = copy.deepcopy(payload)
+    dropped_match = second['recentMatches'].pop(0)
+    second['mainLeague']['season'] = '2025/2026'
+    second['recentMatches'][0]['goals'] = 7
+
+    raw_root = str(tmp_path / 'raw')
+    store = RawStore(raw_root)
+    assert store.put(payload['id'], first, fetched_at='2024-01-01 00:00:00')
+    assert store.put(payload['id'], second, fetched_at='2025-01-01 00:00:00')
+
+    base = str(tmp_path / 'out')
+    summary = rebuild_from_raw(base, raw_root, workers=1)
+
+    assert summary['snapshots'] == 2
+    matches = pd.read_csv(f'{base}_matches.csv')
+    assert dropped_match['id'] in set(matches['match_id'])
+    assert len(matches) == len(first['recentMatches'])
+    # 두 스냅샷에 모두 있는 경기는 최신 값
+    updated = matches[matches['match_id'] == second['recentMatches'][0]['id']]
+    assert updated['goals'].tolist() == [7]
+
+    stats = pd.read_csv(f'{base}_stats.csv', dtype={'season': str})
+    assert {payload['mainLeague']['season'], '2025/2026'} <= set(stats['season'])
@@ -0,0 +1,57 @@
+import multiprocessing
+
+import pandas as pd
+import pytest
+
+import storage_engine
+from storage_engine import StorageEngine
+
+WORKERS = 4
+BATCHES = 25
+
+def _write_batches(base, worker):
+    engine = StorageEngine(base, compact_threshold=4, import_csv=False)
+    for batch in range(BATCHES):
+        engine.upsert('matches', pd.DataFrame({
+            'player_id': [worker, worker],
+            'match_id': [batch, -1],
+            'goals': [batch, worker],
+        }))
+    engine.close()
+
+@pytest.mark.skipif(storage_engine.fcntl is None, reason='프로세스 간 잠금에는 fcntl이 필요함')
+def test_concurrent_processes_keep_every_row(tmp_path):
+    """여러 프로세스가 같은 테이블에 쓰고 압축해도 세그먼트 번호가 겹치거나 인덱스 줄이 사라지지 않음"""
+    base = str(tmp_path / 'x')
+    StorageEngine(base, import_csv=False).close()
+
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_write_batches, args=(base, worker)) for worker in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    assert all(process.exitcode == 0 for process in processes)
+
+    engine = StorageEngine(base, background_compaction=False, import_csv=False)
+    assert engine.generation('matches') == WORKERS * BATCHES
+    df = engine.read_table('matches')
+    assert len(df) == WORKERS * (BATCHES + 1)
+    last = df[df['match_id'] == -1].set_index('player_id')['goals'].to_dict()
+    assert last == {worker: worker for worker in range(WORKERS)}
+    assert sorted(df[df['match_id'] >= 0].groupby('player_id').size().tolist()) == [BATCHES] * WORKERS
+
+def test_engine_sees_rows_written_by_another_engine(tmp_path):
+    """다른 프로세스(여기서는 다른 엔진 객체)가 덧붙이거나 압축한 내용도 다음 조회에 반영됨"""
+    base = str(tmp_path / 'x')
+    first = StorageEngine(base, background_compaction=False, import_csv=False)
+    second = StorageEngine(base, background_compaction=False, import_csv=False)
+
+    first.upsert('players', pd.DataFrame({'id': [1], 'name': ['a']}))
+    second.upsert('players', pd.DataFrame({'id': [2], 'name': ['b']}))
+    second.upsert('players', pd.DataFrame({'id': [1], 'name': ['c']}))
+    second.compact('players')
+
+    assert first.row_count('players') == 2
+    assert first.generation('players') == 3
+    assert sorted(first.read_table('players')['name']) == ['b', 'c']